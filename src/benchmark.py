@@ -0,0 +1,66 @@
+import sys
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+from loguru import logger
+
+from src.video_processor.processor import VideoProcessor
+
+def run_batch(folder, args, use_thread_budget):
+    """Generate thumbnails for every video in `folder` into a fresh cache and time the batch.
+
+    Returns:
+        tuple: (elapsed seconds, number of videos)
+    """
+    with tempfile.TemporaryDirectory(prefix="vtm_bench_") as cache_dir:
+        processor = VideoProcessor(cache_dir, args.thumbnails, args.width, args.quality,
+                                   args.concurrent_videos, 0, 0, thumbnail_format=args.format)
+        if args.processes:
+            processor.set_ffmpeg_process_limit(args.processes)
+        if not use_thread_budget:
+            processor.ffmpeg_threads = None # Let every FFmpeg child size its own thread pools
+        videos = processor.scan_videos(folder)
+        start_time = time.monotonic()
+        processor.process_videos(videos)
+        return time.monotonic() - start_time, len(videos)
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark FFmpeg thread budgeting on a folder of videos")
+    parser.add_argument("folder", help="Folder containing the videos to thumbnail")
+    parser.add_argument("--runs", type=int, default=3, help="Runs per mode (default: 3)")
+    parser.add_argument("--processes", type=int, default=0,
+                        help="Concurrent FFmpeg processes (default: one per core)")
+    parser.add_argument("--concurrent-videos", type=int, default=4, help="Videos in progress at once (default: 4)")
+    parser.add_argument("--thumbnails", type=int, default=18, help="Thumbnails per video (default: 18)")
+    parser.add_argument("--width", type=int, default=320, help="Thumbnail width (default: 320)")
+    parser.add_argument("--quality", type=int, default=4, help="Thumbnail quality, 1-31 (default: 4)")
+    parser.add_argument("--format", default="jpeg", help="Thumbnail format (default: jpeg)")
+    parser.add_argument("-l", "--log-level", default="WARNING", choices=["DEBUG", "INFO", "WARNING", "ERROR"],
+                        help="Set the logging level (default: WARNING)")
+    args = parser.parse_args()
+
+    logger.remove()
+    logger.add(sys.stderr, level=args.log_level)
+
+    if not Path(args.folder).is_dir():
+        parser.error(f"Not a directory: {args.folder}")
+
+    results = {}
+    # Interleave the modes so drifting conditions (page cache, thermals) affect both alike.
+    for run in range(args.runs):
+        for mode, use_thread_budget in (("ffmpeg defaults", False), ("thread budget", True)):
+            elapsed, num_videos = run_batch(args.folder, args, use_thread_budget)
+            results.setdefault(mode, []).append(elapsed)
+            print(f"Run {run + 1}/{args.runs} [{mode}]: {num_videos} videos in {elapsed:.2f}s")
+
+    print()
+    for mode, times in results.items():
+        print(f"{mode:>16}: best {min(times):.2f}s, mean {sum(times) / len(times):.2f}s")
+    best_default, best_budget = min(results["ffmpeg defaults"]), min(results["thread budget"])
+    if best_budget > 0:
+        print(f"Speed-up with thread budget: {best_default / best_budget:.2f}x")
+
+if __name__ == "__main__":
+    main()
@@ -30,7 +30,26 @@ class Config:
             'thumbnail_distribution': Distribution.NORMAL.value,  # Changed default (already Normal, but confirming)
             'excluded_words': '',  # Comma-separated string of excluded words/patterns
             'excluded_words_regex': False,  # Whether to treat excluded_words as regex
-            'excluded_words_match_full_path': False  # Whether to match against full path or just filename/dirname
+            'excluded_words_match_full_path': False,  # Whether to match against full path or just filename/dirname
+            'thumbnail_format': 'jpeg',  # Output image format: 'jpeg', 'webp' or 'avif'
+            'encode_preset': 'balanced',  # Encoder preset: 'speed', 'balanced' or 'size'
+            'decode_preset': 'standard',  # Decode preset: 'standard' or 'draft' (decoder shortcuts, lower quality)
+            'autotune_concurrency': False,  # Adapt the number of concurrent FFmpeg processes during a batch
+            'min_ffmpeg_processes': 1,  # Lower bound for the autotuner
+            'max_ffmpeg_processes': 0,  # Upper bound for the autotuner, 0 = twice the CPU core count
+            'video_time_budget': 0,  # Max FFmpeg seconds per video before placeholders are used, 0 = automatic
+            'master_width': 0,  # Width cap of the master frames thumbnails are derived from, 0 = no master frames
+            'scrub_frames': 0,  # Frames in the hover-scrub sprite of each video (one extra keyframe-only pass per video), 0 = no sprite
+            'frame_scoring': False,  # Reject black, blank or blurry frames and take a nearby one instead
+            'keyframe_index': False,  # Index each video's keyframe times once and move nearby timestamps onto them
+            'cover_art': False,  # Use embedded cover art / attached pictures as an extra first thumbnail
+            'sidecar_thumbnails': False,  # Show existing poster/thumb sidecars or desktop thumbnails instead of extracting frames
+            'ffmpeg_memory_limit_mb': 0,  # Private memory per FFmpeg process, 0 = unlimited
+            'ffmpeg_cpu_limit_seconds': 0,  # CPU time per FFmpeg process (all threads), 0 = unlimited
+            'ffmpeg_nice': 0,  # Lower the CPU priority of FFmpeg processes by this much, 0 = normal priority
+            'ffmpeg_io_priority': 'normal',  # Disk priority of FFmpeg processes: 'normal', 'low' or 'idle' (needs psutil)
+            'progressive_generation': False,  # One thumbnail for every video first, then fill in the rest
+            'lazy_thumbnails': False  # List every video at once and extract thumbnails only for entries on screen
         }
         self.config = self.load()
 
@@ -4,4 +4,6 @@ class Distribution(Enum):
     """Enum for thumbnail distribution models."""
     UNIFORM = 'uniform'
     TRIANGULAR = 'triangular'
-    NORMAL = 'normal'
\ No newline at end of file
+    NORMAL = 'normal'
+    SCENES = 'scenes' # Most distinct frames found by a scene analysis pass
+    CHAPTERS = 'chapters' # Chapter starts from the container, evenly spread without chapters
\ No newline at end of file
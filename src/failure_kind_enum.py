@@ -0,0 +1,11 @@
+from enum import Enum
+
+class FailureKind(Enum):
+    """Enum for the causes of failed FFmpeg extractions, as classified from their exit status and stderr."""
+    MISSING_MOOV = 'missing_moov' # MP4/MOV index missing, usually a truncated download or recording
+    UNSUPPORTED_CODEC = 'unsupported_codec'
+    IO_ERROR = 'io_error'
+    INVALID_DATA = 'invalid_data' # Input could not be opened as media at all
+    RESOURCE_LIMIT = 'resource_limit' # Memory or CPU time limit of the FFmpeg process
+    TIMEOUT = 'timeout'
+    DECODE_ERROR = 'decode_error' # Failed at one timestamp or with one strategy, e.g. a corrupt region
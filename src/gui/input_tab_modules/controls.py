@@ -4,6 +4,8 @@ from PyQt6.QtWidgets import (QLabel, QLineEdit, QPushButton, QSpinBox, QDoubleSp
 from PyQt6.QtGui import QIntValidator, QDoubleValidator
 from PyQt6.QtCore import Qt, QTimer
 
+from src.thumbnail_format_enum import ThumbnailFormat, EncodePreset, DecodePreset
+
 class ClickableComboBox(QComboBox):
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -127,6 +129,32 @@ def setup_input_controls_pyqt(gui, left_layout, right_layout):
     quality_layout.addStretch(1)
     left_layout.addWidget(quality_group)
 
+    # Thumbnail Format and Encode Preset (Left column)
+    format_group = QWidget()
+    format_layout = QHBoxLayout(format_group)
+    format_label = QLabel("Thumbnail Format:")
+    format_label.setToolTip("Image format of cached thumbnails (default: jpeg). WebP and AVIF produce a much smaller cache. "
+                            "For WebP/AVIF the quality setting is mapped to the encoder's 0-100 scale.")
+    format_layout.addWidget(format_label)
+    gui.thumbnail_format_var = QComboBox()
+    gui.thumbnail_format_var.addItems([f.value for f in ThumbnailFormat])
+    gui.thumbnail_format_var.setCurrentText(gui.config.get('thumbnail_format'))
+    gui.thumbnail_format_var.setToolTip("Select the thumbnail image format. AVIF falls back to WebP if unsupported.")
+    format_layout.addWidget(gui.thumbnail_format_var)
+    gui.encode_preset_var = QComboBox()
+    gui.encode_preset_var.addItems([p.value for p in EncodePreset])
+    gui.encode_preset_var.setCurrentText(gui.config.get('encode_preset'))
+    gui.encode_preset_var.setToolTip("Encoder preset: 'speed' encodes fastest, 'size' produces the smallest files.")
+    format_layout.addWidget(gui.encode_preset_var)
+    gui.decode_preset_var = QComboBox()
+    gui.decode_preset_var.addItems([p.value for p in DecodePreset])
+    gui.decode_preset_var.setCurrentText(gui.config.get('decode_preset'))
+    gui.decode_preset_var.setToolTip("Decode preset: 'draft' uses decoder shortcuts (lowres decoding, skipped loop filter "
+                                     "and IDCT on non-reference frames, fast bilinear scaling) for quick, lower-quality passes.")
+    format_layout.addWidget(gui.decode_preset_var)
+    format_layout.addStretch(1)
+    left_layout.addWidget(format_group)
+
     # Min Duration (Left column)
     min_duration_group = QWidget()
     min_duration_layout = QHBoxLayout(min_duration_group)
@@ -173,6 +201,11 @@ def setup_input_controls_pyqt(gui, left_layout, right_layout):
     gui.concurrent_var.setValue(gui.config.get('concurrent_videos'))
     gui.concurrent_var.setToolTip("Set the number of videos processed concurrently.")
     concurrent_layout.addWidget(gui.concurrent_var)
+    gui.autotune_var = QCheckBox("Auto-tune FFmpeg Processes")
+    gui.autotune_var.setChecked(gui.config.get('autotune_concurrency'))
+    gui.autotune_var.setToolTip("Adjust the number of concurrent FFmpeg processes during a batch based on "
+                                "measured throughput, CPU usage and I/O wait.")
+    concurrent_layout.addWidget(gui.autotune_var)
     concurrent_layout.addStretch(1)
     left_layout.addWidget(concurrent_group)
 
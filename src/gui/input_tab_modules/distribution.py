@@ -5,6 +5,7 @@ from PyQt6.QtCore import Qt, pyqtSignal, QPointF
 from PyQt6.QtGui import QPainter, QPen, QColor, QPolygonF, QFont, QFontMetrics
 import numpy as np
 from src.distribution_enum import Distribution
+from src.video_processor.timestamp_plan import normalized_plan
 from loguru import logger
 
 class DistributionGraphWidget(QWidget):
@@ -55,6 +56,15 @@ class DistributionGraphWidget(QWidget):
             # logger.debug("DistributionGraphWidget: num_thumbs is <= 0.")
             return
 
+        if distribution == Distribution.SCENES: # Positions depend on each video's content
+            painter.setPen(self.palette().windowText().color())
+            painter.drawText(self.rect(), Qt.AlignmentFlag.AlignCenter, "Most distinct scenes, chosen per video")
+            return
+        if distribution == Distribution.CHAPTERS: # Positions come from each video's chapter markers
+            painter.setPen(self.palette().windowText().color())
+            painter.drawText(self.rect(), Qt.AlignmentFlag.AlignCenter, "Chapter starts, read from each video")
+            return
+
         x_axis = np.linspace(0, 1, 100)
         y_values = np.zeros_like(x_axis)
 
@@ -107,26 +117,8 @@ class DistributionGraphWidget(QWidget):
         # --- Sample points drawing (Re-enable this section) ---
         if num_thumbs > 0:
             try:
-                # logger.debug(f"Drawing samples: dist={distribution}, peak={peak_pos}, conc={concentration}, num={num_thumbs}")
-                if distribution == Distribution.NORMAL:
-                    sigma = max(float(concentration), 1e-6)
-                    samples = np.random.normal(float(peak_pos), sigma, num_thumbs)
-                elif distribution == Distribution.TRIANGULAR:
-                    peak_pos_f = float(peak_pos)
-                    concentration_f = float(concentration)
-                    left_s = max(0, peak_pos_f - concentration_f)
-                    right_s = min(1, peak_pos_f + concentration_f)
-                    c_s = peak_pos_f
-                    if abs(right_s - left_s) < 1e-6: # Degenerate case for sampling
-                        samples = np.full(num_thumbs, c_s)
-                    else:
-                        # Ensure mode is within [left, right] for triangular
-                        mode_s = np.clip(c_s, left_s, right_s)
-                        samples = np.random.triangular(left_s, mode_s, right_s, num_thumbs)
-                else: # Uniform
-                    samples = np.random.uniform(0, 1, num_thumbs)
-
-                samples = np.clip(samples, 0, 1) # Clip all samples to [0,1]
+                # The same deterministic plan the processor uses, so the ticks are the real positions.
+                samples = normalized_plan(distribution, num_thumbs, float(peak_pos), float(concentration))
 
                 pen.setColor(QColor("red"))
                 pen.setWidth(1)
@@ -9,7 +9,7 @@ import datetime
 from src.gui.worker import VideoProcessingWorker
 
 def setup_progress_controls_pyqt(gui, parent_layout):
-    """Sets up the progress bar, ETA label, completion label, and start button."""
+    """Sets up the progress bar, ETA label, completion label, and start/pause/stop buttons."""
     bottom_frame_widget = QWidget()
     bottom_layout = QVBoxLayout(bottom_frame_widget)
 
@@ -27,10 +27,25 @@ def setup_progress_controls_pyqt(gui, parent_layout):
     gui.completion_label.setToolTip("Message display area.")
     bottom_layout.addWidget(gui.completion_label)
 
+    buttons_layout = QHBoxLayout()
     start_button = QPushButton("Start")
     start_button.setToolTip("Begin processing videos with the current settings.")
     start_button.clicked.connect(gui.start_processing_wrapper)
-    bottom_layout.addWidget(start_button, 0, Qt.AlignmentFlag.AlignCenter)
+    buttons_layout.addWidget(start_button)
+
+    gui.pause_button = QPushButton("Pause")
+    gui.pause_button.setToolTip("Suspend FFmpeg to free the CPU; Resume continues the same queue without rescanning.")
+    gui.pause_button.clicked.connect(gui.toggle_pause_processing)
+    gui.pause_button.setEnabled(False)
+    buttons_layout.addWidget(gui.pause_button)
+
+    gui.stop_button = QPushButton("Stop")
+    gui.stop_button.setToolTip("Stop processing; videos finished so far stay cached. Ends a lazy thumbnails session.")
+    gui.stop_button.clicked.connect(gui.stop_processing)
+    gui.stop_button.setEnabled(False)
+    buttons_layout.addWidget(gui.stop_button)
+    bottom_layout.addLayout(buttons_layout)
+    bottom_layout.setAlignment(buttons_layout, Qt.AlignmentFlag.AlignCenter)
 
     parent_layout.addWidget(bottom_frame_widget)
 
@@ -48,6 +63,7 @@ def start_processing_pyqt(gui):
                       'min_duration_var', 'min_duration_unit_var', 'use_peak_concentration_var',
                       'peak_pos_var', 'concentration_var', 'distribution_var',
                       'excluded_words_var', 'excluded_words_regex_var', 'excluded_words_match_full_path_var',
+                      'thumbnail_format_var', 'encode_preset_var', 'decode_preset_var', 'autotune_var',
                       'completion_label', 'output_scrollable_layout', 'progress_bar', 'eta_label',
                       'log_output_checkbox']
     for attr in required_attrs:
@@ -84,6 +100,10 @@ def start_processing_pyqt(gui):
     excluded_words_val = gui.excluded_words_var.text()
     excluded_words_regex_val = gui.excluded_words_regex_var.isChecked()
     excluded_words_match_full_path_val = gui.excluded_words_match_full_path_var.isChecked()
+    thumbnail_format = gui.thumbnail_format_var.currentText()
+    encode_preset = gui.encode_preset_var.currentText()
+    decode_preset = gui.decode_preset_var.currentText()
+    autotune_concurrency = gui.autotune_var.isChecked()
 
     try:
         distribution = Distribution.UNIFORM if not use_peak_concentration else Distribution(distribution_text)
@@ -111,6 +131,10 @@ def start_processing_pyqt(gui):
     gui.config.set('excluded_words', excluded_words_val)
     gui.config.set('excluded_words_regex', excluded_words_regex_val)
     gui.config.set('excluded_words_match_full_path', excluded_words_match_full_path_val)
+    gui.config.set('thumbnail_format', thumbnail_format)
+    gui.config.set('encode_preset', encode_preset)
+    gui.config.set('decode_preset', decode_preset)
+    gui.config.set('autotune_concurrency', autotune_concurrency)
     gui.config.save()
 
     if gui.log_output_checkbox.isChecked():
@@ -157,6 +181,7 @@ def start_processing_pyqt(gui):
             if child.widget():
                 child.widget().deleteLater()
     gui.videos.clear()
+    gui.video_entries.clear()
     gui.selected_videos.clear()
     gui.update_selection_count()
 
@@ -171,8 +196,31 @@ def start_processing_pyqt(gui):
     if gui.eta_label: gui.eta_label.setText("ETA: --:--")
     gui.start_time = None
 
+    _start_worker(gui, VideoProcessingWorker(gui))
+
+
+def start_requested_extraction_pyqt(gui):
+    """Run the frame extractions queued with VideoProcessor.request_full_extraction as a batch of their own.
+
+    Uses the same worker, so the extraction follows the batch settings, Pause and Stop; the Output tab
+    is kept and the requested entries are updated in place. Does nothing while a batch is running,
+    as that batch takes the requests up itself.
+    """
+    if gui.is_processing or not gui.processor or not gui.processor.requested_videos:
+        return
+    if gui.worker_thread and gui.worker_thread.isRunning():
+        return
+    gui.is_processing = True
+    gui.set_output_controls_enabled_state(False)
+    if gui.completion_label: gui.completion_label.setText("Extracting frames...")
+    _start_worker(gui, VideoProcessingWorker(gui, videos=list(gui.processor.requested_videos)))
+    if gui.stop_button: gui.stop_button.setEnabled(True)
+    if gui.pause_button: gui.pause_button.setEnabled(True)
+
+
+def _start_worker(gui, worker):
     gui.worker_thread = QThread()
-    gui.processing_worker = VideoProcessingWorker(gui)
+    gui.processing_worker = worker
     gui.processing_worker.moveToThread(gui.worker_thread)
 
     if hasattr(gui, 'connect_worker_signals') and callable(gui.connect_worker_signals):
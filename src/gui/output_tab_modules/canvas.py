@@ -1,6 +1,12 @@
+import bisect
+
 from PyQt6.QtWidgets import QScrollArea, QWidget, QVBoxLayout
-from PyQt6.QtCore import Qt, QEvent
+from PyQt6.QtCore import Qt, QEvent, QTimer
 from PyQt6.QtGui import QKeyEvent
+from loguru import logger
+
+VIEWPORT_PRIORITY_DELAY_MS = 150 # Scrolling settles before the processor is told what is on screen
+VIEWPORT_PRIORITY_MARGIN = 1.0 # Viewport heights above and below that also count as near
 
 class CustomScrollArea(QScrollArea):
     def __init__(self, parent=None):
@@ -86,4 +92,64 @@ def setup_output_canvas_pyqt(gui):
     gui.output_scrollable_layout.setAlignment(Qt.AlignmentFlag.AlignTop)
 
     gui.output_scroll_area.setWidget(gui.output_scrollable_widget)
-    gui.output_frame_layout.addWidget(gui.output_scroll_area)
\ No newline at end of file
+    gui.output_frame_layout.addWidget(gui.output_scroll_area)
+
+    gui._viewport_priority_timer = QTimer(gui.output_scroll_area)
+    gui._viewport_priority_timer.setSingleShot(True)
+    gui._viewport_priority_timer.setInterval(VIEWPORT_PRIORITY_DELAY_MS)
+    gui._viewport_priority_timer.timeout.connect(lambda: report_viewport_priority_pyqt(gui))
+    gui.output_scroll_area.verticalScrollBar().valueChanged.connect(lambda _: schedule_viewport_priority_pyqt(gui))
+
+
+def schedule_viewport_priority_pyqt(gui):
+    """Report the videos near the viewport to the running batch once scrolling or selecting settles."""
+    if getattr(gui, 'processing_worker', None) is None or not hasattr(gui, '_viewport_priority_timer'):
+        return
+    gui._viewport_priority_timer.start()
+
+
+def viewport_priority_videos(gui) -> list:
+    """Videos of the Output tab the user is looking at, most urgent first.
+
+    Order: entries inside the viewport (top to bottom), selected videos, then entries within
+    VIEWPORT_PRIORITY_MARGIN viewport heights below and above it.
+    """
+    from src.gui.output_tab_modules.thumbnails import VideoEntryWidgetPyQt
+    layout = gui.output_scrollable_layout
+    if not layout or not gui.output_scroll_area:
+        return []
+    top = gui.output_scroll_area.verticalScrollBar().value()
+    height = gui.output_scroll_area.viewport().height()
+    margin = int(height * VIEWPORT_PRIORITY_MARGIN)
+    widgets = [widget for widget in (layout.itemAt(i).widget() for i in range(layout.count()))
+               if isinstance(widget, VideoEntryWidgetPyQt)] # Skips spacers and stretches
+    bottoms = [widget.geometry().bottom() for widget in widgets]
+    # Once laid out, entries are stacked top to bottom and only the range around the viewport is
+    # looked at; rows added since the last layout pass still sit at 0, so those need a full scan.
+    laid_out = bool(bottoms) and bottoms[-1] > 0 and all(a <= b for a, b in zip(bottoms, bottoms[1:]))
+    first = bisect.bisect_left(bottoms, top - margin) if laid_out else 0
+    visible, below, above = [], [], []
+    for widget in widgets[first:]:
+        entry_top, entry_bottom = widget.y(), widget.y() + widget.height()
+        if entry_top > top + height + margin:
+            if laid_out:
+                break
+            continue
+        if entry_bottom >= top and entry_top <= top + height:
+            visible.append(widget.video_path)
+        elif entry_top > top + height:
+            below.append(widget.video_path)
+        else:
+            above.append(widget.video_path)
+    ordered = visible + sorted(gui.selected_videos, key=str) + below + above[::-1]
+    return list(dict.fromkeys(ordered))
+
+
+def report_viewport_priority_pyqt(gui):
+    worker = getattr(gui, 'processing_worker', None)
+    if worker is None:
+        return
+    try:
+        worker.prioritize_videos(viewport_priority_videos(gui))
+    except Exception as e:
+        logger.error(f"Error reporting visible videos to the processor: {e}", exc_info=True)
@@ -10,7 +10,52 @@ import subprocess
 import os
 
 from ..utils import resize_image_pil
-from .video_actions import play_video_pyqt, copy_filename_pyqt, copy_filepath_pyqt, open_in_explorer_pyqt
+from .video_actions import (play_video_pyqt, copy_filename_pyqt, copy_filepath_pyqt, open_in_explorer_pyqt,
+                            extract_frames_pyqt)
+from .canvas import schedule_viewport_priority_pyqt
+from src.video_processor.scrub import load_scrub_strip
+from src.video_processor.sidecars import SIDECAR_PREFIX
+
+
+class ScrubStrip:
+    """Hover-scrub frames of one video, cut from its sprite (see video_processor/scrub.py) on first use."""
+
+    def __init__(self, video_cache_dir: Path, strip: dict, format_timestamp):
+        self.sprite_path = video_cache_dir / strip['file']
+        self.count = strip['count']
+        self.columns = strip['columns']
+        self.rows = strip['rows']
+        self.interval = strip['interval']
+        self.format_timestamp = format_timestamp
+        self._sprite = None
+
+    @classmethod
+    def load(cls, video_cache_dir: Path, format_timestamp):
+        strip = load_scrub_strip(video_cache_dir)
+        return cls(video_cache_dir, strip, format_timestamp) if strip else None
+
+    def index_at(self, fraction: float) -> int:
+        return min(self.count - 1, max(0, int(fraction * self.count)))
+
+    def timestamp_str(self, index: int) -> str:
+        return self.format_timestamp(index * self.interval)
+
+    def frame(self, index: int):
+        """The frame at `index` as a PIL image, or None if the sprite cannot be read."""
+        if self._sprite is None:
+            try:
+                self._sprite = Image.open(self.sprite_path)
+                self._sprite.load()
+            except Exception as e:
+                logger.warning(f"Failed to open scrub sprite {self.sprite_path}: {e}")
+                self.count = 0
+                return None
+        if self.count <= 0:
+            return None
+        tile_w = self._sprite.width // self.columns
+        tile_h = self._sprite.height // self.rows
+        col, row = index % self.columns, index // self.columns
+        return self._sprite.crop((col * tile_w, row * tile_h, (col + 1) * tile_w, (row + 1) * tile_h))
 
 class ThumbnailLabel(QLabel):
     doubleClicked = pyqtSignal()
@@ -18,16 +63,19 @@ class ThumbnailLabel(QLabel):
 
     TIMESTAMP_AREA_HEIGHT = 20
 
-    def __init__(self, gui, video_path, pil_image_original, timestamp_str, parent=None):
+    def __init__(self, gui, video_path, pil_image_original, timestamp_str, parent=None, scrub_strip=None):
         super().__init__(parent)
         self.gui = gui
         self.video_path = video_path
         self.pil_image_original = pil_image_original
+        self.scrub_strip = scrub_strip
+        self._scrub_index = None # Sprite frame shown while the mouse scrubs over the label
 
         self.original_ffmpeg_width = self.pil_image_original.width
         self.original_ffmpeg_height = self.pil_image_original.height
 
         self.timestamp_str = timestamp_str
+        self.thumbnail_timestamp_str = timestamp_str
         self.is_zoomed = False
         self.current_pixmap = None
 
@@ -117,7 +165,36 @@ class ThumbnailLabel(QLabel):
                     self.parentWidget().parentWidget().updateGeometry()
         super().enterEvent(event)
 
+    def mouseMoveEvent(self, event):
+        # Scrub through the video with the mouse position; the thumbnail comes back on leave.
+        if self.scrub_strip is not None and not self.is_zoomed and self.width() > 0:
+            self._show_scrub_frame(event.position().x() / self.width())
+        super().mouseMoveEvent(event)
+
+    def _show_scrub_frame(self, fraction):
+        index = self.scrub_strip.index_at(fraction)
+        if index == self._scrub_index:
+            return
+        frame = self.scrub_strip.frame(index)
+        if frame is None:
+            return
+        target_w, target_h_img = self._calculate_display_dimensions()
+        try:
+            qimage = ImageQt.ImageQt(frame.resize((target_w, target_h_img), Image.Resampling.BILINEAR).convert("RGBA"))
+            self.current_pixmap = QPixmap.fromImage(qimage)
+        except Exception as e:
+            logger.debug(f"Error showing scrub frame {index} for {self.video_path}: {e}")
+            return
+        self._scrub_index = index
+        self.timestamp_str = self.scrub_strip.timestamp_str(index)
+        self.update()
+
     def leaveEvent(self, event):
+        if self._scrub_index is not None:
+            self._scrub_index = None
+            self.timestamp_str = self.thumbnail_timestamp_str
+            if not self.is_zoomed:
+                self._update_display_pixmap_and_size(zoom_factor=1.0)
         if self.is_zoomed:
             self._update_display_pixmap_and_size(zoom_factor=1.0)
             self.is_zoomed = False
@@ -206,6 +283,7 @@ class VideoEntryWidgetPyQt(QFrame):
         self.main_layout.addWidget(self.thumbnails_widget)
 
         self.thumbnail_labels = []
+        self.scrub_strip = ScrubStrip.load(self.video_specific_cache_dir, self.format_duration)
         self.load_thumbnails()
         self.update_selection_appearance(self.checkbox.isChecked())
 
@@ -297,7 +375,7 @@ class VideoEntryWidgetPyQt(QFrame):
 
             try:
                 thumb_label = ThumbnailLabel(self.gui, self.video_path, pil_image, timestamp_str,
-                                             parent=self.thumbnails_widget)
+                                             parent=self.thumbnails_widget, scrub_strip=self.scrub_strip)
                 thumb_label.rightClicked.connect(self.show_context_menu_from_child)
 
                 row = idx % thumbs_per_column
@@ -311,6 +389,20 @@ class VideoEntryWidgetPyQt(QFrame):
         self.updateGeometry()
 
 
+    def set_thumbnails(self, thumbnails_data: list, timestamps: list, duration: float):
+        """Replace the shown thumbnails in place, e.g. when a progressive batch fills in the video."""
+        for thumb_label in self.thumbnail_labels:
+            self.thumbnails_layout.removeWidget(thumb_label)
+            thumb_label.deleteLater()
+        self.thumbnail_labels = []
+        self.thumbnails_data = thumbnails_data
+        self.timestamps = timestamps
+        self.duration = duration
+        self.scrub_strip = ScrubStrip.load(self.video_specific_cache_dir, self.format_duration)
+        self.load_thumbnails()
+        self.update_video_label_text()
+
+
     def format_duration(self, secs: float) -> str:
         try:
             secs_float = float(secs)
@@ -354,6 +446,7 @@ class VideoEntryWidgetPyQt(QFrame):
         else: self.gui.selected_videos.discard(self.video_path)
         self.update_selection_appearance(is_selected)
         self.gui.update_selection_count()
+        schedule_viewport_priority_pyqt(self.gui)
 
 
     def toggle_entry_selection_from_child(self):
@@ -385,6 +478,10 @@ class VideoEntryWidgetPyQt(QFrame):
         copy_path_action = menu.addAction("Copy Filepath")
         menu.addSeparator()
         open_explorer_action = menu.addAction("Open in Explorer")
+        extract_frames_action = None
+        if any(str(name).startswith(f"{SIDECAR_PREFIX}_") for name in self.thumbnails_data):
+            menu.addSeparator()
+            extract_frames_action = menu.addAction("Extract Frames") # Replace the sidecar preview
 
         action = menu.exec(global_pos)
 
@@ -393,6 +490,7 @@ class VideoEntryWidgetPyQt(QFrame):
         elif action == copy_name_action: copy_filename_pyqt(self.gui, self.video_path)
         elif action == copy_path_action: copy_filepath_pyqt(self.gui, self.video_path)
         elif action == open_explorer_action: open_in_explorer_pyqt(self.video_path)
+        elif extract_frames_action is not None and action == extract_frames_action: extract_frames_pyqt(self.gui, self)
 
 def update_output_tab_pyqt(gui, video_path: Path, thumbnail_files: list, timestamps: list,
                            duration: float, video_specific_cache_dir: Path, processing_order: int):
@@ -402,7 +500,12 @@ def update_output_tab_pyqt(gui, video_path: Path, thumbnail_files: list, timesta
         logger.error("output_scrollable_layout not initialized in GUI. Cannot update output tab.")
         return
 
+    # Reported again (progressive batches): update the entry instead of adding a second one.
+    existing_entry = gui.video_entries.get(video_path) if video_path in gui.videos else None
     gui.videos[video_path] = thumbnail_files
+    if existing_entry is not None:
+        existing_entry.set_thumbnails(thumbnail_files, timestamps, duration)
+        return
 
     try:
         video_entry = VideoEntryWidgetPyQt(gui, video_path, thumbnail_files, timestamps, duration,
@@ -413,6 +516,7 @@ def update_output_tab_pyqt(gui, video_path: Path, thumbnail_files: list, timesta
         video_entry.set_display_order(initial_display_order)
 
         gui.output_scrollable_layout.addWidget(video_entry)
+        gui.video_entries[video_path] = video_entry
     except Exception as e:
         logger.error(f"Error creating or adding VideoEntryWidgetPyQt for {video_path}: {e}", exc_info=True)
         return
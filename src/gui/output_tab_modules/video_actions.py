@@ -59,6 +59,21 @@ def play_video_pyqt(gui, video_path: Path):
 # Context menu creation is now part of VideoEntryWidgetPyQt
 # These are helper functions for menu actions:
 
+def extract_frames_pyqt(gui, entry):
+    """Replace a video's sidecar preview with extracted frames.
+
+    The video goes through the regular batch pipeline: a running batch takes it up next, otherwise
+    a batch of just the requested videos is started. The entry stays where it is; the processor
+    reports the new frames through its update callback and update_output_tab_pyqt refreshes it in place.
+    """
+    from src.gui.input_tab_modules.progress import start_requested_extraction_pyqt
+    processor = getattr(gui, 'processor', None)
+    if processor is None:
+        logger.error(f"Cannot extract frames of {entry.video_path}: VideoProcessor not initialized.")
+        return
+    processor.request_full_extraction(entry.video_path)
+    start_requested_extraction_pyqt(gui)
+
 def open_in_explorer_pyqt(video_path: Path):
     """Open the video's parent directory in the system's file explorer."""
     try:
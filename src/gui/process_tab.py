@@ -1,4 +1,5 @@
-from PyQt6.QtWidgets import QTextEdit, QLabel, QVBoxLayout
+from PyQt6.QtWidgets import (QTextEdit, QLabel, QVBoxLayout, QHBoxLayout, QPushButton, QDialog, QTableWidget,
+                             QTableWidgetItem, QHeaderView, QAbstractItemView, QFileDialog, QMessageBox)
 from PyQt6.QtGui import QPixmap, QImage
 from PyQt6.QtCore import Qt
 from pathlib import Path
@@ -21,6 +22,11 @@ def setup_process_tab(gui):
     gui.thumbnail_preview_label.setStyleSheet("QLabel { background-color: gray; border: 1px solid black; }")
     gui.process_frame_layout.addWidget(gui.thumbnail_preview_label, 0, Qt.AlignmentFlag.AlignCenter) # No stretch, centered
 
+    quarantine_button = QPushButton("Failed Videos...")
+    quarantine_button.setToolTip("Videos skipped after failing on an earlier run; retry or export them.")
+    quarantine_button.clicked.connect(lambda: show_quarantine_dialog(gui))
+    gui.process_frame_layout.addWidget(quarantine_button, 0, Qt.AlignmentFlag.AlignRight)
+
 def update_process_text_pyqt(gui, message):
     """Update the process tab text with a new message for PyQt6."""
     if gui.process_text_edit:
@@ -49,4 +55,73 @@ def update_thumbnail_preview_pyqt(gui, thumbnail_path: Path):
             gui.thumbnail_preview_label.setText("Preview Error")
             update_process_text_pyqt(gui, f"Error displaying thumbnail {thumbnail_path}: {e}\n")
     elif gui.thumbnail_preview_label:
-        gui.thumbnail_preview_label.setText("Preview N/A")
\ No newline at end of file
+        gui.thumbnail_preview_label.setText("Preview N/A")
+
+
+class QuarantineDialog(QDialog):
+    """Lists the processor's quarantined videos and lets the user retry or export them."""
+    COLUMNS = (('video', "Video"), ('failure', "Failure"), ('attempts', "Attempts"), ('last_try', "Last Try"),
+               ('detail', "Detail"))
+
+    def __init__(self, gui):
+        super().__init__(gui)
+        self.processor = gui.processor
+        self.quarantine = gui.processor.quarantine
+        self.setWindowTitle("Failed Videos")
+        self.resize(900, 400)
+        layout = QVBoxLayout(self)
+
+        self.table = QTableWidget(0, len(self.COLUMNS))
+        self.table.setHorizontalHeaderLabels([title for _, title in self.COLUMNS])
+        self.table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.table.horizontalHeader().setSectionResizeMode(len(self.COLUMNS) - 1, QHeaderView.ResizeMode.Stretch)
+        layout.addWidget(self.table)
+
+        buttons = QHBoxLayout()
+        for text, handler in (("Retry Selected", self.retry_selected), ("Retry All", self.retry_all),
+                              ("Export CSV...", self.export_csv), ("Close", self.accept)):
+            button = QPushButton(text)
+            button.clicked.connect(handler)
+            buttons.addWidget(button)
+        layout.addLayout(buttons)
+        self.refresh()
+
+    def refresh(self):
+        entries = self.quarantine.entries()
+        self.table.setRowCount(len(entries))
+        for row, entry in enumerate(entries):
+            for column, (key, _) in enumerate(self.COLUMNS):
+                self.table.setItem(row, column, QTableWidgetItem(str(entry.get(key, ''))))
+        self.table.resizeColumnsToContents()
+
+    def retry_selected(self):
+        rows = {index.row() for index in self.table.selectionModel().selectedRows()}
+        videos = [Path(self.table.item(row, 0).text()) for row in rows]
+        if videos:
+            self._release(videos)
+
+    def retry_all(self):
+        self._release(None)
+
+    def _release(self, videos):
+        removed = self.processor.retry_quarantined(videos)
+        logger.info(f"Quarantine: {removed} videos will be retried on the next run.")
+        self.refresh()
+
+    def export_csv(self):
+        file_path, _ = QFileDialog.getSaveFileName(self, "Export Failed Videos", "failed_videos.csv", "CSV Files (*.csv)")
+        if not file_path:
+            return
+        try:
+            self.quarantine.export_csv(Path(file_path))
+        except OSError as e:
+            QMessageBox.warning(self, "Export Failed", f"Could not write {file_path}:\n{e}")
+
+
+def show_quarantine_dialog(gui):
+    """Open the list of quarantined videos of the current processor (PyQt6)."""
+    if not getattr(gui, 'processor', None):
+        QMessageBox.information(gui, "Info", "The video processor is not initialized.")
+        return
+    QuarantineDialog(gui).exec()
@@ -21,6 +21,7 @@ from src.gui.output_tab import setup_output_tab
 from src.gui.process_tab import setup_process_tab
 from src.gui.input_tab_modules.distribution import toggle_peak_concentration_pyqt, update_distribution_graph_pyqt
 from src.gui.output_tab_modules.selection import delete_selected_pyqt, delete_unselected_pyqt, clear_all_selection_pyqt
+from src.gui.output_tab_modules.canvas import schedule_viewport_priority_pyqt
 from src.version import __version__
 from src.distribution_enum import Distribution
 from .worker import WorkerSignals, VideoProcessingWorker
@@ -35,6 +36,7 @@ class VideoThumbnailGUI(QMainWindow):
     _processor_update_signal = pyqtSignal(Path, list, list, float)
     MAX_UPDATES_PER_CYCLE = 3
     UPDATE_TIMER_INTERVAL = 50
+    MAX_ROWS_PER_CYCLE = 200 # Entries without thumbnails (lazy batches) are cheap, so many are added per tick
 
     def __init__(self):
         super().__init__()
@@ -43,6 +45,8 @@ class VideoThumbnailGUI(QMainWindow):
         self.base_window_title = f"Video Thumbnail Manager by Kerasty ver. {__version__}"
 
         self.videos = {}
+        self.video_entries = {} # Path -> VideoEntryWidgetPyQt, valid while the path is in self.videos
+        self._credited_thumbnails = {} # Path -> thumbnails counted in processed_thumbnails_count
         self.selected_videos = set()
         self.current_thumbnail_pixmap = None
         self.total_videos_scanned = 0
@@ -81,6 +85,11 @@ class VideoThumbnailGUI(QMainWindow):
         self._output_update_timer.setSingleShot(True)
         self._output_update_timer.setInterval(self.UPDATE_TIMER_INTERVAL)
         self._output_update_timer.timeout.connect(self._process_queued_output_updates)
+        self._video_row_queue = deque()
+        self._video_row_timer = QTimer(self)
+        self._video_row_timer.setSingleShot(True)
+        self._video_row_timer.setInterval(self.UPDATE_TIMER_INTERVAL)
+        self._video_row_timer.timeout.connect(self._add_queued_video_rows)
 
         if hasattr(self, 'excluded_words_var') and self.excluded_words_var:
             self.excluded_words_var.setText(self.config.get('excluded_words'))
@@ -113,6 +122,8 @@ class VideoThumbnailGUI(QMainWindow):
         self.cache_folder_var = None;
         self.thumbs_var = None; self.thumbs_per_column_var = None;
         self.width_var = None; self.quality_var = None; self.concurrent_var = None;
+        self.thumbnail_format_var = None; self.encode_preset_var = None; self.decode_preset_var = None;
+        self.autotune_var = None;
         self.zoom_var = None; self.min_size_var = None; self.min_size_unit_var = None;
         self.min_duration_var = None; self.min_duration_unit_var = None;
         self.use_peak_concentration_var = None; self.peak_pos_var = None; self.peak_pos_label = None;
@@ -121,6 +132,7 @@ class VideoThumbnailGUI(QMainWindow):
         self.distribution_canvas_widget = None;
         self.progress_bar = None; self.eta_label = None; self.completion_label = None;
         self.qr_label = None; self.qr_pixmap = None;
+        self.stop_button = None; self.pause_button = None
 
         self.selection_count_label = None
         self.last_deleted_label = None
@@ -359,6 +371,8 @@ class VideoThumbnailGUI(QMainWindow):
         except TypeError: pass
         try: actual_signals.processing_complete.disconnect()
         except TypeError: pass
+        try: actual_signals.video_rows.disconnect()
+        except TypeError: pass
 
         actual_signals.progress.connect(self.update_progress_bar_slot)
         actual_signals.thumbnail_progress.connect(self.update_process_tab_thumbnail_progress_slot)
@@ -368,6 +382,7 @@ class VideoThumbnailGUI(QMainWindow):
         actual_signals.command.connect(self.update_command_slot)
         actual_signals.scan_complete.connect(self.on_scan_complete_slot)
         actual_signals.processing_complete.connect(self.on_processing_complete_slot)
+        actual_signals.video_rows.connect(self.add_video_rows_slot)
         logger.debug("Connected signals from processing_worker.")
 
 
@@ -393,7 +408,26 @@ class VideoThumbnailGUI(QMainWindow):
                 distribution=self.config.get('thumbnail_distribution').value,
                 excluded_words_str=excluded_words_str,
                 excluded_words_regex=excluded_words_regex,
-                excluded_words_match_full_path=excluded_words_match_full_path)
+                excluded_words_match_full_path=excluded_words_match_full_path,
+                thumbnail_format=self.config.get('thumbnail_format'),
+                encode_preset=self.config.get('encode_preset'),
+                decode_preset=self.config.get('decode_preset'),
+                autotune_concurrency=self.config.get('autotune_concurrency'),
+                min_ffmpeg_processes=self.config.get('min_ffmpeg_processes'),
+                max_ffmpeg_processes=self.config.get('max_ffmpeg_processes'),
+                video_time_budget=self.config.get('video_time_budget'),
+                master_width=self.config.get('master_width'),
+                scrub_frames=self.config.get('scrub_frames'),
+                frame_scoring=self.config.get('frame_scoring'),
+                keyframe_index=self.config.get('keyframe_index'),
+                cover_art=self.config.get('cover_art'),
+                sidecar_thumbnails=self.config.get('sidecar_thumbnails'),
+                ffmpeg_memory_limit_mb=self.config.get('ffmpeg_memory_limit_mb'),
+                ffmpeg_cpu_limit_seconds=self.config.get('ffmpeg_cpu_limit_seconds'),
+                ffmpeg_nice=self.config.get('ffmpeg_nice'),
+                ffmpeg_io_priority=self.config.get('ffmpeg_io_priority'),
+                progressive=self.config.get('progressive_generation'),
+                lazy=self.config.get('lazy_thumbnails'))
             logger.debug(f"VideoProcessor reinitialized. Effective cache_dir: {self.processor.cache_dir if self.processor else 'N/A'}")
         except Exception as e:
             logger.error(f"Failed to reinitialize VideoProcessor: {e}", exc_info=True)
@@ -453,13 +487,14 @@ class VideoThumbnailGUI(QMainWindow):
             if not self.processor:
                 logger.error(f"Processor unavailable for {video_path}"); continue
             video_specific_cache_dir = self.processor.cache_dir / video_path.name
-            self.video_widget_processing_order_counter += 1
+            if video_path not in self.videos: # Updates of a shown video keep its processing order
+                self.video_widget_processing_order_counter += 1
             current_processing_order = self.video_widget_processing_order_counter
             update_output_tab_pyqt(self, video_path, thumbnails, timestamps, duration, video_specific_cache_dir, current_processing_order)
             items_processed_this_cycle += 1
             actual_thumbs_per_video = self.processor.thumbnails_per_video if self.processor else self.config.get('thumbnails_per_video')
             if actual_thumbs_per_video <= 0: actual_thumbs_per_video = 1
-            self.processed_thumbnails_count += actual_thumbs_per_video
+            self.processed_thumbnails_count += self._progress_credit(video_path, thumbnails, actual_thumbs_per_video)
             if self.total_thumbnails_to_generate > 0:
                 overall_progress = min(100.0, (self.processed_thumbnails_count / self.total_thumbnails_to_generate) * 100.0)
                 self.update_progress_bar_slot(int(round(overall_progress)))
@@ -467,12 +502,40 @@ class VideoThumbnailGUI(QMainWindow):
             if self.total_thumbnails_to_generate > 0 and self.start_time is not None: self.update_eta_on_progress()
             if self.current_sort_key == "Original Order": self._update_all_video_entry_display_orders()
             self.update_selection_count()
+            schedule_viewport_priority_pyqt(self) # New entries may have appeared on screen
             if hasattr(self, 'output_scrollable_widget') and self.output_scrollable_widget: self.output_scrollable_widget.adjustSize()
         if self._output_update_queue: self._output_update_timer.start()
         else:
             if items_processed_this_cycle > 0 and hasattr(self, 'output_scrollable_widget') and self.output_scrollable_widget: self.output_scrollable_widget.adjustSize()
         QApplication.processEvents()
 
+    def add_video_rows_slot(self, rows: list):
+        """List the videos of a lazy batch as entries without thumbnails; they are filled in when shown."""
+        self._video_row_queue.extend(rows)
+        if not self._video_row_timer.isActive(): self._video_row_timer.start()
+
+    def _add_queued_video_rows(self):
+        from src.gui.output_tab_modules.thumbnails import update_output_tab_pyqt
+        if not self.processor:
+            self._video_row_queue.clear(); return
+        for _ in range(min(self.MAX_ROWS_PER_CYCLE, len(self._video_row_queue))):
+            video_path, duration = self._video_row_queue.popleft()
+            if video_path in self.videos: continue # Its thumbnails arrived first
+            self.video_widget_processing_order_counter += 1
+            update_output_tab_pyqt(self, video_path, [], [], duration, self.processor.cache_dir / video_path.name,
+                                   self.video_widget_processing_order_counter)
+        if self._video_row_queue: self._video_row_timer.start()
+        else: self.update_selection_count()
+        schedule_viewport_priority_pyqt(self)
+
+    def _progress_credit(self, video_path: Path, thumbnails: list, thumbs_per_video: int) -> int:
+        """Thumbnails of a video not counted in the progress yet; a partial (progressive) report counts what it shows."""
+        partial = self.processor is not None and video_path in self.processor.partial_videos
+        target = min(len(thumbnails), thumbs_per_video) if partial else thumbs_per_video
+        credited = self._credited_thumbnails.get(video_path, 0)
+        self._credited_thumbnails[video_path] = max(credited, target)
+        return max(0, target - credited)
+
     def _process_one_queued_output_update(self):
         # ... (method remains the same) ...
         if not self._output_update_queue: return
@@ -481,12 +544,13 @@ class VideoThumbnailGUI(QMainWindow):
         if not self.processor:
             logger.error(f"Processor unavailable for {video_path}"); return
         video_specific_cache_dir = self.processor.cache_dir / video_path.name
-        self.video_widget_processing_order_counter += 1
+        if video_path not in self.videos:
+            self.video_widget_processing_order_counter += 1
         current_processing_order = self.video_widget_processing_order_counter
         update_output_tab_pyqt(self, video_path, thumbnails, timestamps, duration, video_specific_cache_dir, current_processing_order)
         actual_thumbs_per_video = self.processor.thumbnails_per_video if self.processor else self.config.get('thumbnails_per_video')
         if actual_thumbs_per_video <= 0: actual_thumbs_per_video = 1
-        self.processed_thumbnails_count += actual_thumbs_per_video
+        self.processed_thumbnails_count += self._progress_credit(video_path, thumbnails, actual_thumbs_per_video)
         if self.total_thumbnails_to_generate > 0:
             overall_progress = min(100.0, (self.processed_thumbnails_count / self.total_thumbnails_to_generate) * 100.0)
             self.update_progress_bar_slot(int(round(overall_progress)))
@@ -607,6 +671,7 @@ class VideoThumbnailGUI(QMainWindow):
         self.total_thumbnails_to_generate = total_thumbnails_to_be_generated
         self.video_widget_processing_order_counter = 0
         self.processed_thumbnails_count = 0
+        self._credited_thumbnails = {}
         self.max_display_order_ever_assigned = 0
         if hasattr(self, 'process_text_edit') and self.process_text_edit:
             self.process_text_edit.append(f"動画スキャン完了: {self.total_videos_scanned} 件の動画を検出 (スキャン時間: {scan_duration_seconds:.2f}秒)\n")
@@ -622,6 +687,7 @@ class VideoThumbnailGUI(QMainWindow):
             if hasattr(self, 'completion_label') and self.completion_label:
                 self.completion_label.setText(f"Scan complete. Processing {self.total_videos_scanned} videos...")
             self.setWindowTitle(f"{self.base_window_title} (Found {self.total_videos_scanned} videos)")
+            self._show_pause_state(bool(self.processing_worker and self.processing_worker.paused)) # Paused during the scan
             self.start_time = time.time()
         output_tab_index = self.get_tab_index_by_text_prefix("Output")
         if output_tab_index != -1 and hasattr(self.notebook, 'setTabText'):
@@ -663,6 +729,9 @@ class VideoThumbnailGUI(QMainWindow):
         logger.debug("_cleanup_worker_thread called.")
         worker, thread = self.processing_worker, self.worker_thread
         self.processing_worker, self.worker_thread = None, None
+        if self.stop_button: self.stop_button.setEnabled(False)
+        if self.pause_button: self.pause_button.setEnabled(False)
+        self._show_pause_state(False)
         if thread:
             if thread.isRunning():
                 logger.debug("Requesting worker thread to quit...")
@@ -677,12 +746,37 @@ class VideoThumbnailGUI(QMainWindow):
         logger.debug("Worker objects set to None.")
 
 
+    def stop_processing(self):
+        if not self.processing_worker: return
+        logger.info("Stop button clicked, stopping the worker.")
+        self.processing_worker.stop()
+        if self.stop_button: self.stop_button.setEnabled(False)
+        if self.pause_button: self.pause_button.setEnabled(False)
+        self._show_pause_state(False) # stop() also ends a pause
+        if self.completion_label: self.completion_label.setText("Stopping...")
+
+    def toggle_pause_processing(self):
+        if not self.processing_worker: return
+        if self.processing_worker.paused: self.processing_worker.resume()
+        else: self.processing_worker.pause()
+        # Shown from the processor's actual state rather than assumed from the click.
+        paused = self.processing_worker.paused
+        self._show_pause_state(paused)
+        if self.completion_label: self.completion_label.setText("Paused. FFmpeg processes are suspended." if paused else "Resumed.")
+
+    def _show_pause_state(self, paused: bool):
+        if self.pause_button: self.pause_button.setText("Resume" if paused else "Pause")
+        title = self.windowTitle().removesuffix(" (Paused)")
+        self.setWindowTitle(f"{title} (Paused)" if paused else title)
+
     def start_processing_wrapper(self):
         # ... (method remains the same) ...
         from src.gui.input_tab_modules.progress import start_processing_pyqt
         logger.info("Start button clicked, calling start_processing_pyqt.")
         try:
             self.video_widget_processing_order_counter = 0; self.processed_thumbnails_count = 0
+            self._credited_thumbnails = {}
+            self._video_row_queue.clear(); self._video_row_timer.stop()
             self.total_thumbnails_to_generate = 0; self.total_videos_scanned = 0
             self.start_time = None; self.max_display_order_ever_assigned = 0
             self.update_last_deleted_label(None); self.last_keyword_search_index = -1
@@ -698,6 +792,8 @@ class VideoThumbnailGUI(QMainWindow):
             if output_tab_index != -1 and hasattr(self.notebook, 'setTabText'):
                 self.notebook.setTabText(output_tab_index, "Output (Scanning...)")
             start_processing_pyqt(self)
+            if self.stop_button: self.stop_button.setEnabled(self.processing_worker is not None)
+            if self.pause_button: self.pause_button.setEnabled(self.processing_worker is not None); self.pause_button.setText("Pause")
         except Exception as e:
             logger.error(f"Error during start_processing_wrapper: {e}", exc_info=True)
             self.report_error_slot_detailed("Processing Start", f"Failed to start processing:\n{e}")
@@ -16,12 +16,15 @@ class WorkerSignals(QObject):
     scan_complete = pyqtSignal(int, int, float)
     # processing_complete: thumbnail_generation_duration_seconds
     processing_complete = pyqtSignal(float)
+    # video_rows: [(video_path, duration), ...] listed up front by a lazy batch
+    video_rows = pyqtSignal(list)
 
 
 class VideoProcessingWorker(QObject):
-    def __init__(self, gui_ref):
+    def __init__(self, gui_ref, videos=None):
         super().__init__()
         self.gui = gui_ref
+        self.videos = videos # Process these videos without scanning (e.g. requested frame extractions)
         self.signals = WorkerSignals()
         self._is_running = True
         self.thumbnail_gen_start_time_for_duration_calc = 0.0
@@ -33,6 +36,33 @@ class VideoProcessingWorker(QObject):
         if hasattr(self.gui, 'processor') and self.gui.processor and hasattr(self.gui.processor, 'request_stop'):
             self.gui.processor.request_stop()
 
+    def pause(self):
+        """Hold the scan or batch: no new FFmpeg process starts and the running ones are suspended.
+
+        The scanned videos and the processing queue stay in memory, so resume() continues where
+        the batch left off. Called directly from the GUI thread, like stop().
+        """
+        if self._is_running and self.gui.processor:
+            logger.info("VideoProcessingWorker: Pausing.")
+            self.gui.processor.pause()
+
+    def resume(self):
+        if self.gui.processor:
+            logger.info("VideoProcessingWorker: Resuming.")
+            self.gui.processor.resume()
+
+    @property
+    def paused(self) -> bool:
+        return bool(self.gui.processor and self.gui.processor.paused)
+
+    def prioritize_videos(self, video_paths):
+        """Hand the videos the Output tab shows or has selected to the processor, most urgent first.
+
+        Called directly from the GUI thread (this worker's own thread is busy in process_videos_thread).
+        """
+        if self._is_running and self.gui.processor:
+            self.gui.processor.prioritize(video_paths)
+
     def _handle_ffmpeg_batch_completed(self):
         """Called when the processor's batch of FFmpeg tasks completes."""
         if self._is_running:
@@ -62,6 +92,17 @@ class VideoProcessingWorker(QObject):
                 # No processing_complete signal here, finally block will handle it.
                 return
 
+            if self.videos is not None:
+                logger.info(f"VideoProcessingWorker: Processing {len(self.videos)} requested videos without a scan.")
+                self.thumbnail_gen_start_time_for_duration_calc = time.time()
+                self.gui.processor.process_videos(
+                    self.videos,
+                    error_callback=lambda v, e: self.signals.error.emit(str(v), e),
+                    command_callback=lambda cmd, thumb, vid: self.signals.command.emit(cmd, str(thumb), str(vid)),
+                    completion_callback=self._handle_ffmpeg_batch_completed,
+                    stop_flag_check=lambda: not self._is_running)
+                return
+
             # --- Step 1: Scan for videos ---
             if not hasattr(self.gui, 'folder_to_scan_for_worker') or not self.gui.folder_to_scan_for_worker:
                 logger.error("VideoProcessingWorker: Folder to scan not provided.")
@@ -105,7 +146,8 @@ class VideoProcessingWorker(QObject):
                 error_callback=lambda v, e: self.signals.error.emit(str(v), e),
                 command_callback=lambda cmd, thumb, vid: self.signals.command.emit(cmd, str(thumb), str(vid)),
                 completion_callback=self._handle_ffmpeg_batch_completed, # Use internal handler
-                stop_flag_check=lambda: not self._is_running
+                stop_flag_check=lambda: not self._is_running,
+                rows_callback=lambda rows: self.signals.video_rows.emit(rows)
             )
             # Note: process_videos is blocking. If it completes (or is interrupted and finishes),
             # _handle_ffmpeg_batch_completed will set self.ffmpeg_batch_duration.
@@ -1,5 +1,6 @@
 import sys
 import argparse
+import multiprocessing
 from PyQt6.QtWidgets import QApplication
 from loguru import logger
 from pathlib import Path
@@ -25,5 +26,6 @@ def main():
     sys.exit(app.exec())
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support() # Master frame derivation uses 'spawn' worker processes, also in frozen builds
     from pathlib import Path # main() 内の logger.add のために追加
     main()
\ No newline at end of file
@@ -0,0 +1,18 @@
+from enum import Enum
+
+class ThumbnailFormat(Enum):
+    """Enum for thumbnail output image formats."""
+    JPEG = 'jpeg'
+    WEBP = 'webp'
+    AVIF = 'avif'
+
+class EncodePreset(Enum):
+    """Enum for thumbnail encoder presets, trading file size against encoding speed."""
+    SPEED = 'speed'
+    BALANCED = 'balanced'
+    SIZE = 'size'
+
+class DecodePreset(Enum):
+    """Enum for FFmpeg decode presets, trading frame quality against decoding cost."""
+    STANDARD = 'standard'
+    DRAFT = 'draft'
@@ -0,0 +1,141 @@
+import time
+from pathlib import Path
+
+from loguru import logger
+
+try:
+    import psutil # Optional; /proc/stat is used on Linux when it is missing
+except ImportError:
+    psutil = None
+
+PROC_STAT_PATH = Path('/proc/stat')
+
+
+class CpuSampler:
+    """Measures CPU utilisation and I/O wait between two calls of sample().
+
+    Uses /proc/stat on Linux and psutil elsewhere when it is installed. If neither is available
+    sample() returns None and the tuner relies on throughput alone.
+    """
+
+    def __init__(self):
+        self._last = self._read_times()
+
+    @staticmethod
+    def _read_times():
+        """Return (busy, iowait, total) cumulative CPU times, or None if unavailable."""
+        try:
+            if PROC_STAT_PATH.exists():
+                with open(PROC_STAT_PATH, 'r') as f:
+                    fields = [float(x) for x in f.readline().split()[1:]]
+                # user nice system idle iowait irq softirq steal (guest times are included in user)
+                idle, iowait = fields[3], fields[4] if len(fields) > 4 else 0.0
+                total = sum(fields[:8])
+                return total - idle - iowait, iowait, total
+            if psutil is not None:
+                times = psutil.cpu_times()
+                idle, iowait = times.idle, getattr(times, 'iowait', 0.0)
+                total = sum(times)
+                return total - idle - iowait, iowait, total
+        except Exception as e:
+            logger.debug(f"CpuSampler: Could not read CPU times: {e}")
+        return None
+
+    def sample(self):
+        """Return (cpu_utilisation, iowait_fraction) since the previous sample, or None."""
+        current = self._read_times()
+        last, self._last = self._last, current
+        if current is None or last is None:
+            return None
+        total = current[2] - last[2]
+        if total <= 0:
+            return None
+        return (current[0] - last[0]) / total, (current[1] - last[1]) / total
+
+
+class ConcurrencyTuner:
+    """Hill-climbing controller for the number of concurrent FFmpeg processes.
+
+    Every interval it compares the thumbnail throughput of the current setting with the previous
+    one: while throughput improves it keeps stepping in the same direction, when it drops it
+    reverses. High I/O wait forces a step down (the disk, not the CPU, is the bottleneck) and a
+    saturated CPU blocks further growth.
+    """
+
+    INTERVAL_SECONDS = 5.0
+    MIN_COMPLETIONS = 4 # Completions needed before an interval's throughput is trusted
+    IMPROVEMENT = 0.05 # Relative throughput change treated as a real difference
+    IOWAIT_HIGH = 0.3
+    CPU_SATURATED = 0.95
+
+    def __init__(self, initial, min_workers, max_workers, clock=time.monotonic):
+        self.min_workers = max(1, min_workers)
+        self.max_workers = max(self.min_workers, max_workers)
+        self.value = min(self.max_workers, max(self.min_workers, initial))
+        self.direction = 1
+        self.sampler = CpuSampler()
+        self.clock = clock # The supervisor's clock, so a paused batch does not count as a slow interval
+        self.curve = [] # (concurrency, thumbnails/s, cpu utilisation, iowait) per interval
+        self._previous_throughput = None
+        self._interval_start = self.clock()
+        self._completions = 0
+
+    def record_completion(self):
+        self._completions += 1
+
+    def update(self):
+        """Close the current interval if it is long enough and return the concurrency to use next.
+
+        Returns:
+            int: Number of concurrent FFmpeg processes.
+        """
+        elapsed = self.clock() - self._interval_start
+        if elapsed < self.INTERVAL_SECONDS or self._completions < max(self.MIN_COMPLETIONS, self.value):
+            return self.value
+
+        throughput = self._completions / elapsed
+        cpu = self.sampler.sample()
+        cpu_util, iowait = cpu if cpu else (None, None)
+        self.curve.append((self.value, throughput, cpu_util, iowait))
+
+        previous = self._previous_throughput
+        if previous is not None and throughput < previous * (1 - self.IMPROVEMENT):
+            self.direction = -self.direction # The last step made things worse; go back
+        if iowait is not None and iowait > self.IOWAIT_HIGH:
+            self.direction = -1
+        step = self.direction
+        if step > 0 and cpu_util is not None and cpu_util > self.CPU_SATURATED:
+            step = 0 # No CPU headroom to grow into
+
+        new_value = min(self.max_workers, max(self.min_workers, self.value + step))
+        if new_value != self.value:
+            logger.debug(f"ConcurrencyTuner: {self.value} -> {new_value} processes "
+                         f"({throughput:.2f} thumbs/s, cpu {self._percent(cpu_util)}, iowait {self._percent(iowait)})")
+        elif step != 0:
+            self.direction = -self.direction # At a bound; probe the other way next time
+        self.value = new_value
+        self._previous_throughput = throughput
+        self._interval_start = self.clock()
+        self._completions = 0
+        return self.value
+
+    def best_value(self):
+        """Concurrency with the highest mean throughput observed so far (the current value if none)."""
+        by_value = {}
+        for value, throughput, _, _ in self.curve:
+            by_value.setdefault(value, []).append(throughput)
+        if not by_value:
+            return self.value
+        return max(by_value, key=lambda v: sum(by_value[v]) / len(by_value[v]))
+
+    @staticmethod
+    def _percent(fraction):
+        return "n/a" if fraction is None else f"{fraction * 100:.0f}%"
+
+    def log_summary(self):
+        if not self.curve:
+            logger.info(f"ConcurrencyTuner: Batch too short to tune, stayed at {self.value} processes.")
+            return
+        curve_str = ", ".join(f"{value}:{throughput:.2f}/s" for value, throughput, _, _ in self.curve)
+        logger.info(f"ConcurrencyTuner: Chose {self.best_value()} concurrent FFmpeg processes "
+                    f"(bounds {self.min_workers}-{self.max_workers}). Throughput curve: {curve_str}")
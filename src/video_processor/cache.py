@@ -4,12 +4,13 @@ from pathlib import Path
 
 from loguru import logger
 
-def get_cache_path(processor, video_path: Path) -> Path:
+def get_cache_path(processor, video_path: Path, create=True) -> Path:
     """Generate the cache path for a video's thumbnails using the processor's cache_dir.
 
     Args:
         processor: The VideoProcessor instance (contains the base cache_dir).
         video_path (Path): Path to the video file.
+        create (bool): Create the video's cache directory if it does not exist yet.
 
     Returns:
         Path: Path to the cache JSON file.
@@ -17,7 +18,8 @@ def get_cache_path(processor, video_path: Path) -> Path:
     # Use processor.cache_dir as the root for all caches
     # Create a subdirectory for each video within the main cache_dir
     cache_base_for_video = processor.cache_dir / video_path.name
-    cache_base_for_video.mkdir(parents=True, exist_ok=True) # Ensure processor.cache_dir and video-specific subdir exist
+    if create:
+        cache_base_for_video.mkdir(parents=True, exist_ok=True) # Ensure processor.cache_dir and video-specific subdir exist
     return cache_base_for_video / f"{video_path.name}.json"
 
 def clear_cache(processor, video_path: Path):
@@ -48,7 +50,7 @@ def is_cache_valid(processor, video_path: Path) -> bool:
     Returns:
         bool: True if the cache is valid, False otherwise.
     """
-    cache_file_path = get_cache_path(processor, video_path) # Use the updated get_cache_path
+    cache_file_path = get_cache_path(processor, video_path, create=False) # Checking creates nothing
     if not cache_file_path.exists():
         return False
     try:
@@ -58,14 +60,25 @@ def is_cache_valid(processor, video_path: Path) -> bool:
         # The base directory for this video's thumbnails is processor.cache_dir / video_path.name
         thumbnails_base_dir = processor.cache_dir / video_path.name
         thumbnail_paths = [thumbnails_base_dir / thumb for thumb in cache.get('thumbnails', [])]
+        # The cover art setting only matters for videos that have cover art (unknown without a scan).
+        info = processor.video_info.get(video_path)
+        has_cover = info is None or bool(info.cover_stream)
 
+        from .thumbnail import cached_plan_matches # thumbnail.py imports this module
         is_valid = (
                 cache.get('thumbnails_per_video') == processor.thumbnails_per_video and
                 cache.get('thumbnail_width') == processor.thumbnail_width and
                 cache.get('thumbnail_quality') == processor.thumbnail_quality and
-                cache.get('peak_pos') == processor.peak_pos and
-                cache.get('concentration') == processor.concentration and
-                cache.get('distribution') == processor.distribution.value and
+                cached_plan_matches(processor, cache) and
+                # Entries written before formats were configurable are JPEG/balanced.
+                cache.get('thumbnail_format', 'jpeg') == processor.thumbnail_format.value and
+                cache.get('encode_preset', 'balanced') == processor.encode_preset.value and
+                cache.get('decode_preset', 'standard') == processor.decode_preset.value and
+                cache.get('frame_scoring', False) == processor.frame_scoring and
+                (not has_cover or cache.get('cover_art', False) == processor.cover_art) and
+                # An imported sidecar preview is kept until sidecars are disabled or the frames are requested.
+                (not cache.get('sidecar') or (processor.sidecar_thumbnails and
+                                              video_path not in processor.full_extraction)) and
                 all(path.exists() for path in thumbnail_paths)
         )
         logger.debug(f"Cache for {video_path} (in {thumbnails_base_dir}) is {'valid' if is_valid else 'invalid'}")
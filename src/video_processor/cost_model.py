@@ -0,0 +1,109 @@
+import json
+import math
+from pathlib import Path
+
+from loguru import logger
+
+TIMING_HISTORY_FILENAME = "_vtm_timing_history.json"
+
+# Relative decode cost per codec compared to H.264 (software decoding, single frame after a seek).
+CODEC_COST_FACTORS = {
+    'h264': 1.0,
+    'hevc': 1.6,
+    'av1': 2.0,
+    'vp9': 1.4,
+    'vp8': 0.9,
+    'mpeg4': 0.6,
+    'mpeg2video': 0.6,
+    'mpeg1video': 0.5,
+    'msmpeg4v3': 0.6,
+    'wmv3': 0.8,
+    'vc1': 1.0,
+    'prores': 1.2,
+}
+DEFAULT_CODEC_COST_FACTOR = 1.0
+
+BASE_SECONDS_PER_THUMB = 0.15 # Process start-up, container parsing, encode
+DECODE_SECONDS_PER_1080P_THUMB = 0.35 # Seek + decode of one 1080p H.264 frame
+SECONDS_PER_GB = 0.05 # Index reads grow with file size (noticeable on network storage)
+FULL_HD_PIXELS = 1920 * 1080
+HISTORY_SMOOTHING = 0.3 # Weight of the newest run in the moving average
+
+
+def resolution_class(height: int) -> str:
+    if height <= 0:
+        return "unknown"
+    for limit, label in ((480, "sd"), (720, "720p"), (1080, "1080p"), (1440, "1440p"), (2160, "2160p")):
+        if height <= limit:
+            return label
+    return "8k"
+
+
+def history_key(info) -> str:
+    """Group videos with similar decode cost: codec plus resolution class, e.g. 'hevc:2160p'."""
+    return f"{info.codec or 'unknown'}:{resolution_class(info.height)}"
+
+
+class CostModel:
+    """Estimates the FFmpeg time needed to thumbnail a video.
+
+    Estimates start from a heuristic on resolution, codec and file size and are replaced by the
+    measured seconds per thumbnail of past runs once videos of the same codec and resolution class
+    have been processed. The measurements are persisted in the cache directory.
+    """
+
+    def __init__(self, cache_dir: Path):
+        self.history_path = cache_dir / TIMING_HISTORY_FILENAME
+        self.history = {}
+        self._load()
+
+    def _load(self):
+        if not self.history_path.exists():
+            return
+        try:
+            with open(self.history_path, 'r') as f:
+                self.history = json.load(f)
+            logger.debug(f"CostModel: Loaded {len(self.history)} timing history entries from {self.history_path}")
+        except Exception as e:
+            logger.warning(f"CostModel: Could not read timing history {self.history_path}: {e}. Starting fresh.")
+            self.history = {}
+
+    def save(self):
+        try:
+            with open(self.history_path, 'w') as f:
+                json.dump(self.history, f, indent=4)
+        except Exception as e:
+            logger.warning(f"CostModel: Could not write timing history {self.history_path}: {e}")
+
+    def heuristic_seconds_per_thumb(self, info) -> float:
+        pixel_ratio = info.pixels / FULL_HD_PIXELS if info.pixels > 0 else 1.0
+        codec_factor = CODEC_COST_FACTORS.get(info.codec, DEFAULT_CODEC_COST_FACTOR)
+        size_gb = info.size_bytes / (1024 ** 3)
+        return (BASE_SECONDS_PER_THUMB
+                + DECODE_SECONDS_PER_1080P_THUMB * pixel_ratio * codec_factor
+                + SECONDS_PER_GB * math.log2(1 + size_gb))
+
+    def seconds_per_thumb(self, info) -> float:
+        entry = self.history.get(history_key(info))
+        if entry and entry.get('seconds_per_thumb', 0) > 0:
+            return entry['seconds_per_thumb']
+        return self.heuristic_seconds_per_thumb(info)
+
+    def estimate(self, info, num_thumbnails: int) -> float:
+        """Estimated FFmpeg seconds to extract `num_thumbnails` thumbnails of a video."""
+        if info is None: # Not probed during the scan; assume a 1080p H.264 file.
+            return (BASE_SECONDS_PER_THUMB + DECODE_SECONDS_PER_1080P_THUMB) * num_thumbnails
+        return self.seconds_per_thumb(info) * num_thumbnails
+
+    def record(self, info, seconds_per_thumb: float):
+        """Fold a measured per-thumbnail time into the history of the video's codec/resolution class."""
+        if info is None or seconds_per_thumb <= 0:
+            return
+        key = history_key(info)
+        entry = self.history.get(key)
+        if entry and entry.get('seconds_per_thumb', 0) > 0:
+            entry['seconds_per_thumb'] = ((1 - HISTORY_SMOOTHING) * entry['seconds_per_thumb']
+                                          + HISTORY_SMOOTHING * seconds_per_thumb)
+            entry['samples'] = entry.get('samples', 0) + 1
+        else:
+            self.history[key] = {'seconds_per_thumb': seconds_per_thumb, 'samples': 1}
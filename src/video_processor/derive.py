@@ -0,0 +1,117 @@
+import io
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from PIL import Image
+from loguru import logger
+
+from .encoding import encode_image
+
+MASTER_KEY = "master"
+MASTER_QSCALE = 3 # Near-transparent JPEG quality for the intermediate frame
+
+
+def master_width(processor) -> int:
+    """Width cap of the master frames for the current settings, 0 when masters are disabled.
+
+    Never below the thumbnail width, so a master can always produce the requested thumbnail.
+    """
+    if processor.master_width <= 0:
+        return 0
+    return max(processor.master_width, processor.thumbnail_width)
+
+
+def master_key(processor) -> str:
+    """Frame store key of master frames; draft-decoded masters are kept apart from standard ones."""
+    if processor.decode_preset.value == 'standard':
+        return MASTER_KEY
+    return f"{MASTER_KEY}_{processor.decode_preset.value}"
+
+
+def master_filename(timestamp: float, width: int, key: str = MASTER_KEY) -> str:
+    suffix = key[len(MASTER_KEY):]
+    return f"m{round(timestamp * 1000):09d}_w{width}{suffix}.jpg"
+
+
+def master_output_args() -> list:
+    return ['-c:v', 'mjpeg', '-qscale:v', str(MASTER_QSCALE), '-f', 'image2pipe', 'pipe:1']
+
+
+def derive_thumbnail(master_bytes: bytes, width: int, thumbnail_format, encode_preset, qscale: int) -> bytes:
+    """Resize and re-encode a master frame into a thumbnail.
+
+    JPEG draft mode lets libjpeg decode directly at a fraction of the master size when the
+    thumbnail is at most half as wide, so most of the decode work is skipped.
+    """
+    with Image.open(io.BytesIO(master_bytes)) as img:
+        height = max(1, round(img.height * width / img.width))
+        img.draft('RGB', (width, height))
+        if img.size != (width, height):
+            img = img.resize((width, height), Image.Resampling.LANCZOS, reducing_gap=2.0)
+        return encode_image(img, thumbnail_format, encode_preset, qscale)
+
+
+def derive_file(master_path: str, thumb_path: str, width: int, thumbnail_format, encode_preset, qscale: int) -> str:
+    """Process pool entry point: derive the thumbnail at `thumb_path` from the master at `master_path`."""
+    Path(thumb_path).write_bytes(derive_thumbnail(Path(master_path).read_bytes(), width,
+                                                  thumbnail_format, encode_preset, qscale))
+    return thumb_path
+
+
+class DerivePool:
+    """Process pool for re-deriving thumbnails from master frames, started on first use.
+
+    Pillow's resize and encode hold the GIL for part of their work, so a batch of derivations
+    runs in separate processes. 'spawn' avoids forking the GUI's threads into the workers.
+    """
+
+    def __init__(self, workers: int = 0):
+        self.workers = workers or os.cpu_count() or 1
+        self._executor = None
+        self._lock = threading.Lock() # map is called from several scheduler threads at once
+
+    def map(self, tasks: list) -> list:
+        """Run derive_file for each argument tuple in `tasks`.
+
+        Returns:
+            list: The thumbnail path per task, or None where derivation failed.
+        """
+        if not tasks:
+            return []
+        if len(tasks) == 1:
+            return [self._run_inline(tasks[0])]
+        try:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ProcessPoolExecutor(max_workers=self.workers,
+                                                         mp_context=multiprocessing.get_context('spawn'))
+                executor = self._executor
+            futures = [executor.submit(derive_file, *task) for task in tasks]
+        except Exception as e:
+            logger.warning(f"DerivePool: Process pool unavailable ({e}), deriving in-process.")
+            return [self._run_inline(task) for task in tasks]
+        results = []
+        for future, task in zip(futures, tasks):
+            try:
+                results.append(future.result())
+            except Exception as e:
+                logger.warning(f"DerivePool: Could not derive {Path(task[1]).name} from {Path(task[0]).name}: {e}")
+                results.append(None)
+        return results
+
+    @staticmethod
+    def _run_inline(task: tuple):
+        try:
+            return derive_file(*task)
+        except Exception as e:
+            logger.warning(f"DerivePool: Could not derive {Path(task[1]).name} from {Path(task[0]).name}: {e}")
+            return None
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
@@ -0,0 +1,151 @@
+import io
+
+from PIL import Image, features
+from loguru import logger
+
+from src.thumbnail_format_enum import ThumbnailFormat, EncodePreset, DecodePreset
+
+FILE_EXTENSIONS = {
+    ThumbnailFormat.JPEG: 'jpg',
+    ThumbnailFormat.WEBP: 'webp',
+    ThumbnailFormat.AVIF: 'avif',
+}
+
+# libwebp compression effort (0 = fastest, 6 = smallest).
+WEBP_COMPRESSION_LEVELS = {
+    EncodePreset.SPEED: 0,
+    EncodePreset.BALANCED: 4,
+    EncodePreset.SIZE: 6,
+}
+
+# Pillow AVIF encoder speed (0 = slowest/smallest, 10 = fastest).
+AVIF_SPEEDS = {
+    EncodePreset.SPEED: 10,
+    EncodePreset.BALANCED: 7,
+    EncodePreset.SIZE: 4,
+}
+
+_avif_supported = None
+
+def avif_supported() -> bool:
+    """Check whether the installed Pillow can encode and decode AVIF images.
+
+    FFmpeg's AVIF muxer cannot write to a pipe, so AVIF thumbnails are encoded
+    in-process by Pillow (native AVIF support arrived in Pillow 11.3).
+
+    Returns:
+        bool: True if AVIF thumbnails can be produced and displayed.
+    """
+    global _avif_supported
+    if _avif_supported is None:
+        try:
+            _avif_supported = bool(features.check('avif'))
+        except Exception:
+            _avif_supported = False
+        if not _avif_supported:
+            logger.info("AVIF support not available in this Pillow build.")
+    return _avif_supported
+
+def resolve_thumbnail_format(format_value) -> ThumbnailFormat:
+    """Convert a format value to a usable ThumbnailFormat, falling back when unsupported.
+
+    Args:
+        format_value (str | ThumbnailFormat): Requested format.
+
+    Returns:
+        ThumbnailFormat: The requested format, WEBP if AVIF is unavailable, or JPEG if invalid.
+    """
+    try:
+        thumbnail_format = ThumbnailFormat(format_value)
+    except ValueError:
+        logger.warning(f"Invalid thumbnail format '{format_value}', defaulting to 'jpeg'")
+        return ThumbnailFormat.JPEG
+    if thumbnail_format == ThumbnailFormat.AVIF and not avif_supported():
+        logger.warning("AVIF thumbnails requested but not supported, falling back to 'webp'")
+        return ThumbnailFormat.WEBP
+    return thumbnail_format
+
+def resolve_encode_preset(preset_value) -> EncodePreset:
+    try:
+        return EncodePreset(preset_value)
+    except ValueError:
+        logger.warning(f"Invalid encode preset '{preset_value}', defaulting to 'balanced'")
+        return EncodePreset.BALANCED
+
+def resolve_decode_preset(preset_value) -> DecodePreset:
+    try:
+        return DecodePreset(preset_value)
+    except ValueError:
+        logger.warning(f"Invalid decode preset '{preset_value}', defaulting to 'standard'")
+        return DecodePreset.STANDARD
+
+def file_extension(thumbnail_format: ThumbnailFormat) -> str:
+    return FILE_EXTENSIONS.get(thumbnail_format, 'jpg')
+
+def qscale_to_percent(qscale: int) -> int:
+    """Map the FFmpeg qscale range (1 best - 31 worst) to a 0-100 quality percentage."""
+    qscale = max(1, min(31, int(qscale)))
+    return round(100 * (31 - qscale) / 30)
+
+def ffmpeg_output_args(thumbnail_format: ThumbnailFormat, preset: EncodePreset, qscale: int) -> list:
+    """Build the FFmpeg encoder/muxer arguments that stream one image to stdout.
+
+    Args:
+        thumbnail_format (ThumbnailFormat): Target thumbnail format.
+        preset (EncodePreset): Size-vs-speed encoder preset.
+        qscale (int): Quality setting in the FFmpeg qscale range (1-31).
+
+    Returns:
+        list: Arguments ending with the 'pipe:1' output.
+    """
+    match thumbnail_format:
+        case ThumbnailFormat.WEBP:
+            return ['-c:v', 'libwebp', '-quality', str(qscale_to_percent(qscale)),
+                    '-compression_level', str(WEBP_COMPRESSION_LEVELS[preset]),
+                    '-f', 'webp', 'pipe:1']
+        case ThumbnailFormat.AVIF:
+            # Lossless intermediate, re-encoded to AVIF by Pillow (see encode_with_pillow).
+            return ['-c:v', 'png', '-f', 'image2pipe', 'pipe:1']
+        case _:
+            return ['-c:v', 'mjpeg', '-qscale:v', str(qscale), '-f', 'image2pipe', 'pipe:1']
+
+def needs_pillow_encode(thumbnail_format: ThumbnailFormat) -> bool:
+    return thumbnail_format == ThumbnailFormat.AVIF
+
+def encode_with_pillow(data: bytes, thumbnail_format: ThumbnailFormat, preset: EncodePreset, qscale: int) -> bytes:
+    """Re-encode an image held in memory into the target thumbnail format with Pillow.
+
+    Args:
+        data (bytes): Encoded source image.
+        thumbnail_format (ThumbnailFormat): Target thumbnail format.
+        preset (EncodePreset): Size-vs-speed encoder preset.
+        qscale (int): Quality setting in the FFmpeg qscale range (1-31).
+
+    Returns:
+        bytes: The encoded thumbnail.
+    """
+    with Image.open(io.BytesIO(data)) as img:
+        return encode_image(img, thumbnail_format, preset, qscale)
+
+def encode_image(img: Image.Image, thumbnail_format: ThumbnailFormat, preset: EncodePreset, qscale: int) -> bytes:
+    """Encode a decoded image into the target thumbnail format with Pillow.
+
+    Args:
+        img (Image.Image): Source image.
+        thumbnail_format (ThumbnailFormat): Target thumbnail format.
+        preset (EncodePreset): Size-vs-speed encoder preset.
+        qscale (int): Quality setting in the FFmpeg qscale range (1-31).
+
+    Returns:
+        bytes: The encoded thumbnail.
+    """
+    img = img.convert('RGB')
+    out = io.BytesIO()
+    quality = qscale_to_percent(qscale)
+    if thumbnail_format == ThumbnailFormat.AVIF:
+        img.save(out, format='AVIF', quality=quality, speed=AVIF_SPEEDS[preset])
+    elif thumbnail_format == ThumbnailFormat.WEBP:
+        img.save(out, format='WEBP', quality=quality, method=WEBP_COMPRESSION_LEVELS[preset])
+    else:
+        img.save(out, format='JPEG', quality=max(1, quality), optimize=preset != EncodePreset.SPEED)
+    return out.getvalue()
@@ -0,0 +1,83 @@
+import subprocess
+from pathlib import Path
+
+from src.failure_kind_enum import FailureKind
+from .supervisor import FFmpegLimitExceeded
+
+# Failures that no other timestamp or attempt strategy can avoid: the rest of the video is skipped.
+FATAL_FAILURES = {
+    FailureKind.MISSING_MOOV,
+    FailureKind.UNSUPPORTED_CODEC,
+    FailureKind.IO_ERROR,
+    FailureKind.INVALID_DATA,
+    FailureKind.RESOURCE_LIMIT,
+}
+
+FAILURE_DESCRIPTIONS = {
+    FailureKind.MISSING_MOOV: "Missing moov atom (truncated file)",
+    FailureKind.UNSUPPORTED_CODEC: "Unsupported codec",
+    FailureKind.IO_ERROR: "I/O error",
+    FailureKind.INVALID_DATA: "Not a readable video",
+    FailureKind.RESOURCE_LIMIT: "Resource limit exceeded",
+    FailureKind.TIMEOUT: "Timed out",
+    FailureKind.DECODE_ERROR: "Decode error",
+}
+
+# Checked in order, the first match wins; matched against FFmpeg's stderr.
+_STDERR_PATTERNS = (
+    (FailureKind.MISSING_MOOV, ('moov atom not found',)),
+    (FailureKind.UNSUPPORTED_CODEC, ('Decoding requested, but no decoder found', 'Decoder (codec', 'No decoder for',
+                                     'Unsupported codec', 'unsupported codec')),
+    (FailureKind.IO_ERROR, ('No such file or directory', 'Permission denied', 'Input/output error')),
+    (FailureKind.INVALID_DATA, ('Error opening input',)),
+)
+# A failed hardware decoder setup only rules out the GPU attempt (it is reported as ENOMEM).
+_HARDWARE_ERRORS = ('Device creation failed', 'Hardware device setup failed', 'No device available for decoder')
+
+
+def classify_stderr(stderr, video_path: Path = None) -> FailureKind:
+    """Classify a failed FFmpeg run from its stderr.
+
+    Args:
+        stderr (bytes | str): FFmpeg's error output.
+        video_path (Path, optional): The input, to recognise '<input>: <error>' lines of older FFmpeg versions.
+
+    Returns:
+        FailureKind: The cause, DECODE_ERROR when nothing points at the file as a whole.
+    """
+    text = stderr.decode('utf-8', errors='ignore') if isinstance(stderr, bytes) else (stderr or '')
+    if any(message in text for message in _HARDWARE_ERRORS):
+        return FailureKind.DECODE_ERROR
+    for kind, messages in _STDERR_PATTERNS:
+        if any(message in text for message in messages):
+            return kind
+    if video_path is not None and f"{video_path}: Invalid data found when processing input" in text:
+        return FailureKind.INVALID_DATA
+    return FailureKind.DECODE_ERROR
+
+
+def failure_detail(stderr_text: str, kind: FailureKind) -> str:
+    """The stderr line that identified `kind`, or the last line when no pattern matched."""
+    lines = [line.strip() for line in stderr_text.strip().splitlines() if line.strip()]
+    messages = dict(_STDERR_PATTERNS).get(kind, ())
+    return next((line for line in lines if any(message in line for message in messages)), lines[-1] if lines else "")
+
+
+def classify_exception(error: Exception) -> FailureKind:
+    """Classify an exception raised while running FFmpeg (see FFmpegSupervisor.run)."""
+    if isinstance(error, FFmpegLimitExceeded):
+        return FailureKind.RESOURCE_LIMIT
+    if isinstance(error, subprocess.TimeoutExpired):
+        return FailureKind.TIMEOUT
+    if isinstance(error, OSError):
+        return FailureKind.IO_ERROR
+    return FailureKind.DECODE_ERROR
+
+
+def is_fatal(kind: FailureKind) -> bool:
+    return kind in FATAL_FAILURES
+
+
+def describe_failure(kind: FailureKind, detail: str = "") -> str:
+    description = FAILURE_DESCRIPTIONS.get(kind, kind.value)
+    return f"{description}: {detail}" if detail else description
@@ -0,0 +1,111 @@
+import io
+
+import numpy as np
+from PIL import Image
+
+CANDIDATE_FRAMES = 4 # Frames one extraction may try before keeping the best
+CANDIDATE_STEP = 0.5 # Seconds between candidates, decoded in the same FFmpeg run
+SCORE_WIDTH = 160 # Frames are scored on a grayscale copy this wide
+MIN_LUMA_STDEV = 10.0 # Below this a frame is black, blank or a flat fade
+MIN_SHARPNESS = 12.0 # Laplacian variance below this means heavy blur
+
+
+def jpeg_end(buffer: bytes) -> int:
+    """End offset of the first complete JPEG in `buffer`, or -1 while it is still incomplete.
+
+    Marker segments are skipped by their length, so bytes in headers (e.g. quantisation tables)
+    that happen to look like an EOI marker do not split a frame.
+    """
+    i = 2 # After SOI
+    while i + 2 <= len(buffer):
+        if buffer[i] != 0xFF:
+            return -1 # Not a JPEG stream we understand
+        marker = buffer[i + 1]
+        if marker == 0xD9:
+            return i + 2
+        if marker == 0x01 or 0xD0 <= marker <= 0xD7:
+            i += 2
+            continue
+        if i + 4 > len(buffer):
+            return -1
+        i += 2 + int.from_bytes(buffer[i + 2:i + 4], 'big')
+        if marker == 0xDA: # Start of scan: entropy-coded data runs until the next real marker
+            while True:
+                i = buffer.find(b'\xff', i)
+                if i < 0 or i + 1 >= len(buffer):
+                    return -1
+                following = buffer[i + 1]
+                if following == 0x00 or 0xD0 <= following <= 0xD7:
+                    i += 2 # Stuffed byte or restart marker
+                    continue
+                break
+    return -1
+
+
+def candidate_select(step: float = CANDIDATE_STEP, start: float = 0.0) -> str:
+    """select filter keeping the first frame from `start` on and then one frame per `step` seconds."""
+    selection = f"isnan(prev_selected_t)+gte(t-prev_selected_t,{step:.3f})"
+    if start > 0:
+        selection = f"gte(t,{start:.3f})*({selection})"
+    return f"select='{selection}'"
+
+
+def score_frame(jpeg_bytes: bytes) -> dict:
+    """Luma spread and edge energy of an encoded frame, measured on a small grayscale copy.
+
+    Returns:
+        dict: 'luma_stdev' (0-255 scale) and 'sharpness' (variance of the 4-neighbour Laplacian).
+    """
+    with Image.open(io.BytesIO(jpeg_bytes)) as img:
+        img.draft('L', (SCORE_WIDTH, SCORE_WIDTH))
+        gray = img.convert('L')
+        if gray.width > SCORE_WIDTH:
+            gray = gray.resize((SCORE_WIDTH, max(1, round(gray.height * SCORE_WIDTH / gray.width))),
+                               Image.Resampling.BILINEAR)
+        luma = np.asarray(gray, dtype=np.float32)
+    laplacian = (4 * luma[1:-1, 1:-1] - luma[:-2, 1:-1] - luma[2:, 1:-1] - luma[1:-1, :-2] - luma[1:-1, 2:])
+    return {'luma_stdev': round(float(luma.std()), 2),
+            'sharpness': round(float(laplacian.var()) if laplacian.size else 0.0, 2)}
+
+
+def is_acceptable(score: dict) -> bool:
+    return score['luma_stdev'] >= MIN_LUMA_STDEV and score['sharpness'] >= MIN_SHARPNESS
+
+
+def score_rank(score: dict) -> float:
+    """How far the weaker of the two measures is from its threshold, used to keep the best rejected frame."""
+    return min(score['luma_stdev'] / MIN_LUMA_STDEV, score['sharpness'] / MIN_SHARPNESS)
+
+
+class CandidatePicker:
+    """Splits a stream of concatenated JPEG frames and keeps the first acceptable one, or the best.
+
+    Used as the stdout callback of FFmpegSupervisor.run_streaming, so FFmpeg is stopped as soon as
+    a good frame has arrived and the remaining candidates are never decoded.
+    """
+
+    def __init__(self):
+        self._buffer = b''
+        self.frames_seen = 0
+        self.best = None # (index, jpeg bytes, score)
+
+    def __call__(self, chunk: bytes) -> bool:
+        self._buffer += chunk
+        while True:
+            end = jpeg_end(self._buffer)
+            if end < 0:
+                return False
+            frame, self._buffer = self._buffer[:end], self._buffer[end:]
+            if self._add(frame):
+                return True
+
+    def _add(self, frame: bytes) -> bool:
+        index = self.frames_seen
+        self.frames_seen += 1
+        try:
+            score = score_frame(frame)
+        except Exception:
+            return False # Truncated or corrupt candidate
+        if self.best is None or score_rank(score) > score_rank(self.best[2]):
+            self.best = (index, frame, score)
+        return is_acceptable(score)
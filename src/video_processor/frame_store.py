@@ -0,0 +1,130 @@
+import json
+from pathlib import Path
+
+from loguru import logger
+
+FRAME_INDEX_FILENAME = "_vtm_frames.json"
+# Stored frames closer than this to a planned timestamp are reused instead of extracted again.
+REUSE_TOLERANCE_FRACTION = 0.005 # Of the video duration
+MIN_REUSE_TOLERANCE = 0.25 # Seconds
+# Frames kept per video, as a multiple of thumbnails_per_video; unreferenced ones beyond it are deleted.
+MAX_FRAMES_FACTOR = 3
+
+
+def frame_key(width: int, quality: int, thumbnail_format: str, encode_preset: str,
+              decode_preset: str = 'standard') -> str:
+    """Encoding settings a stored frame must match to be reused as a thumbnail."""
+    key = f"w{width}_q{quality}_{thumbnail_format}_{encode_preset}"
+    # Draft frames are never served for standard-quality requests.
+    return key if decode_preset == 'standard' else f"{key}_{decode_preset}"
+
+
+def processor_frame_key(processor) -> str:
+    return frame_key(processor.thumbnail_width, processor.thumbnail_quality,
+                     processor.thumbnail_format.value, processor.encode_preset.value, processor.decode_preset.value)
+
+
+def cache_frame_key(cache: dict) -> str:
+    # Entries written before formats were configurable are JPEG/balanced.
+    return frame_key(cache.get('thumbnail_width'), cache.get('thumbnail_quality'),
+                     cache.get('thumbnail_format', 'jpeg'), cache.get('encode_preset', 'balanced'),
+                     cache.get('decode_preset', 'standard'))
+
+
+def frame_filename(timestamp: float, key: str, extension: str) -> str:
+    """Frames are named after their timestamp, so frames of different plans never overwrite each other."""
+    return f"t{round(timestamp * 1000):09d}_{key}.{extension}"
+
+
+def reuse_tolerance(duration: float) -> float:
+    return max(MIN_REUSE_TOLERANCE, REUSE_TOLERANCE_FRACTION * duration)
+
+
+class FrameStore:
+    """Index of the thumbnail frames extracted for one video, keyed by timestamp and encoding settings.
+
+    The store outlives cache invalidation: when the thumbnail count or distribution changes, frames
+    already on disk near the new target timestamps are reused and only the missing ones are extracted.
+    """
+
+    def __init__(self, video_cache_dir: Path):
+        self.video_cache_dir = video_cache_dir
+        self.index_path = video_cache_dir / FRAME_INDEX_FILENAME
+        self.frames = [] # Dicts with 'timestamp', 'file' and 'key', oldest first
+
+    def load(self, cache=None):
+        """Read the index; without one, seed it from a cache JSON written before the store existed.
+
+        Args:
+            cache (dict, optional): The video's cache JSON contents.
+        """
+        if self.index_path.exists():
+            try:
+                with open(self.index_path, 'r') as f:
+                    self.frames = json.load(f).get('frames', [])
+            except Exception as e:
+                logger.warning(f"FrameStore: Could not read {self.index_path}: {e}. Starting empty.")
+                self.frames = []
+        elif cache:
+            key = cache_frame_key(cache)
+            self.frames = [{'timestamp': ts, 'file': name, 'key': key}
+                           for name, ts in zip(cache.get('thumbnails', []), cache.get('timestamps', []))]
+        # Drop entries whose file has gone missing.
+        self.frames = [frame for frame in self.frames if (self.video_cache_dir / frame['file']).exists()]
+        return self
+
+    def save(self):
+        try:
+            with open(self.index_path, 'w') as f:
+                json.dump({'frames': self.frames}, f, indent=4)
+        except Exception as e:
+            logger.warning(f"FrameStore: Could not write {self.index_path}: {e}")
+
+    def match(self, timestamps: list, key: str, tolerance: float, min_width: int = 0) -> dict:
+        """Assign stored frames to target timestamps, each frame at most once, nearest pairs first.
+
+        Args:
+            timestamps (list): Target timestamps in seconds.
+            key (str): Settings key the frames must have.
+            tolerance (float): Maximum distance in seconds between a frame and its target.
+            min_width (int): Minimum recorded 'width' (master frames only).
+
+        Returns:
+            dict: target index -> frame entry for every target with a frame within `tolerance`.
+        """
+        candidates = [frame for frame in self.frames if frame['key'] == key and frame.get('width', 0) >= min_width]
+        pairs = sorted(
+            (abs(frame['timestamp'] - target), index, frame_index)
+            for index, target in enumerate(timestamps)
+            for frame_index, frame in enumerate(candidates)
+            if abs(frame['timestamp'] - target) <= tolerance
+        )
+        matched, used = {}, set()
+        for _, index, frame_index in pairs:
+            if index not in matched and frame_index not in used:
+                matched[index] = candidates[frame_index]
+                used.add(frame_index)
+        return matched
+
+    def add(self, timestamp: float, filename: str, key: str, width: int = 0, score: dict = None):
+        self.frames = [frame for frame in self.frames if frame['file'] != filename]
+        frame = {'timestamp': timestamp, 'file': filename, 'key': key}
+        if width:
+            frame['width'] = width
+        if score:
+            frame['score'] = score
+        self.frames.append(frame)
+
+    def prune(self, keep_files: set, max_frames: int):
+        """Delete the oldest frames not in `keep_files` until at most `max_frames` remain."""
+        excess = len(self.frames) - max_frames
+        if excess <= 0:
+            return
+        removable = [frame for frame in self.frames if frame['file'] not in keep_files][:excess]
+        for frame in removable:
+            try:
+                (self.video_cache_dir / frame['file']).unlink(missing_ok=True)
+            except OSError as e:
+                logger.debug(f"FrameStore: Could not delete {frame['file']}: {e}")
+        removed = {frame['file'] for frame in removable}
+        self.frames = [frame for frame in self.frames if frame['file'] not in removed]
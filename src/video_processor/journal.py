@@ -0,0 +1,128 @@
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+from loguru import logger
+
+JOURNAL_FILENAME = "_vtm_journal.jsonl"
+JOURNAL_MAX_AGE_SECONDS = 7 * 24 * 3600 # An older journal is discarded instead of resumed
+
+
+def batch_settings(processor) -> dict:
+    """Settings a journaled thumbnail depends on; a journal written with other settings is discarded."""
+    return {
+        'thumbnails_per_video': processor.thumbnails_per_video,
+        'thumbnail_width': processor.thumbnail_width,
+        'thumbnail_quality': processor.thumbnail_quality,
+        'peak_pos': processor.peak_pos,
+        'concentration': processor.concentration,
+        'distribution': processor.distribution.value,
+        'thumbnail_format': processor.thumbnail_format.value,
+        'encode_preset': processor.encode_preset.value,
+        'decode_preset': processor.decode_preset.value,
+        'master_width': processor.master_width,
+        'frame_scoring': processor.frame_scoring,
+        'keyframe_index': processor.keyframe_index,
+        'cover_art': processor.cover_art,
+    }
+
+
+class BatchJournal:
+    """Append-only record of the thumbnails and videos finished in the current batch.
+
+    Every completed thumbnail is appended as one JSON line and flushed right away, so a batch
+    that is stopped or killed can be resumed: finished videos are taken from their cache JSON
+    once it still validates, and partially processed videos only extract what is missing.
+    The journal is deleted once a batch runs to the end or a lazy session is stopped, and
+    ignored once it is older than JOURNAL_MAX_AGE_SECONDS.
+    """
+
+    def __init__(self, cache_dir: Path):
+        self.path = cache_dir / JOURNAL_FILENAME
+        self._lock = threading.Lock()
+        self._file = None
+        self.finished_videos = set() # str(video_path)
+        self.thumbnails = {} # str(video_path) -> {index: (timestamp, filename)}
+
+    def open(self, settings: dict) -> bool:
+        """Load a journal left by an interrupted batch with the same settings, or start a new one.
+
+        Returns:
+            bool: True if an earlier batch is being resumed.
+        """
+        resumed = self._load(settings)
+        if not resumed:
+            self.finished_videos, self.thumbnails = set(), {}
+        try:
+            self._file = open(self.path, 'a' if resumed else 'w', encoding='utf-8')
+            if not resumed:
+                self._append({'type': 'batch', 'settings': settings})
+        except OSError as e:
+            logger.warning(f"BatchJournal: Could not open {self.path}: {e}. The batch will not be resumable.")
+            self._file = None
+        return resumed
+
+    def _load(self, settings: dict) -> bool:
+        if not self.path.exists():
+            return False
+        try:
+            if time.time() - self.path.stat().st_mtime > JOURNAL_MAX_AGE_SECONDS:
+                logger.info(f"BatchJournal: {self.path} is too old to resume, starting a new journal.")
+                return False
+            with open(self.path, 'r', encoding='utf-8') as f:
+                lines = f.read().splitlines()
+        except OSError as e:
+            logger.warning(f"BatchJournal: Could not read {self.path}: {e}")
+            return False
+        for line_number, line in enumerate(lines):
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue # A line cut short when the app was killed
+            if line_number == 0:
+                if record.get('type') != 'batch' or record.get('settings') != settings:
+                    logger.info("BatchJournal: Settings changed since the interrupted batch, starting a new journal.")
+                    return False
+            elif record.get('type') == 'thumbnail':
+                self.thumbnails.setdefault(record['video'], {})[record['index']] = (record['timestamp'], record['file'])
+            elif record.get('type') == 'video':
+                self.finished_videos.add(record['video'])
+        return True
+
+    def _append(self, record: dict):
+        if self._file is None:
+            return
+        with self._lock:
+            try:
+                self._file.write(json.dumps(record) + '\n')
+                self._file.flush()
+            except (OSError, ValueError) as e:
+                logger.warning(f"BatchJournal: Could not append to {self.path}: {e}")
+
+    def record_thumbnail(self, video_path: Path, index: int, timestamp: float, filename: str):
+        self._append({'type': 'thumbnail', 'video': str(video_path), 'index': index,
+                      'timestamp': timestamp, 'file': filename})
+
+    def record_video(self, video_path: Path):
+        self._append({'type': 'video', 'video': str(video_path)})
+
+    def is_finished(self, video_path: Path) -> bool:
+        return str(video_path) in self.finished_videos
+
+    def finished_thumbnails(self, video_path: Path) -> dict:
+        """index -> (timestamp, filename) of the thumbnails journaled for an unfinished video."""
+        return self.thumbnails.get(str(video_path), {})
+
+    def close(self, completed: bool):
+        """Close the journal; a completed batch deletes it, an interrupted one keeps it for the next run."""
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+        if completed:
+            try:
+                os.remove(self.path)
+            except OSError:
+                pass
@@ -0,0 +1,139 @@
+import bisect
+import json
+import subprocess
+from fractions import Fraction
+from pathlib import Path
+
+from loguru import logger
+
+from .supervisor import FFmpegCancelled, FFmpegLimitExceeded
+
+KEYFRAME_INDEX_FILENAME = "_vtm_keyframes.json"
+MIN_KEYFRAME_TIMEOUT = 30.0
+MAX_KEYFRAME_TIMEOUT = 600.0
+KEYFRAME_SECONDS_PER_GB = 30.0 # The scan reads the whole file, so its deadline follows the file size
+
+
+def build_keyframe_cmd(video_path: Path) -> list:
+    """FFmpeg command listing every packet of the first video stream without decoding it.
+
+    Packets are stream-copied into the framecrc muxer, which prints one line per packet with its
+    timestamps and, for packets that are not plain keyframes, their flags ('F=0x..').
+    """
+    return ['ffmpeg', '-hide_banner', '-loglevel', 'error',
+            '-i', str(video_path), '-map', '0:v:0', '-c', 'copy', '-f', 'framecrc', 'pipe:1']
+
+
+def parse_keyframes(output: str) -> list:
+    """Keyframe presentation times in seconds, sorted, from framecrc output."""
+    time_base = None
+    keyframes = set()
+    for line in output.splitlines():
+        if line.startswith('#tb 0:'):
+            time_base = Fraction(line.split(':', 1)[1].strip())
+            continue
+        if line.startswith('#') or time_base is None:
+            continue
+        fields = [field.strip() for field in line.split(',')]
+        if len(fields) < 6 or fields[0] != '0':
+            continue
+        flags = next((int(field[2:], 16) for field in fields[6:] if field.startswith('F=')), 1)
+        if not flags & 1:
+            continue
+        try:
+            pts = int(fields[2])
+        except ValueError:
+            continue
+        if pts >= 0: # Missing timestamps are printed as a huge negative value
+            keyframes.add(round(float(pts * time_base), 3))
+    return sorted(keyframes)
+
+
+def load_keyframe_index(video_cache_dir: Path, size_bytes: int) -> list | None:
+    """Read a video's stored keyframe times, None if missing or recorded for a file of another size."""
+    index_path = video_cache_dir / KEYFRAME_INDEX_FILENAME
+    if not index_path.exists():
+        return None
+    try:
+        with open(index_path, 'r') as f:
+            index = json.load(f)
+    except Exception as e:
+        logger.debug(f"Keyframes: Could not read {index_path}: {e}")
+        return None
+    if size_bytes and index.get('size_bytes') != size_bytes:
+        return None
+    return index.get('keyframes')
+
+
+def keyframe_index(processor, video_path: Path, video_cache_dir: Path, info=None) -> list:
+    """A video's keyframe times, from the cache or built once with a packet scan (see build_keyframe_cmd).
+
+    Returns:
+        list: Sorted keyframe times in seconds, empty if they could not be determined.
+    """
+    size_bytes = info.size_bytes if info is not None else 0
+    keyframes = load_keyframe_index(video_cache_dir, size_bytes)
+    if keyframes is not None:
+        return keyframes
+
+    cmd = build_keyframe_cmd(video_path)
+    timeout = min(MAX_KEYFRAME_TIMEOUT, max(MIN_KEYFRAME_TIMEOUT, KEYFRAME_SECONDS_PER_GB * size_bytes / (1024 ** 3)))
+    logger.trace(f"Keyframe index for {video_path.name}: {' '.join(cmd)}")
+    try:
+        result = processor.supervisor.run(cmd, timeout)
+    except subprocess.TimeoutExpired:
+        logger.warning(f"Keyframe index timed out after {timeout:.0f}s for {video_path.name}.")
+        return []
+    except FFmpegCancelled:
+        return []
+    except FFmpegLimitExceeded as e:
+        logger.warning(f"Keyframe index exceeded its {e.resource} limit for {video_path.name}.")
+        return []
+    keyframes = parse_keyframes(result.stdout.decode('utf-8', errors='ignore'))
+    if result.returncode != 0 or not keyframes:
+        # Stored empty as well, so an unreadable file is not scanned again on every run.
+        error_output = result.stderr.decode('utf-8', errors='ignore') if result.stderr else "No stderr"
+        logger.warning(f"Keyframe index failed for {video_path.name}. Code: {result.returncode}. Error: {error_output[:300]}")
+        keyframes = []
+
+    try:
+        with open(video_cache_dir / KEYFRAME_INDEX_FILENAME, 'w') as f:
+            json.dump({'size_bytes': size_bytes, 'keyframes': keyframes}, f)
+    except OSError as e:
+        logger.warning(f"Failed to write keyframe index for {video_path.name}: {e}")
+    if keyframes:
+        logger.debug(f"Keyframe index with {len(keyframes)} keyframes written for {video_path.name}")
+    return keyframes
+
+
+def keyframe_before(keyframes: list, timestamp: float) -> float | None:
+    """The last keyframe at or before `timestamp`, None without one."""
+    position = bisect.bisect_right(keyframes, timestamp + 1e-6)
+    return keyframes[position - 1] if position else None
+
+
+def snap_to_keyframes(timestamps: list, indices: list, keyframes: list, tolerance: float) -> int:
+    """Move the timestamps at `indices` onto the nearest keyframe within `tolerance`, in place.
+
+    A timestamp on a keyframe decodes a single frame after the seek instead of up to a whole GOP,
+    at the price of showing a frame up to `tolerance` away from the planned position.
+    Each keyframe is used once, so distinct timestamps never collapse into the same frame.
+
+    Returns:
+        int: Number of timestamps moved.
+    """
+    used = set(timestamps)
+    snapped = 0
+    for index in indices:
+        timestamp = timestamps[index]
+        position = bisect.bisect_left(keyframes, timestamp)
+        nearby = [keyframes[i] for i in (position - 1, position) if 0 <= i < len(keyframes)]
+        nearby = [k for k in nearby if abs(k - timestamp) <= tolerance and (k == timestamp or k not in used)]
+        if not nearby:
+            continue
+        keyframe = min(nearby, key=lambda k: abs(k - timestamp))
+        used.discard(timestamp)
+        used.add(keyframe)
+        timestamps[index] = keyframe
+        snapped += 1
+    return snapped
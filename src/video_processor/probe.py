@@ -0,0 +1,122 @@
+import re
+import subprocess
+from pathlib import Path
+
+from loguru import logger
+
+from .supervisor import FFmpegCancelled, FFmpegLimitExceeded, run_command
+
+_VIDEO_STREAM_RE = re.compile(r'Stream #\S+.*?: Video: (\w+)')
+_STREAM_ID_RE = re.compile(r'Stream #(\d+:\d+)')
+_RESOLUTION_RE = re.compile(r'\b(\d{2,5})x(\d{2,5})\b')
+_CHAPTER_RE = re.compile(r'Chapter #\S+: start (-?[\d.]+), end (-?[\d.]+)')
+
+
+class VideoInfo:
+    """Container-level metadata of a video, parsed from `ffmpeg -i` output."""
+
+    def __init__(self, duration: float, width: int = 0, height: int = 0, codec: str = "", size_bytes: int = 0,
+                 chapters=None, cover_stream: str = ""):
+        self.duration = duration
+        self.width = width
+        self.height = height
+        self.codec = codec
+        self.size_bytes = size_bytes
+        self.chapters = chapters or [] # (start, end) in seconds per container chapter
+        self.cover_stream = cover_stream # Stream specifier ('0:1') of embedded cover art, '' if none
+
+    @property
+    def pixels(self) -> int:
+        return self.width * self.height
+
+    def __repr__(self):
+        return (f"VideoInfo(duration={self.duration:.2f}, {self.width}x{self.height}, "
+                f"codec={self.codec or '?'}, size={self.size_bytes})")
+
+
+def parse_duration(output: str) -> float:
+    """Parse the container duration from `ffmpeg -i` stderr output.
+
+    Returns:
+        float: Duration in seconds, 0 if missing.
+
+    Raises:
+        ValueError: If a Duration line is present but malformed.
+    """
+    for line in output.split('\n'):
+        if 'Duration' in line:
+            time_str = line.split('Duration: ')[1].split(',')[0]
+            h, m, s = map(float, time_str.split(':'))
+            return h * 3600 + m * 60 + s
+    return 0
+
+
+def parse_video_info(output: str, size_bytes: int = 0) -> VideoInfo:
+    """Parse duration, first video stream codec and resolution, chapters and cover art from `ffmpeg -i` stderr output.
+
+    Cover art (MP4 'covr', Matroska image attachments) is listed as a video stream marked
+    '(attached pic)'; it is recorded separately and never taken for the video itself.
+
+    Args:
+        output (str): FFmpeg stderr output.
+        size_bytes (int): File size, stored alongside the parsed values.
+
+    Returns:
+        VideoInfo: Parsed metadata; unknown fields are left at 0 / "".
+    """
+    try:
+        duration = parse_duration(output)
+    except (ValueError, IndexError):
+        duration = 0
+    info = VideoInfo(duration, size_bytes=size_bytes)
+    for line in output.split('\n'):
+        chapter_match = _CHAPTER_RE.search(line)
+        if chapter_match:
+            info.chapters.append((float(chapter_match.group(1)), float(chapter_match.group(2))))
+            continue
+        stream_match = _VIDEO_STREAM_RE.search(line)
+        if not stream_match:
+            continue
+        if '(attached pic)' in line:
+            if not info.cover_stream:
+                info.cover_stream = _STREAM_ID_RE.search(line).group(1)
+            continue
+        if info.codec:
+            continue
+        info.codec = stream_match.group(1)
+        resolution_match = _RESOLUTION_RE.search(line[stream_match.end():])
+        if resolution_match:
+            info.width, info.height = int(resolution_match.group(1)), int(resolution_match.group(2))
+    return info
+
+
+def probe_video(video_path: Path, timeout: float = 30, supervisor=None) -> VideoInfo | None:
+    """Run `ffmpeg -i` on a file and parse its metadata.
+
+    Args:
+        video_path (Path): Path to the video file.
+        timeout (float): Seconds before FFmpeg is abandoned.
+        supervisor (FFmpegSupervisor, optional): Runs the command so a stop can kill it.
+
+    Returns:
+        VideoInfo | None: Parsed metadata, or None if FFmpeg could not be run.
+    """
+    cmd = ['ffmpeg', '-i', str(video_path), '-hide_banner']
+    try:
+        result = run_command(cmd, timeout, supervisor)
+    except subprocess.TimeoutExpired:
+        logger.warning(f"ffmpeg timeout while probing {video_path}")
+        return None
+    except FFmpegCancelled:
+        return None
+    except FFmpegLimitExceeded as e:
+        logger.warning(f"FFmpeg exceeded its {e.resource} limit while probing {video_path}")
+        return None
+    except Exception as e:
+        logger.error(f"Error probing {video_path}: {e}")
+        return None
+    try:
+        size_bytes = video_path.stat().st_size
+    except OSError:
+        size_bytes = 0
+    return parse_video_info(result.stderr.decode('utf-8', errors='ignore'), size_bytes)
@@ -1,19 +1,49 @@
+import os
+import threading
+import time
+from collections import deque
 from pathlib import Path
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from threading import Lock
 
 from loguru import logger
 
 from .cache import get_cache_path, is_cache_valid, clear_cache
 from .scanner import scan_videos # scan_videos now takes exclusion parameters
-from .thumbnail import generate_thumbnails
+from .scheduler import ThumbnailScheduler
+from .cost_model import CostModel
+from .supervisor import FFmpegSupervisor, ResourceLimits
+from .derive import DerivePool
+from .journal import BatchJournal, batch_settings
+from .quarantine import Quarantine
+from .thumbnail import current_plan
+from .timestamp_plan import plan_timestamps
+from .encoding import resolve_thumbnail_format, resolve_encode_preset, resolve_decode_preset
 from src.distribution_enum import Distribution
 
+def compute_thread_budget(processes, cpu_count=None):
+    """Threads each FFmpeg child may use so that `processes` children together fill the cores once.
+
+    Args:
+        processes (int): Number of FFmpeg processes running concurrently.
+        cpu_count (int, optional): Number of cores, defaults to os.cpu_count().
+
+    Returns:
+        int: Decoder/filter threads per process (at least 1).
+    """
+    cpu_count = cpu_count or os.cpu_count() or 1
+    return max(1, cpu_count // max(1, processes))
+
 class VideoProcessor:
     def __init__(self, cache_dir_str, thumbnails_per_video, thumbnail_width, thumbnail_quality,
                  concurrent_videos, min_size_mb, min_duration_seconds, update_callback=None,
                  peak_pos=0.5, concentration=0.2, distribution='normal',
-                 excluded_words_str="", excluded_words_regex=False, excluded_words_match_full_path=False): # New args
+                 excluded_words_str="", excluded_words_regex=False, excluded_words_match_full_path=False, # New args
+                 thumbnail_format='jpeg', encode_preset='balanced',
+                 autotune_concurrency=False, min_ffmpeg_processes=1, max_ffmpeg_processes=0,
+                 video_time_budget=0, master_width=0, scrub_frames=0,
+                 decode_preset='standard', frame_scoring=False, keyframe_index=False,
+                 cover_art=False, sidecar_thumbnails=False,
+                 ffmpeg_memory_limit_mb=0, ffmpeg_cpu_limit_seconds=0, ffmpeg_nice=0, ffmpeg_io_priority='normal',
+                 progressive=False, lazy=False):
 
         if cache_dir_str and cache_dir_str.strip():
             self.cache_dir = Path(cache_dir_str).resolve()
@@ -31,6 +61,37 @@ class VideoProcessor:
         self.thumbnail_width = thumbnail_width
         self.thumbnail_quality = max(1, min(31, thumbnail_quality))
         self.concurrent_videos = concurrent_videos
+        # Global cap on FFmpeg processes running at once, shared by all videos of a batch.
+        self.set_ffmpeg_process_limit(os.cpu_count() or 1)
+        # Adapt that cap during a batch within [min, max] (max 0 = twice the core count).
+        self.autotune_concurrency = autotune_concurrency
+        self.min_ffmpeg_processes = min_ffmpeg_processes
+        self.max_ffmpeg_processes_limit = max_ffmpeg_processes
+        # Total FFmpeg seconds one video may use before its remaining thumbnails become placeholders (0 = automatic).
+        self.video_time_budget = video_time_budget or 0
+        # Width cap of the master frames kept next to the thumbnails (0 = no masters); width, quality and
+        # format changes are then derived from them without decoding the video again.
+        self.master_width = master_width or 0
+        # Tiny frames per video in the hover-scrub sprite (0 = no sprite); each sprite costs one extra
+        # keyframe-only FFmpeg pass over the whole file.
+        self.scrub_frames = scrub_frames or 0
+        # Score each extracted frame and retry blank or blurry ones a little later in the same FFmpeg run.
+        self.frame_scoring = bool(frame_scoring)
+        # Index each video's keyframe times once from packet flags; nearby timestamps are moved onto them.
+        self.keyframe_index = bool(keyframe_index)
+        # Show embedded cover art as an extra first thumbnail of the videos that have it.
+        self.cover_art = bool(cover_art)
+        # Show existing artwork (sidecar images, .nfo art, desktop thumbnails) instead of extracting frames.
+        self.sidecar_thumbnails = bool(sidecar_thumbnails)
+        self.full_extraction = set() # Videos whose frames were requested despite a sidecar preview
+        self.requested_videos = deque() # Of full_extraction, those no batch has taken up yet
+        # Give every video of a batch one representative thumbnail before filling in the rest (see ThumbnailScheduler).
+        self.progressive = bool(progressive)
+        # List every video without thumbnails and only extract those the UI asks for (see prioritize).
+        self.lazy = bool(lazy)
+        self.partial_videos = set() # Videos reported to the UI before all of their thumbnails were extracted
+        self.priority_videos = () # Videos the UI wants first, most urgent first (see prioritize)
+        self.priority_changed = threading.Event() # Wakes an idle lazy batch when the UI asks for more
         self.min_size_mb = min_size_mb
         self.min_duration_seconds = min_duration_seconds
         self.update_callback = update_callback
@@ -42,6 +103,10 @@ class VideoProcessor:
             logger.warning(f"Invalid distribution '{distribution}', defaulting to 'normal'")
             self.distribution = Distribution.NORMAL
 
+        self.thumbnail_format = resolve_thumbnail_format(thumbnail_format)
+        self.encode_preset = resolve_encode_preset(encode_preset)
+        self.decode_preset = resolve_decode_preset(decode_preset)
+
         self.excluded_words_str = excluded_words_str
         self.excluded_words_regex = excluded_words_regex
         self.excluded_words_match_full_path = excluded_words_match_full_path
@@ -49,61 +114,204 @@ class VideoProcessor:
                      f"regex: {self.excluded_words_regex}, "
                      f"match_full_path: {self.excluded_words_match_full_path}")
 
+        self.video_info = {} # Path -> VideoInfo gathered while scanning
+        self.timestamp_plans = {} # Path -> timestamps in seconds, planned per batch
+        self.cache_verdicts = {} # Path -> is_cache_valid result from ordering the batch, used once by prepare_video
+        self.cost_model = CostModel(self.cache_dir)
+
+        # Owns every FFmpeg child so a stop can kill them at once; children run under these limits and priorities.
+        self.supervisor = FFmpegSupervisor(ResourceLimits(ffmpeg_memory_limit_mb, ffmpeg_cpu_limit_seconds,
+                                                          ffmpeg_nice, ffmpeg_io_priority))
+        self.derive_pool = DerivePool()
+        self.journal = None # BatchJournal of the running batch
+        self.quarantine = Quarantine(self.cache_dir).load() # Videos skipped after failing (see quarantine.py)
         self._stop_requested = False
 
+    def set_ffmpeg_process_limit(self, processes):
+        """Set how many FFmpeg processes may run at once and split the CPU cores between them.
+
+        Without a budget every FFmpeg child sizes its decoder and filter thread pools to the whole
+        machine, so N concurrent children start N x cores threads that mostly context-switch.
+        """
+        self.max_ffmpeg_processes = max(1, processes)
+        self.ffmpeg_threads = compute_thread_budget(self.max_ffmpeg_processes)
+        logger.debug(f"VideoProcessor: {self.max_ffmpeg_processes} FFmpeg processes, "
+                     f"{self.ffmpeg_threads} threads each.")
+
+    def ffmpeg_process_bounds(self):
+        """Return the (min, max) number of concurrent FFmpeg processes the autotuner may choose."""
+        cpu_count = os.cpu_count() or 1
+        min_processes = max(1, self.min_ffmpeg_processes or 1)
+        # Beyond the core count extra processes only help hide I/O latency (e.g. network storage).
+        max_processes = self.max_ffmpeg_processes_limit if self.max_ffmpeg_processes_limit > 0 else 2 * cpu_count
+        return min_processes, max(min_processes, max_processes)
+
+    def request_full_extraction(self, video_path):
+        """Extract a video's frames even though it has a sidecar preview.
+
+        The video is queued for the running batch, which takes it up before any other video; without
+        a running batch, the caller runs process_videos(list(requested_videos)). Called from the GUI
+        thread; the video leaves full_extraction once its frames are cached.
+        """
+        video_path = Path(video_path)
+        self.full_extraction.add(video_path)
+        self.cache_verdicts.pop(video_path, None) # A sidecar entry is no longer valid
+        if video_path not in self.requested_videos:
+            self.requested_videos.append(video_path)
+        self.priority_changed.set()
+
+    def retry_quarantined(self, video_paths=None) -> int:
+        """Let the next run try quarantined videos again (all of them when None).
+
+        Their cache JSON is removed as well, so a cache written before the video was quarantined
+        cannot serve the failed result again; the extracted frames are kept for reuse.
+
+        Returns:
+            int: Number of videos released.
+        """
+        if video_paths is None:
+            video_paths = [Path(entry['video']) for entry in self.quarantine.entries()]
+        removed = self.quarantine.release(video_paths)
+        self.quarantine.save()
+        for video_path in video_paths:
+            try:
+                get_cache_path(self, Path(video_path)).unlink(missing_ok=True)
+            except OSError as e:
+                logger.warning(f"VideoProcessor: Could not remove the cache JSON of {video_path}: {e}")
+        return removed
+
+    def prioritize(self, video_paths):
+        """Move the given videos to the front of the running batch, most urgent first.
+
+        Called from the GUI thread whenever the visible or selected videos change; each call replaces
+        the previous list. The scheduler reads the tuple on every decision, so no lock is needed.
+        """
+        self.priority_videos = tuple(Path(v) for v in video_paths)
+        self.priority_changed.set()
+        logger.trace(f"VideoProcessor: {len(self.priority_videos)} prioritized videos.")
+
+    def pause(self):
+        """Start no new FFmpeg process and suspend the running ones until resume(); the batch keeps its queue."""
+        self.supervisor.pause(suspend_running=True)
+
+    def resume(self):
+        self.supervisor.resume()
+
+    @property
+    def paused(self) -> bool:
+        return self.supervisor.paused
+
     def request_stop(self):
         logger.info("VideoProcessor: Stop requested.")
         self._stop_requested = True
+        self.supervisor.stop()
 
     def scan_videos(self, folder):
         """Scan videos applying exclusion rules."""
         logger.debug(f"Processor.scan_videos called with folder: {folder}, "
                      f"exclusions: '{self.excluded_words_str}', regex: {self.excluded_words_regex}, "
                      f"match_full: {self.excluded_words_match_full_path}")
+        self.video_info = {}
+        self.priority_videos = ()
+        self._stop_requested = False
+        self.supervisor.reset()
         return scan_videos(folder, self.min_size_mb, self.min_duration_seconds,
-                           self.excluded_words_str, self.excluded_words_regex, self.excluded_words_match_full_path)
+                           self.excluded_words_str, self.excluded_words_regex, self.excluded_words_match_full_path,
+                           video_info=self.video_info, supervisor=self.supervisor)
+
+    def order_by_expected_cost(self, videos):
+        """Sort videos longest-expected-first so the expensive ones do not end up alone at the tail of a batch.
+
+        The cache verdict of every video is kept in cache_verdicts, so prepare_video does not check
+        the cache a second time.
+
+        Args:
+            videos (list): Video paths in scan order.
+
+        Returns:
+            tuple: (ordered videos, dict of video -> estimated FFmpeg seconds)
+        """
+        estimates = {}
+        self.cache_verdicts = {}
+        for video in videos:
+            if self.quarantine.is_quarantined(video):
+                estimates[video] = 0.0 # Failed on an earlier run, only placeholders are shown
+            elif self._check_cache(video):
+                estimates[video] = 0.0 # Served from the cache without running FFmpeg
+            else:
+                estimates[video] = self.cost_model.estimate(self.video_info.get(video), self.thumbnails_per_video)
+        # sorted() is stable, so videos with equal estimates keep their scan order.
+        return sorted(videos, key=lambda v: estimates[v], reverse=True), estimates
 
-    def process_videos(self, videos, progress_callback=None, error_callback=None, command_callback=None, completion_callback=None, stop_flag_check=None):
+    def _check_cache(self, video):
+        self.cache_verdicts[video] = is_cache_valid(self, video)
+        return self.cache_verdicts[video]
+
+    def plan_batch(self, videos):
+        """Compute the timestamps of every video whose duration is known in one vectorised step.
+
+        Returns:
+            dict: video path -> sorted timestamps in seconds.
+        """
+        if self.thumbnails_per_video <= 0:
+            return {}
+        known = [v for v in videos if v in self.video_info and self.video_info[v].duration > 0]
+        if not known:
+            return {}
+        rows = plan_timestamps(current_plan(self), [self.video_info[v].duration for v in known])
+        return {video: sorted(set(row.tolist())) for video, row in zip(known, rows)}
+
+    def process_videos(self, videos, progress_callback=None, error_callback=None, command_callback=None, completion_callback=None, stop_flag_check=None,
+                       rows_callback=None):
+        """Generate the thumbnails of `videos`, blocking until done or stopped.
+
+        In lazy mode `rows_callback` first receives (video path, duration) of every video so the UI
+        can list them; thumbnails are then only extracted for videos named by prioritize, and the
+        batch waits for further requests until every video is done or a stop is requested. The rows
+        are sent before anything else is done: cost ordering is skipped, and each video's cache is
+        checked and its timestamps planned only when the scheduler picks it up.
+        """
         logger.info(f"VideoProcessor: Starting processing for {len(videos)} videos. Cache root: {self.cache_dir}")
         self._stop_requested = False
+        self.supervisor.reset()
+
+        self.journal = BatchJournal(self.cache_dir)
+        if self.journal.open(batch_settings(self)):
+            logger.info(f"VideoProcessor: Resuming interrupted batch, {len(self.journal.finished_videos)} videos "
+                        f"already finished.")
+        if self.lazy:
+            self.cache_verdicts = {}
+            self.timestamp_plans = {}
+            self.partial_videos.update(videos)
+            if rows_callback:
+                rows_callback([(video, self.video_info[video].duration if video in self.video_info else 0.0)
+                               for video in videos])
+        else:
+            videos, estimates = self.order_by_expected_cost(videos)
+            total_estimate = sum(estimates.values())
+            logger.info(f"VideoProcessor: Estimated {total_estimate:.1f}s of FFmpeg work, "
+                        f"~{total_estimate / max(1, self.max_ffmpeg_processes):.1f}s on {self.max_ffmpeg_processes} processes.")
+            self.timestamp_plans = self.plan_batch(videos)
+        start_time = time.monotonic()
+
+        scheduler = ThumbnailScheduler(
+            self, videos,
+            progress_callback=progress_callback,
+            error_callback=error_callback,
+            command_callback=command_callback,
+            stop_flag_check=lambda: self._stop_requested or (stop_flag_check and stop_flag_check())
+        )
+        processed_count = scheduler.run()
+        stopped = self._stop_requested or bool(stop_flag_check and stop_flag_check())
+        # Stop is how a lazy session ends, so there is nothing to resume.
+        self.journal.close(completed=self.lazy or not stopped)
+        self.journal = None
+        self.quarantine.save()
+        self.cost_model.save()
+        self.derive_pool.shutdown()
 
-        processed_count = 0
-        total_videos = len(videos)
-
-        with ThreadPoolExecutor(max_workers=self.concurrent_videos) as executor:
-            futures = {
-                executor.submit(
-                    generate_thumbnails,
-                    self,
-                    video,
-                    progress_callback,
-                    command_callback,
-                    lambda: self._stop_requested or (stop_flag_check and stop_flag_check())
-                ): video
-                for video in videos
-            }
-
-            for future in as_completed(futures):
-                if self._stop_requested or (stop_flag_check and stop_flag_check()):
-                    logger.info("VideoProcessor: Stop flag triggered, cancelling remaining tasks.")
-                    for f_cancel in futures:
-                        if not f_cancel.done():
-                            f_cancel.cancel()
-                    break
-
-                video = futures[future]
-                try:
-                    future.result()
-                    logger.debug(f"VideoProcessor: Successfully processed {video}")
-                except Exception as e:
-                    if not isinstance(e,futures.CancelledError): # type: ignore
-                        logger.error(f"VideoProcessor: Error processing {video}: {e}", exc_info=True)
-                        if error_callback:
-                            error_callback(video, str(e))
-                finally:
-                    processed_count +=1
-
-        logger.info(f"VideoProcessor: Finished processing batch. Processed {processed_count} futures.")
+        logger.info(f"VideoProcessor: Finished processing batch. Processed {processed_count} videos "
+                    f"in {time.monotonic() - start_time:.1f}s.")
         if completion_callback:
             logger.debug("VideoProcessor: Calling completion_callback.")
-            completion_callback()
\ No newline at end of file
+            completion_callback()
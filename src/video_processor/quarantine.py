@@ -0,0 +1,129 @@
+import csv
+import json
+import threading
+from datetime import datetime
+from pathlib import Path
+
+from loguru import logger
+
+from src.failure_kind_enum import FailureKind
+
+QUARANTINE_FILENAME = "_vtm_quarantine.json"
+# May be caused by the environment (an unmounted share, a busy machine) rather than the file,
+# so these are only skipped once they failed again on a later run.
+TRANSIENT_FAILURES = {FailureKind.IO_ERROR, FailureKind.TIMEOUT, FailureKind.RESOURCE_LIMIT}
+TRANSIENT_ATTEMPTS = 2
+EXPORT_FIELDS = ('video', 'failure', 'detail', 'attempts', 'last_try', 'size_bytes', 'mtime')
+
+
+def file_identity(video_path: Path) -> dict | None:
+    """Size and modification time of a video, None if it cannot be read; a quarantine entry lapses when they change."""
+    try:
+        stat = video_path.stat()
+    except OSError:
+        return None
+    return {'size_bytes': stat.st_size, 'mtime': stat.st_mtime}
+
+
+class Quarantine:
+    """Videos that could not be thumbnailed, skipped by later runs until the file changes or a retry is requested.
+
+    One entry per video records its identity (size and mtime), the FailureKind, the last error
+    detail, how many runs failed and when the last one did. Entries are kept in a single JSON
+    file in the cache root and removed once the video is processed successfully.
+    """
+
+    def __init__(self, cache_dir: Path):
+        self.path = cache_dir / QUARANTINE_FILENAME
+        self._lock = threading.Lock()
+        self._entries = {} # str(video_path) -> entry dict
+        self._dirty = False
+
+    def load(self):
+        if not self.path.exists():
+            return self
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self._entries = json.load(f).get('videos', {})
+        except Exception as e:
+            logger.warning(f"Quarantine: Could not read {self.path}: {e}. Starting empty.")
+            self._entries = {}
+        return self
+
+    def save(self):
+        with self._lock:
+            if not self._dirty:
+                return
+            try:
+                with open(self.path, 'w', encoding='utf-8') as f:
+                    json.dump({'videos': self._entries}, f, indent=2)
+                self._dirty = False
+            except OSError as e:
+                logger.warning(f"Quarantine: Could not write {self.path}: {e}")
+
+    def __len__(self):
+        return len(self._entries)
+
+    def is_quarantined(self, video_path: Path) -> bool:
+        """True if the video failed before, has not changed since and is not waiting for a retry."""
+        entry = self._entries.get(str(video_path))
+        if entry is None:
+            return False
+        identity = file_identity(video_path)
+        if identity is None or identity['size_bytes'] != entry['size_bytes'] or identity['mtime'] != entry['mtime']:
+            return False
+        try:
+            kind = FailureKind(entry['failure'])
+        except ValueError:
+            return False
+        return kind not in TRANSIENT_FAILURES or entry['attempts'] >= TRANSIENT_ATTEMPTS
+
+    def record_failure(self, video_path: Path, kind: FailureKind, detail: str = ""):
+        """Add a failed run of a video; the attempt count restarts when the file changed in between."""
+        identity = file_identity(video_path)
+        if identity is None:
+            return # Deleted or unreadable: nothing to recognise it by later
+        with self._lock:
+            entry = self._entries.get(str(video_path))
+            same_file = entry is not None and all(entry.get(k) == v for k, v in identity.items())
+            self._entries[str(video_path)] = {
+                **identity,
+                'failure': kind.value,
+                'detail': detail[:500],
+                'attempts': entry['attempts'] + 1 if same_file else 1,
+                'last_try': datetime.now().isoformat(timespec='seconds'),
+            }
+            self._dirty = True
+        logger.info(f"Quarantine: {video_path.name} failed ({kind.value}), "
+                    f"attempt {self._entries[str(video_path)]['attempts']}.")
+
+    def clear(self, video_path: Path):
+        """Forget a video that was processed successfully."""
+        with self._lock:
+            if self._entries.pop(str(video_path), None) is not None:
+                self._dirty = True
+
+    def release(self, video_paths=None) -> int:
+        """Let the next run try the given videos again (all of them when None).
+
+        Returns:
+            int: Number of entries removed.
+        """
+        with self._lock:
+            keys = list(self._entries) if video_paths is None else [str(v) for v in video_paths]
+            removed = sum(1 for key in keys if self._entries.pop(key, None) is not None)
+            self._dirty = self._dirty or bool(removed)
+        return removed
+
+    def entries(self) -> list:
+        """All entries as dicts with a 'video' key, most recent failure first."""
+        with self._lock:
+            rows = [{'video': video, **entry} for video, entry in self._entries.items()]
+        return sorted(rows, key=lambda row: row.get('last_try', ''), reverse=True)
+
+    def export_csv(self, export_path: Path):
+        """Write the entries to a CSV file."""
+        with open(export_path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.DictWriter(f, fieldnames=EXPORT_FIELDS, extrasaction='ignore')
+            writer.writeheader()
+            writer.writerows(self.entries())
@@ -5,13 +5,19 @@ import re # Import regex module
 
 from loguru import logger
 
-def is_video_file(file_path, min_size_mb, min_duration_seconds):
+from .probe import parse_video_info
+from .supervisor import FFmpegCancelled, FFmpegLimitExceeded, run_command
+
+def is_video_file(file_path, min_size_mb, min_duration_seconds, video_info=None, supervisor=None):
     """Determine if a file is a video by checking FFmpeg duration metadata and applying filters.
 
     Args:
         file_path (Path): Path to the file to check.
         min_size_mb (float): Minimum video size in MB.
         min_duration_seconds (float): Minimum video duration in seconds.
+        video_info (dict, optional): If given, receives file_path -> VideoInfo for accepted videos,
+            so later stages do not need to probe the file again.
+        supervisor (FFmpegSupervisor, optional): Runs the FFmpeg probe so a stop can kill it.
 
     Returns:
         bool: True if the file is a video meeting criteria, False otherwise.
@@ -23,7 +29,7 @@ def is_video_file(file_path, min_size_mb, min_duration_seconds):
             return False
 
         cmd = ['ffmpeg', '-i', str(file_path), '-hide_banner']
-        result = subprocess.run(cmd, capture_output=True, text=False, timeout=10) # Added timeout
+        result = run_command(cmd, 10, supervisor)
         output = result.stderr.decode('utf-8', errors='ignore')
 
         if result.returncode != 0 and 'Invalid data found when processing input' not in output and 'HTTP error' not in output : # Allow some ffmpeg errors if duration is found
@@ -59,15 +65,25 @@ def is_video_file(file_path, min_size_mb, min_duration_seconds):
             return False
 
         logger.trace(f"File {file_path} passed filters: size {file_size_mb:.2f} MB, duration {duration:.2f} s")
+        if video_info is not None:
+            info = parse_video_info(output, os.path.getsize(file_path))
+            info.duration = duration
+            video_info[file_path] = info
         return True
     except subprocess.TimeoutExpired:
         logger.trace(f"File {file_path} filtered out (ffmpeg timeout).")
         return False
+    except FFmpegCancelled:
+        return False
+    except FFmpegLimitExceeded as e:
+        logger.warning(f"File {file_path} filtered out: FFmpeg exceeded its {e.resource} limit while probing it.")
+        return False
     except Exception as e:
         logger.trace(f"File {file_path} filtered out (ffmpeg check failed): {str(e)}")
         return False
 
-def scan_videos(folder, min_size_mb, min_duration_seconds, excluded_words_str, use_regex, match_full_path):
+def scan_videos(folder, min_size_mb, min_duration_seconds, excluded_words_str, use_regex, match_full_path,
+                video_info=None, supervisor=None):
     """Scan a directory for video files, excluding based on specified words/patterns.
 
     Args:
@@ -77,6 +93,8 @@ def scan_videos(folder, min_size_mb, min_duration_seconds, excluded_words_str, u
         excluded_words_str (str): Comma-separated string of words/patterns to exclude.
         use_regex (bool): Whether to treat excluded_words as regex.
         match_full_path (bool): Whether to match against the full path or just filename/dirname.
+        video_info (dict, optional): Filled with file_path -> VideoInfo for each detected video.
+        supervisor (FFmpegSupervisor, optional): Runs the FFmpeg probes; once stopped, the scan ends early.
 
     Returns:
         list: List of Path objects for detected video files.
@@ -126,6 +144,10 @@ def scan_videos(folder, min_size_mb, min_duration_seconds, excluded_words_str, u
             logger.trace(f"Pruned dirs in {root}: removed {original_dirs_len - len(dirs)}")
 
 
+        if supervisor is not None and supervisor.stopped:
+            logger.info("Scan stopped by request.")
+            break
+
         # Filter files
         for file in files:
             file_path = Path(root) / file
@@ -154,7 +176,7 @@ def scan_videos(folder, min_size_mb, min_duration_seconds, excluded_words_str, u
                 if is_excluded_file:
                     continue
 
-            if is_video_file(file_path, min_size_mb, min_duration_seconds):
+            if is_video_file(file_path, min_size_mb, min_duration_seconds, video_info, supervisor):
                 videos.append(file_path)
                 logger.info(f"Detected video: {file_path}")
             else:
@@ -0,0 +1,148 @@
+import re
+import subprocess
+
+import numpy as np
+from PIL import Image
+from loguru import logger
+
+from .encoding import encode_image
+from .supervisor import FFmpegCancelled, FFmpegLimitExceeded
+
+CANDIDATES_PER_THUMBNAIL = 6 # Keyframes sampled per requested thumbnail
+MAX_CANDIDATES = 240
+FEATURE_SIZE = (32, 18) # Grayscale grid the frames are compared on
+MIN_FRAME_STDEV = 8.0 # Frames flatter than this (black screens, fades) are never picked
+# The pass decodes every keyframe of the file, so its cost grows with the duration while N seeks do
+# not; longer videos fall back to the evenly spread timestamps without trying.
+MAX_ANALYSIS_DURATION = 20 * 60.0
+MIN_ANALYSIS_TIMEOUT = 30.0
+MAX_ANALYSIS_TIMEOUT = 120.0
+ANALYSIS_TIMEOUT_FACTOR = 8.0 # Multiple of the estimated cost of extracting the thumbnails one by one
+
+_SHOWINFO_RE = re.compile(r'\bn:\s*(\d+)\s+pts:\s*\S+\s+pts_time:\s*([-\d.]+).*?\bs:(\d+)x(\d+)')
+
+
+def build_analysis_cmd(processor, video_path, interval: float, thread_args: list) -> list:
+    """FFmpeg command decoding only keyframes, at most one per `interval` seconds, as raw RGB at thumbnail width.
+
+    `showinfo` reports the timestamp and size of every frame written to stdout.
+    """
+    select = f"select='isnan(prev_selected_t)+gte(t-prev_selected_t,{interval:.3f})'"
+    return ['ffmpeg', '-hide_banner', '-nostats', '-loglevel', 'info', *thread_args,
+            '-skip_frame', 'nokey', '-i', str(video_path), '-an', '-sn', '-dn',
+            '-vf', f"{select},scale={processor.thumbnail_width}:-2,showinfo",
+            '-vsync', '0', '-pix_fmt', 'rgb24', '-f', 'rawvideo', 'pipe:1']
+
+
+def parse_frames(raw: bytes, stderr: str) -> list:
+    """Split the raw RGB stream into (timestamp, HxWx3 array) pairs using the showinfo log."""
+    frames = []
+    offset = 0
+    for match in _SHOWINFO_RE.finditer(stderr):
+        timestamp = float(match.group(2))
+        width, height = int(match.group(3)), int(match.group(4))
+        size = width * height * 3
+        if offset + size > len(raw):
+            break
+        frames.append((timestamp, np.frombuffer(raw, dtype=np.uint8, count=size, offset=offset).reshape(height, width, 3)))
+        offset += size
+    return frames
+
+
+def frame_features(frame: np.ndarray) -> np.ndarray:
+    """Downscale a frame to a small grayscale grid (float32, 0-255) for distance comparisons."""
+    gray = Image.fromarray(frame).convert('L').resize(FEATURE_SIZE, Image.Resampling.BOX)
+    return np.asarray(gray, dtype=np.float32).ravel()
+
+
+def select_distinct(features: np.ndarray, count: int) -> list:
+    """Greedy farthest-point selection: each pick maximises its distance to the frames already picked.
+
+    Args:
+        features (np.ndarray): One feature row per candidate frame.
+        count (int): Number of frames to pick.
+
+    Returns:
+        list: Indices of the picked rows, in pick order.
+    """
+    if len(features) == 0 or count <= 0:
+        return []
+    # Start from the most detailed frame, a better first thumbnail than an arbitrary one.
+    picked = [int(np.argmax(features.std(axis=1)))]
+    min_distance = np.abs(features - features[picked[0]]).mean(axis=1)
+    while len(picked) < min(count, len(features)):
+        candidate = int(np.argmax(min_distance))
+        if min_distance[candidate] <= 0:
+            break # Only duplicates of picked frames are left
+        picked.append(candidate)
+        min_distance = np.minimum(min_distance, np.abs(features - features[candidate]).mean(axis=1))
+    return picked
+
+
+def analyse_scenes(processor, video_path, duration: float, thread_args: list, stop_flag_check=None) -> list:
+    """Pick the most distinct frames of a video in a single keyframe-only decode pass.
+
+    The chosen frames were decoded at thumbnail width during the analysis, so they are encoded
+    straight into thumbnails instead of being extracted again with one seek each.
+
+    Args:
+        processor: The VideoProcessor instance.
+        video_path (Path): Path to the video file.
+        duration (float): Video duration in seconds.
+        thread_args (list): FFmpeg thread budget options.
+        stop_flag_check (callable, optional): Returns True when processing should stop.
+
+    Videos longer than MAX_ANALYSIS_DURATION are not analysed.
+
+    Returns:
+        list: (timestamp, encoded thumbnail bytes) pairs sorted by timestamp; may hold fewer
+        than thumbnails_per_video entries, or none if the analysis failed or was skipped.
+    """
+    if duration > MAX_ANALYSIS_DURATION:
+        logger.debug(f"Scene analysis skipped for {video_path.name}: {duration:.0f}s is longer than "
+                     f"{MAX_ANALYSIS_DURATION:.0f}s, using evenly spread timestamps.")
+        return []
+    num_thumbnails = processor.thumbnails_per_video
+    num_candidates = min(MAX_CANDIDATES, num_thumbnails * CANDIDATES_PER_THUMBNAIL)
+    interval = duration / num_candidates
+    cmd = build_analysis_cmd(processor, video_path, interval, thread_args)
+    estimated = processor.cost_model.estimate(processor.video_info.get(video_path), num_thumbnails)
+    timeout = min(MAX_ANALYSIS_TIMEOUT, max(MIN_ANALYSIS_TIMEOUT, estimated * ANALYSIS_TIMEOUT_FACTOR))
+
+    logger.trace(f"Scene analysis for {video_path.name}: {' '.join(cmd)}")
+    try:
+        result = processor.supervisor.run(cmd, timeout)
+    except subprocess.TimeoutExpired:
+        logger.warning(f"Scene analysis timed out after {timeout:.0f}s for {video_path.name}.")
+        return []
+    except FFmpegCancelled:
+        return []
+    except FFmpegLimitExceeded as e:
+        logger.warning(f"Scene analysis exceeded its {e.resource} limit for {video_path.name}.")
+        return []
+    stderr = result.stderr.decode('utf-8', errors='ignore')
+    if result.returncode != 0:
+        logger.warning(f"Scene analysis failed for {video_path.name}. Code: {result.returncode}. Error: {stderr[-300:]}")
+        return []
+
+    frames = parse_frames(result.stdout, stderr)
+    # Same 1%-99% window as the statistical distributions, which skips intros' first black frame.
+    usable = [(ts, frame) for ts, frame in frames if 0.01 * duration <= ts <= 0.99 * duration]
+    features = np.array([frame_features(frame) for _, frame in usable]) if usable else np.empty((0, 0))
+    if len(usable):
+        detailed = features.std(axis=1) >= MIN_FRAME_STDEV
+        if detailed.sum() >= min(num_thumbnails, len(usable)):
+            usable = [u for u, keep in zip(usable, detailed) if keep]
+            features = features[detailed]
+    if stop_flag_check and stop_flag_check():
+        return []
+
+    picked = sorted(select_distinct(features, num_thumbnails), key=lambda i: usable[i][0])
+    logger.debug(f"Scene analysis for {video_path.name}: {len(frames)} keyframes sampled, {len(picked)} picked.")
+    thumbnails = []
+    for i in picked:
+        timestamp, frame = usable[i]
+        image_bytes = encode_image(Image.fromarray(frame), processor.thumbnail_format,
+                                   processor.encode_preset, processor.thumbnail_quality)
+        thumbnails.append((timestamp, image_bytes))
+    return thumbnails
@@ -0,0 +1,354 @@
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from collections import Counter, deque
+
+from loguru import logger
+
+LAZY_IDLE_POLL_SECONDS = 0.25 # An idle lazy batch checks for a stop this often while waiting for requests
+PAUSE_POLL_SECONDS = 0.25 # A paused batch checks for a stop this often
+
+from .thumbnail import (prepare_video, extract_thumbnail, extract_scrub, finalize_video, save_placeholders,
+                        report_partial, representative_index)
+from .autotune import ConcurrencyTuner
+from .failures import describe_failure, classify_exception
+from src.failure_kind_enum import FailureKind
+
+class ThumbnailScheduler:
+    """Schedules thumbnail extraction per (video, timestamp) on one shared pool.
+
+    Each task runs at most one FFmpeg process at a time, so the pool size is the global cap
+    on concurrent FFmpeg processes. Videos are activated in the given order (longest expected
+    first, see VideoProcessor.order_by_expected_cost). Up to `concurrent_videos` videos are in
+    progress at once (more only when the active ones cannot fill the pool); free slots go to the in-progress
+    video with the fewest running tasks, so a single long video spreads over every idle core
+    at the end of a batch. With autotuning enabled the process cap is adjusted during the batch
+    by a ConcurrencyTuner. Results are regrouped per video and written to the cache once all
+    of its timestamps are done.
+
+    In progressive mode every video first gets a single representative thumbnail and is
+    reported to the UI with it, then parked; the parked videos are resumed for their remaining
+    timestamps only once every video has been through that first pass.
+
+    Videos named by VideoProcessor.prioritize (visible, selected or searched for in the UI) jump
+    the queue: they are prepared, resumed and given free slots before any other video. In lazy
+    mode only those videos are prepared at all, and an idle batch waits for the next request.
+
+    While the processor's supervisor is paused no task is submitted; the queue stays as it is and
+    the tasks in flight finish (or wait, suspended, inside the supervisor) until it is resumed.
+    """
+
+    def __init__(self, processor, videos, progress_callback=None, error_callback=None,
+                 command_callback=None, stop_flag_check=None):
+        self.processor = processor
+        self.pending_videos = deque(videos)
+        self.waiting = set(self.pending_videos) # Pending videos not taken out of order by a priority
+        self.progress_callback = progress_callback
+        self.error_callback = error_callback
+        self.command_callback = command_callback
+        self.stop_flag_check = stop_flag_check
+
+        self.max_workers = max(1, processor.max_ffmpeg_processes)
+        self.max_active_videos = max(1, processor.concurrent_videos)
+        self.tuner = None
+        if processor.autotune_concurrency:
+            min_processes, max_processes = processor.ffmpeg_process_bounds()
+            self.tuner = ConcurrencyTuner(self.max_workers, min_processes, max_processes, processor.supervisor.clock)
+            self.max_workers = self.tuner.value
+            processor.set_ffmpeg_process_limit(self.max_workers)
+
+        self.active_jobs = [] # Jobs in activation order
+        self.next_index = {} # job -> next timestamp index to schedule
+        self.running = {} # job -> number of tasks in flight
+        self.scrub_started = set() # Jobs whose scrub sprite task was submitted
+        self.lazy = processor.lazy
+        self.progressive = processor.progressive and not self.lazy # Lazy batches extract whole videos on request
+        self.first_pass = set() # Progressive mode: jobs limited to their representative thumbnail
+        self.parked = deque() # Progressive mode: jobs waiting for their remaining timestamps
+        self.parked_by_path = {} # video path -> parked job
+        self._priority_source = None
+        self._priority_rank = {} # video path -> position in processor.priority_videos
+        self.preparing = 0
+        self.processed_videos = 0
+        self.failures = Counter() # FailureKind -> videos stopped early by that fatal error
+
+    def _should_stop(self):
+        return bool(self.stop_flag_check and self.stop_flag_check())
+
+    def _task_limit(self, job):
+        """Number of the job's pending timestamps that may be scheduled now."""
+        return 1 if job in self.first_pass else len(job.pending)
+
+    def _priority(self):
+        """video path -> rank of the videos the UI asked for, rebuilt only when the request changed."""
+        source = self.processor.priority_videos
+        if source is not self._priority_source:
+            self._priority_source = source
+            self._priority_rank = {}
+            for rank, video in enumerate(source):
+                self._priority_rank.setdefault(video, rank)
+        return self._priority_rank
+
+    def _take_pending(self):
+        """Next video to prepare: the most urgent prioritized one still waiting, otherwise the next in order.
+
+        Returns:
+            Path | None: The video, or None in lazy mode when no waiting video was requested.
+        """
+        while self.processor.requested_videos:
+            # Frames requested for a video with a sidecar preview (VideoProcessor.request_full_extraction).
+            video = self.processor.requested_videos.popleft()
+            if video in self.parked_by_path or any(job.video_path == video for job in self.active_jobs):
+                continue # Already being extracted in this batch
+            self.waiting.discard(video)
+            return video
+        for video in self._priority():
+            if video in self.waiting:
+                self.waiting.discard(video)
+                return video
+        if self.lazy:
+            return None
+        while self.pending_videos:
+            video = self.pending_videos.popleft()
+            if video in self.waiting: # Otherwise already prepared out of order
+                self.waiting.discard(video)
+                return video
+        return None
+
+    def _resume_parked(self, force=False):
+        """Move a parked job back to the active ones once the first pass is over.
+
+        A prioritized parked job is resumed at once, without waiting for the first pass to end or
+        for a free active slot.
+        """
+        if not self.parked:
+            return False
+        job = next((self.parked_by_path[video] for video in self._priority() if video in self.parked_by_path), None)
+        if job is not None:
+            self.parked.remove(job)
+        elif self.waiting or self.preparing or self.first_pass:
+            return False
+        elif not force and len(self.active_jobs) >= self.max_active_videos:
+            return False
+        else:
+            job = self.parked.popleft()
+        del self.parked_by_path[job.video_path]
+        self.active_jobs.append(job)
+        return True
+
+    def _next_task(self):
+        """Pick the next task: activate another video if below the active limit, otherwise
+        extract from the active video with the fewest tasks in flight."""
+        while self._resume_parked():
+            pass
+        if self.waiting and len(self.active_jobs) + self.preparing < self.max_active_videos:
+            video = self._take_pending()
+            if video is not None:
+                return ('prepare', video)
+
+        for job in self.active_jobs:
+            if job in self.first_pass:
+                continue # The scrub sprite is part of the fill-in pass
+            if job.scrub_pending and job not in self.scrub_started:
+                # One cheap keyframe-only pass per video, started before its thumbnails.
+                self.scrub_started.add(job)
+                return ('scrub', job)
+
+        candidates = [job for job in self.active_jobs if self.next_index[job] < self._task_limit(job)]
+        if candidates:
+            priority = self._priority()
+            job = min(candidates, key=lambda j: (priority.get(j.video_path, len(priority)), self.running[j]))
+            index = job.pending[self.next_index[job]]
+            self.next_index[job] += 1
+            return ('extract', job, index)
+
+        if self.waiting:
+            # Every active video has all its timestamps in flight; use the idle slot for the next video.
+            video = self._take_pending()
+            if video is not None:
+                return ('prepare', video)
+        if self._resume_parked(force=True):
+            return self._next_task()
+        return None
+
+    def _submit(self, executor, task):
+        if task[0] == 'prepare':
+            self.preparing += 1
+            return executor.submit(prepare_video, self.processor, task[1], self.stop_flag_check)
+        if task[0] == 'scrub':
+            return executor.submit(extract_scrub, self.processor, task[1], self.stop_flag_check)
+        job, index = task[1], task[2]
+        self.running[job] += 1
+        return executor.submit(extract_thumbnail, self.processor, job, index,
+                               self.command_callback, self.stop_flag_check)
+
+    def _handle_prepare_done(self, video, future):
+        self.preparing -= 1
+        try:
+            job = future.result()
+        except Exception as e:
+            logger.error(f"VideoProcessor: Error preparing {video}: {e}", exc_info=True)
+            self.processor.quarantine.record_failure(video, classify_exception(e), str(e))
+            save_placeholders(self.processor, video, self.processor.cache_dir / video.name, "error_placeholder")
+            if self.error_callback:
+                self.error_callback(video, str(e))
+            self.processed_videos += 1
+            return
+        if job is None:
+            self.processed_videos += 1
+            return
+        self.active_jobs.append(job)
+        self.next_index[job] = 0
+        self.running[job] = 0
+        if job.is_complete(): # Every thumbnail was served from the frame store
+            self._finish_job(job)
+        elif self.progressive and job.pending:
+            # The representative timestamp goes first and is the only one extracted in the first pass.
+            first = representative_index(self.processor, job)
+            job.pending.remove(first)
+            job.pending.insert(0, first)
+            self.first_pass.add(job)
+
+    def _handle_extract_done(self, job, index, future):
+        self.running[job] -= 1
+        try:
+            thumb_filename = future.result()
+            if thumb_filename is None and self._should_stop():
+                return
+            if thumb_filename is not None and index not in job.placeholders and self.processor.journal:
+                self.processor.journal.record_thumbnail(job.video_path, index, job.timestamps[index], thumb_filename)
+        except Exception as e:
+            logger.error(f"VideoProcessor: Error extracting thumbnail {index} of {job.video_path}: {e}", exc_info=True)
+            if self.error_callback:
+                self.error_callback(job.video_path, str(e))
+        job.completed += 1
+        if self.tuner:
+            self.tuner.record_completion()
+        if self.progress_callback:
+            self.progress_callback((job.completed / len(job.timestamps)) * 100)
+        if job.is_complete():
+            self.first_pass.discard(job)
+            self._finish_job(job)
+        elif job in self.first_pass and self.running[job] == 0 and not self._should_stop():
+            self._park(job)
+
+    def _park(self, job):
+        """End a job's first pass: show its representative thumbnail and queue the rest for later."""
+        self.first_pass.discard(job)
+        self.active_jobs.remove(job)
+        self.parked.append(job)
+        self.parked_by_path[job.video_path] = job
+        try:
+            report_partial(self.processor, job)
+        except Exception as e:
+            logger.error(f"VideoProcessor: Error reporting first thumbnail of {job.video_path}: {e}", exc_info=True)
+
+    def _handle_scrub_done(self, job, future):
+        try:
+            future.result()
+        except Exception as e:
+            logger.error(f"VideoProcessor: Error extracting scrub strip of {job.video_path}: {e}", exc_info=True)
+            job.scrub_pending = False
+        if job.is_complete():
+            self._finish_job(job)
+
+    def _finish_job(self, job):
+        self.active_jobs.remove(job)
+        self.scrub_started.discard(job)
+        del self.next_index[job]
+        del self.running[job]
+        if job.failure is not None:
+            kind, detail = job.failure
+            self.failures[kind] += 1
+            self.processor.quarantine.record_failure(job.video_path, kind, detail)
+            if self.error_callback:
+                self.error_callback(job.video_path, describe_failure(kind, detail))
+        elif job.is_complete() and job.timestamps and len(job.placeholders) == len(job.timestamps):
+            self.processor.quarantine.record_failure(job.video_path, FailureKind.DECODE_ERROR,
+                                                     "No attempt succeeded at any timestamp")
+        elif job.is_complete():
+            self.processor.quarantine.clear(job.video_path)
+        if job.is_complete() and job.pending and job.failure is None:
+            self.processor.cost_model.record(job.info, sum(job.extract_seconds) / len(job.pending))
+        try:
+            finalize_video(self.processor, job)
+            if job.is_complete() and self.processor.journal:
+                self.processor.journal.record_video(job.video_path)
+            logger.debug(f"VideoProcessor: Successfully processed {job.video_path}")
+        except Exception as e:
+            logger.error(f"VideoProcessor: Error finalizing {job.video_path}: {e}", exc_info=True)
+            if self.error_callback:
+                self.error_callback(job.video_path, str(e))
+        self.processed_videos += 1
+
+    def _retune(self):
+        """Let the tuner adjust how many FFmpeg processes run at once (and their thread budget)."""
+        value = self.tuner.update()
+        if value != self.max_workers:
+            self.max_workers = value
+            self.processor.set_ffmpeg_process_limit(value)
+
+    def run(self):
+        """Run the batch until every video is processed or a stop is requested.
+
+        Returns:
+            int: Number of videos fully handled.
+        """
+        logger.info(f"ThumbnailScheduler: {len(self.pending_videos)} videos, up to {self.max_active_videos} "
+                    f"in progress, {self.max_workers} concurrent FFmpeg processes.")
+        # With autotuning the pool is sized for the upper bound; max_workers limits what is in flight.
+        pool_size = self.tuner.max_workers if self.tuner else self.max_workers
+        with ThreadPoolExecutor(max_workers=pool_size) as executor:
+            in_flight = {}
+            while True:
+                if self._should_stop():
+                    logger.info("VideoProcessor: Stop flag triggered, cancelling remaining tasks.")
+                    self.processor.supervisor.stop()
+                    for f_cancel in in_flight:
+                        f_cancel.cancel()
+                    wait(in_flight)
+                    break
+
+                while len(in_flight) < self.max_workers and not self.processor.supervisor.paused:
+                    task = self._next_task()
+                    if task is None:
+                        break
+                    in_flight[self._submit(executor, task)] = task
+
+                if not in_flight:
+                    if self.processor.supervisor.paused:
+                        self.processor.supervisor.wait_resumed(PAUSE_POLL_SECONDS)
+                        continue
+                    if not (self.lazy and self.waiting):
+                        break
+                    # Lazy mode: idle until the UI asks for more videos (or a stop is requested).
+                    self.processor.priority_changed.wait(LAZY_IDLE_POLL_SECONDS)
+                    self.processor.priority_changed.clear()
+                    continue
+
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    task = in_flight.pop(future)
+                    if task[0] == 'prepare':
+                        self._handle_prepare_done(task[1], future)
+                    elif task[0] == 'scrub':
+                        self._handle_scrub_done(task[1], future)
+                    else:
+                        self._handle_extract_done(task[1], task[2], future)
+                if self.tuner:
+                    self._retune()
+
+        if self.failures:
+            summary = ", ".join(f"{kind.value}: {count}" for kind, count in self.failures.most_common())
+            logger.warning(f"ThumbnailScheduler: {sum(self.failures.values())} videos stopped early by fatal errors ({summary}).")
+        if self.tuner:
+            self.tuner.log_summary()
+            # The next batch starts from the best setting found in this one.
+            self.processor.set_ffmpeg_process_limit(self.tuner.best_value())
+
+        # Report whatever stopped videos managed to extract; their cache is not written.
+        self.active_jobs.extend(self.parked)
+        self.parked.clear()
+        self.parked_by_path.clear()
+        for job in list(self.active_jobs):
+            if any(result is not None for result in job.results):
+                self._finish_job(job)
+        return self.processed_videos
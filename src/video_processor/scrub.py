@@ -0,0 +1,108 @@
+import json
+import math
+import subprocess
+from pathlib import Path
+
+from loguru import logger
+
+from .supervisor import FFmpegCancelled, FFmpegLimitExceeded
+
+SCRUB_SPRITE_FILENAME = "_vtm_scrub.jpg"
+SCRUB_INDEX_FILENAME = "_vtm_scrub.json"
+SCRUB_FRAME_WIDTH = 128
+SCRUB_QSCALE = 5
+MIN_SCRUB_TIMEOUT = 30.0
+MAX_SCRUB_TIMEOUT = 600.0
+SCRUB_TIMEOUT_FACTOR = 4.0 # Multiple of the estimated cost of extracting the thumbnails one by one
+
+
+def sprite_grid(count: int) -> tuple:
+    """(columns, rows) of the most square tile layout holding `count` frames."""
+    columns = max(1, math.ceil(math.sqrt(count)))
+    return columns, max(1, math.ceil(count / columns))
+
+
+def build_scrub_cmd(video_path: Path, duration: float, count: int, thread_args: list) -> list:
+    """FFmpeg command decoding only keyframes and tiling `count` evenly spaced tiny frames into one JPEG.
+
+    The fps filter repeats the latest keyframe, so sparse keyframes still fill every tile.
+    """
+    columns, rows = sprite_grid(count)
+    vf = f"fps={count}/{duration:.3f},scale={SCRUB_FRAME_WIDTH}:-2,tile={columns}x{rows}"
+    return ['ffmpeg', '-hide_banner', '-loglevel', 'error', *thread_args,
+            '-skip_frame', 'nokey', '-i', str(video_path), '-an', '-sn', '-dn',
+            '-vf', vf, '-frames:v', '1',
+            '-c:v', 'mjpeg', '-qscale:v', str(SCRUB_QSCALE), '-f', 'image2pipe', 'pipe:1']
+
+
+def load_scrub_strip(video_cache_dir: Path) -> dict | None:
+    """Read a video's scrub sprite description.
+
+    Returns:
+        dict | None: Keys 'file', 'count', 'columns', 'rows' and 'interval' (seconds between
+        frames), or None if the video has no sprite.
+    """
+    index_path = video_cache_dir / SCRUB_INDEX_FILENAME
+    if not index_path.exists():
+        return None
+    try:
+        with open(index_path, 'r') as f:
+            strip = json.load(f)
+    except Exception as e:
+        logger.debug(f"Scrub: Could not read {index_path}: {e}")
+        return None
+    if not (video_cache_dir / strip.get('file', SCRUB_SPRITE_FILENAME)).exists():
+        return None
+    return strip
+
+
+def needs_scrub_strip(processor, video_cache_dir: Path) -> bool:
+    """Whether a sprite is enabled but missing or built with a different frame count."""
+    if processor.scrub_frames <= 0:
+        return False
+    strip = load_scrub_strip(video_cache_dir)
+    return strip is None or strip.get('count') != processor.scrub_frames
+
+
+def extract_scrub_strip(processor, video_path: Path, video_cache_dir: Path, duration: float,
+                        thread_args: list, estimated_seconds: float = 0.0) -> bool:
+    """Extract the scrub sprite of one video in a single keyframe-only decode pass.
+
+    This is a separate FFmpeg run over the whole file, on top of the per-thumbnail seeks: the thumbnails
+    only decode a few frames around each timestamp, too few to fill a sprite. Demuxing every packet and
+    decoding every keyframe grows with the file's length and keyframe density, so long videos pay the most.
+
+    Returns:
+        bool: True if the sprite and its description were written.
+    """
+    count = processor.scrub_frames
+    cmd = build_scrub_cmd(video_path, duration, count, thread_args)
+    timeout = min(MAX_SCRUB_TIMEOUT, max(MIN_SCRUB_TIMEOUT, estimated_seconds * SCRUB_TIMEOUT_FACTOR))
+    logger.trace(f"Scrub strip for {video_path.name}: {' '.join(cmd)}")
+    try:
+        result = processor.supervisor.run(cmd, timeout)
+    except subprocess.TimeoutExpired:
+        logger.warning(f"Scrub strip timed out after {timeout:.0f}s for {video_path.name}.")
+        return False
+    except FFmpegCancelled:
+        return False
+    except FFmpegLimitExceeded as e:
+        logger.warning(f"Scrub strip exceeded its {e.resource} limit for {video_path.name}.")
+        return False
+    if result.returncode != 0 or not result.stdout:
+        error_output = result.stderr.decode('utf-8', errors='ignore') if result.stderr else "No stderr"
+        logger.warning(f"Scrub strip failed for {video_path.name}. Code: {result.returncode}. Error: {error_output[:300]}")
+        return False
+
+    columns, rows = sprite_grid(count)
+    strip = {'file': SCRUB_SPRITE_FILENAME, 'count': count, 'columns': columns, 'rows': rows,
+             'interval': duration / count}
+    try:
+        (video_cache_dir / SCRUB_SPRITE_FILENAME).write_bytes(result.stdout)
+        with open(video_cache_dir / SCRUB_INDEX_FILENAME, 'w') as f:
+            json.dump(strip, f, indent=4)
+    except OSError as e:
+        logger.warning(f"Failed to write scrub strip for {video_path.name}: {e}")
+        return False
+    logger.debug(f"Scrub strip with {count} frames written for {video_path.name}")
+    return True
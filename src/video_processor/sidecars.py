@@ -0,0 +1,134 @@
+import hashlib
+import io
+import os
+import re
+from pathlib import Path
+from urllib.parse import quote
+
+from PIL import Image
+from loguru import logger
+
+from .encoding import encode_image, file_extension
+
+SIDECAR_PREFIX = "sidecar"
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.webp', '.tbn')
+VIDEO_SIDECAR_SUFFIXES = ('-thumb', '-poster', '-fanart', '') # Kodi/Jellyfin/Plex naming: '<video name><suffix>.jpg'
+FOLDER_ART_NAMES = ('poster', 'folder', 'cover') # Art of a whole folder, only used for a folder's single video
+FREEDESKTOP_SIZES = ('xx-large', 'x-large', 'large', 'normal') # Largest first
+_NFO_THUMB_RE = re.compile(r'<thumb[^>]*>\s*([^<]+?)\s*</thumb>', re.IGNORECASE)
+
+
+def _first_image(directory: Path, stem: str):
+    for extension in IMAGE_EXTENSIONS:
+        for candidate in (directory / f"{stem}{extension}", directory / f"{stem}{extension.upper()}"):
+            if candidate.is_file():
+                return candidate
+    return None
+
+
+def nfo_thumbnails(video_path: Path) -> list:
+    """Local images referenced by <thumb> in the video's .nfo file (media server metadata); URLs are skipped."""
+    images = []
+    for nfo_path in (video_path.with_suffix('.nfo'), video_path.parent / 'movie.nfo'):
+        if not nfo_path.is_file():
+            continue
+        try:
+            text = nfo_path.read_text(encoding='utf-8', errors='ignore')
+        except OSError:
+            continue
+        for reference in _NFO_THUMB_RE.findall(text):
+            if '://' in reference:
+                continue
+            image_path = Path(reference)
+            if not image_path.is_absolute():
+                image_path = video_path.parent / image_path
+            if image_path.is_file():
+                images.append(image_path)
+    return images
+
+
+def freedesktop_thumbnail(video_path: Path):
+    """The file manager's thumbnail of the video from ~/.cache/thumbnails, if it is up to date.
+
+    Thumbnails are named after the MD5 of the file URI and record the video's mtime
+    ('Thumb::MTime'); a thumbnail of an older version of the file is ignored.
+    """
+    if os.name == 'nt':
+        return None
+    cache_home = Path(os.environ.get('XDG_CACHE_HOME') or Path.home() / '.cache')
+    uri = 'file://' + quote(str(video_path.resolve()), safe="/!$&'()*+,:=@~")
+    name = hashlib.md5(uri.encode('utf-8')).hexdigest() + '.png'
+    try:
+        video_mtime = int(video_path.stat().st_mtime)
+    except OSError:
+        return None
+    for size in FREEDESKTOP_SIZES:
+        candidate = cache_home / 'thumbnails' / size / name
+        if not candidate.is_file():
+            continue
+        try:
+            with Image.open(candidate) as img:
+                recorded_mtime = img.info.get('Thumb::MTime')
+        except Exception:
+            continue
+        if recorded_mtime is None or int(recorded_mtime) == video_mtime:
+            return candidate
+    return None
+
+
+def find_sidecar_image(video_path: Path):
+    """Existing artwork for a video, most specific source first.
+
+    Order: '<name>-thumb', '<name>-poster', '<name>-fanart' and '<name>' images next to the
+    video, images referenced by its .nfo file, the desktop's freedesktop thumbnail, and finally
+    folder art (poster/folder/cover) when the video is the only file of its type in the folder.
+
+    Returns:
+        Path | None: The image, or None if the video has no artwork.
+    """
+    directory = video_path.parent
+    for suffix in VIDEO_SIDECAR_SUFFIXES:
+        image = _first_image(directory, f"{video_path.stem}{suffix}")
+        if image is not None:
+            return image
+    for image in nfo_thumbnails(video_path):
+        return image
+    image = freedesktop_thumbnail(video_path)
+    if image is not None:
+        return image
+    for stem in FOLDER_ART_NAMES:
+        image = _first_image(directory, stem)
+        if image is None:
+            continue
+        # Only list the folder once art is found; a season folder's poster does not fit every episode.
+        try:
+            siblings = sum(1 for p in directory.iterdir() if p.suffix.lower() == video_path.suffix.lower())
+        except OSError:
+            return None
+        return image if siblings == 1 else None
+    return None
+
+
+def import_sidecar(processor, video_path: Path, video_cache_dir: Path, frame_key: str):
+    """Copy a video's existing artwork into its cache as a thumbnail in the current size and format.
+
+    Returns:
+        tuple | None: (thumbnail filename, source image path), or None without usable artwork.
+    """
+    source = find_sidecar_image(video_path)
+    if source is None:
+        return None
+    filename = f"{SIDECAR_PREFIX}_{frame_key}.{file_extension(processor.thumbnail_format)}"
+    try:
+        with Image.open(io.BytesIO(source.read_bytes())) as img:
+            height = max(1, round(img.height * processor.thumbnail_width / img.width))
+            img.draft('RGB', (processor.thumbnail_width, height)) # JPEG artwork decodes at a reduced size
+            img = img.convert('RGB')
+            if img.size != (processor.thumbnail_width, height):
+                img = img.resize((processor.thumbnail_width, height), Image.Resampling.LANCZOS, reducing_gap=2.0)
+            data = encode_image(img, processor.thumbnail_format, processor.encode_preset, processor.thumbnail_quality)
+        (video_cache_dir / filename).write_bytes(data)
+    except Exception as e:
+        logger.warning(f"Sidecars: Could not import {source} for {video_path.name}: {e}")
+        return None
+    return filename, source
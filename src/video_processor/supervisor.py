@@ -0,0 +1,455 @@
+import os
+import signal
+import subprocess
+import threading
+import time
+
+from loguru import logger
+
+try:
+    import resource
+except ImportError: # Windows
+    resource = None
+
+try:
+    import psutil # Optional: priorities and suspending on Windows, I/O priority on Linux
+except ImportError:
+    psutil = None
+
+IO_PRIORITIES = ('normal', 'low', 'idle')
+CPU_LIMIT_GRACE = 5 # Seconds between the soft CPU limit (SIGXCPU) and the hard one (SIGKILL)
+# Messages FFmpeg prints when an allocation is refused (ENOMEM). EAGAIN and crashes have too many
+# other causes (thread or process limits, broken files, decoder bugs) to be blamed on the memory limit.
+_MEMORY_ERRORS = ('Cannot allocate memory', 'Out of memory', 'std::bad_alloc')
+_DEVICE_ERRORS = ('Device creation failed', 'Hardware device setup failed') # Reported as ENOMEM without a GPU
+_SIGXCPU_EXIT = -getattr(signal, 'SIGXCPU', 24) # A child that does not handle the soft CPU limit
+_SIGKILL_EXIT = -getattr(signal, 'SIGKILL', 9) # The hard CPU limit, but also the OOM killer or a user
+_warned_unsupported = set() # Settings already reported as unsupported on this system
+
+
+class FFmpegCancelled(Exception):
+    """Raised when an FFmpeg command is refused or killed because a stop was requested."""
+
+
+class FFmpegLimitExceeded(Exception):
+    """Raised when an FFmpeg child ran out of the memory or CPU time its ResourceLimits allow.
+
+    Attributes:
+        resource (str): 'memory' or 'cpu'.
+    """
+
+    def __init__(self, resource_name, cmd):
+        super().__init__(f"{cmd[0]} exceeded its {resource_name} limit")
+        self.resource = resource_name
+
+
+class ResourceLimits:
+    """Per-process limits and priorities applied to every FFmpeg child of a supervisor.
+
+    Memory is limited through RLIMIT_DATA (heap and other private writable mappings) rather than
+    the address space, which hardware decoders reserve in large unused chunks. Limits are set
+    with prlimit right after the child starts on Linux and in the child before exec on other
+    POSIX systems; Windows only gets the priorities, and only with psutil installed.
+
+    Args:
+        memory_mb (int): Private memory per child in MB, 0 = unlimited.
+        cpu_seconds (int): CPU time per child (all threads together), 0 = unlimited.
+        nice (int): Niceness added to the child, 0 = same priority as the application.
+        io_priority (str): 'normal', 'low' (lowest best-effort level) or 'idle'.
+    """
+
+    def __init__(self, memory_mb=0, cpu_seconds=0, nice=0, io_priority='normal'):
+        self.memory_mb = max(0, int(memory_mb or 0))
+        self.cpu_seconds = max(0, int(cpu_seconds or 0))
+        self.nice = max(0, min(19, int(nice or 0)))
+        if io_priority not in IO_PRIORITIES:
+            logger.warning(f"ResourceLimits: Invalid I/O priority '{io_priority}', using 'normal'.")
+            io_priority = 'normal'
+        if io_priority != 'normal' and (psutil is None or not hasattr(psutil.Process, 'ionice')):
+            _warn_unsupported('io_priority', f"ResourceLimits: I/O priority '{io_priority}' needs psutil, "
+                                             f"which is not installed; FFmpeg runs at normal I/O priority.")
+            io_priority = 'normal'
+        if self.nice and os.name == 'nt' and psutil is None:
+            _warn_unsupported('nice', "ResourceLimits: Lowering the FFmpeg priority on Windows needs psutil, "
+                                      "which is not installed; FFmpeg runs at normal priority.")
+            self.nice = 0
+        self.io_priority = io_priority
+
+    def _rlimits(self):
+        limits = []
+        if resource is None:
+            return limits
+        if self.memory_mb:
+            limits.append((resource.RLIMIT_DATA, (self.memory_mb * 1024 * 1024,) * 2))
+        if self.cpu_seconds:
+            limits.append((resource.RLIMIT_CPU, (self.cpu_seconds, self.cpu_seconds + CPU_LIMIT_GRACE)))
+        return limits
+
+    def preexec_fn(self):
+        """Function run in the child before exec where limits cannot be set from outside (non-Linux POSIX)."""
+        limits = self._rlimits()
+        if not limits or hasattr(resource, 'prlimit'):
+            return None
+
+        # preexec_fn runs between fork and exec of a multithreaded process, where only the forking
+        # thread survives: it must not import, log or take any lock another thread may have held.
+        # It only calls setrlimit on values computed here, and is not used at all where prlimit exists.
+        def apply_in_child():
+            for limit, values in limits:
+                resource.setrlimit(limit, values)
+        return apply_in_child
+
+    def apply(self, process):
+        """Set the limits and priorities of a freshly started child."""
+        if resource is not None and hasattr(resource, 'prlimit'):
+            for limit, values in self._rlimits():
+                try:
+                    resource.prlimit(process.pid, limit, values)
+                except (OSError, ValueError) as e:
+                    logger.debug(f"ResourceLimits: prlimit failed for {process.pid}: {e}")
+        try:
+            if self.nice:
+                if os.name == 'nt':
+                    if psutil is not None:
+                        psutil.Process(process.pid).nice(psutil.IDLE_PRIORITY_CLASS if self.nice >= 15
+                                                         else psutil.BELOW_NORMAL_PRIORITY_CLASS)
+                else:
+                    os.setpriority(os.PRIO_PROCESS, process.pid, os.getpriority(os.PRIO_PROCESS, 0) + self.nice)
+            if self.io_priority != 'normal' and psutil is not None and hasattr(psutil.Process, 'ionice'):
+                child = psutil.Process(process.pid)
+                if os.name == 'nt':
+                    child.ionice(psutil.IOPRIO_VERYLOW if self.io_priority == 'idle' else psutil.IOPRIO_LOW)
+                elif self.io_priority == 'idle':
+                    child.ionice(psutil.IOPRIO_CLASS_IDLE)
+                else:
+                    child.ionice(psutil.IOPRIO_CLASS_BE, value=7)
+        except Exception as e: # The child may already have exited
+            logger.debug(f"ResourceLimits: Could not set the priority of {process.pid}: {e}")
+
+    def exceeded(self, returncode, stderr, cpu_time=None) -> str | None:
+        """The limit an exited child ran into ('memory' or 'cpu'), judged from its exit status and stderr.
+
+        Only called for children the supervisor did not kill itself. A SIGKILL is only blamed on the
+        hard CPU limit when the child's measured CPU time reached the limit; FFmpeg itself handles
+        SIGXCPU and exits with its ordinary error code 255, which says nothing about the cause. The
+        memory limit is only blamed for an explicit ENOMEM message, and not at all when a hardware
+        device failed to open, which FFmpeg reports as ENOMEM on every line that follows.
+
+        Args:
+            returncode (int): Exit status of the child.
+            stderr (bytes): Its captured stderr.
+            cpu_time (float): User and system CPU seconds it used, None where not measurable.
+        """
+        if returncode is None or returncode == 0:
+            return None
+        if self.cpu_seconds and (returncode == _SIGXCPU_EXIT or returncode == _SIGKILL_EXIT
+                                 and cpu_time is not None and cpu_time >= self.cpu_seconds):
+            return 'cpu'
+        if self.memory_mb:
+            text = stderr.decode('utf-8', errors='ignore') if stderr else ''
+            if any(message in text for message in _MEMORY_ERRORS) and not any(message in text for message in _DEVICE_ERRORS):
+                return 'memory'
+        return None
+
+
+def _warn_unsupported(setting, message):
+    if setting not in _warned_unsupported:
+        _warned_unsupported.add(setting)
+        logger.warning(message)
+
+
+def _reap(process):
+    """Wait for a child to exit and return the CPU seconds it used, None where not measurable.
+
+    The child is reaped with wait4 (POSIX), which reports its own resource usage, instead of
+    Popen.wait; the exit status is stored on the Popen object as wait() would.
+    """
+    if not hasattr(os, 'wait4'):
+        process.wait()
+        return None
+    try:
+        _, status, usage = os.wait4(process.pid, 0)
+    except ChildProcessError: # Already reaped by a kill() racing with its exit
+        process.wait()
+        return None
+    process.returncode = os.waitstatus_to_exitcode(status)
+    return usage.ru_utime + usage.ru_stime
+
+
+def _suspend_process(process) -> bool:
+    """Freeze a running child (SIGSTOP, or psutil on Windows); False if it cannot be suspended."""
+    try:
+        if os.name != 'nt':
+            process.send_signal(signal.SIGSTOP)
+            return True
+        if psutil is not None:
+            psutil.Process(process.pid).suspend()
+            return True
+    except Exception as e: # The child may already have exited
+        logger.debug(f"FFmpegSupervisor: Could not suspend {process.pid}: {e}")
+    return False
+
+
+def _resume_process(process):
+    try:
+        if os.name != 'nt':
+            process.send_signal(signal.SIGCONT)
+        elif psutil is not None:
+            psutil.Process(process.pid).resume()
+    except Exception as e:
+        logger.debug(f"FFmpegSupervisor: Could not resume {process.pid}: {e}")
+
+
+class _PausableTimer:
+    """Like threading.Timer, but counting down on the supervisor's clock, which stands still while paused."""
+
+    def __init__(self, timeout, clock, function):
+        self._deadline = clock() + timeout
+        self._clock = clock
+        self._function = function
+        self._lock = threading.Lock()
+        self._timer = None
+        self._cancelled = False
+
+    def start(self):
+        self._arm(self._deadline - self._clock())
+
+    def _arm(self, delay):
+        with self._lock:
+            if self._cancelled:
+                return
+            self._timer = threading.Timer(max(0.0, delay), self._expire)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _expire(self):
+        remaining = self._deadline - self._clock()
+        if remaining > 0: # A pause moved the deadline
+            self._arm(remaining)
+            return
+        with self._lock:
+            if self._cancelled:
+                return
+        self._function()
+
+    def cancel(self):
+        with self._lock:
+            self._cancelled = True
+            if self._timer is not None:
+                self._timer.cancel()
+
+
+class FFmpegSupervisor:
+    """Owns every FFmpeg child process started by a VideoProcessor.
+
+    Commands run through run() are registered while alive, so stop() can kill all of them at
+    once instead of waiting for each blocking call to return or time out. After stop() every new
+    command is refused until reset() is called at the start of the next scan or batch. Every child
+    is started under the supervisor's ResourceLimits.
+
+    pause() holds every new command back (the calling threads wait) and can suspend the running
+    children until resume(); timeouts are measured on clock(), which does not advance while paused.
+    A pause outlasts reset(), so pausing between the scan and the batch holds the batch as well;
+    only resume() or stop() ends it.
+    """
+
+    def __init__(self, limits=None):
+        self._lock = threading.Lock()
+        self._processes = set()
+        self._stopped = False
+        self.limits = limits or ResourceLimits()
+        self._resumed = threading.Event() # Cleared while paused
+        self._resumed.set()
+        self._suspended = set()
+        self._suspend_running = False # Whether the current pause suspends children
+        self._paused_since = None
+        self._paused_total = 0.0
+
+    @property
+    def stopped(self) -> bool:
+        return self._stopped
+
+    @property
+    def paused(self) -> bool:
+        return not self._resumed.is_set()
+
+    def clock(self) -> float:
+        """Monotonic seconds that stand still while paused, used for timeouts and time budgets."""
+        with self._lock:
+            paused = self._paused_total
+            if self._paused_since is not None:
+                paused += time.monotonic() - self._paused_since
+        return time.monotonic() - paused
+
+    def pause(self, suspend_running=True) -> int:
+        """Hold back every new FFmpeg child until resume().
+
+        Args:
+            suspend_running (bool): Also freeze the children already running; otherwise they finish.
+                Children are suspended with SIGSTOP, on Windows only with psutil installed.
+
+        Returns:
+            int: Number of running children suspended.
+        """
+        with self._lock:
+            if self._paused_since is not None:
+                return 0
+            self._paused_since = time.monotonic()
+            self._resumed.clear()
+            self._suspend_running = suspend_running
+            if suspend_running:
+                self._suspended = {process for process in self._processes if _suspend_process(process)}
+            suspended = len(self._suspended)
+        logger.info(f"FFmpegSupervisor: Paused, {suspended} running FFmpeg processes suspended.")
+        return suspended
+
+    def resume(self):
+        """Continue the suspended children and let waiting commands start."""
+        with self._lock:
+            if self._paused_since is None:
+                return
+            self._paused_total += time.monotonic() - self._paused_since
+            self._paused_since = None
+            for process in self._suspended:
+                _resume_process(process)
+            self._suspended.clear()
+            self._resumed.set()
+        logger.info("FFmpegSupervisor: Resumed.")
+
+    def wait_resumed(self, timeout=None) -> bool:
+        """Block while paused, at most `timeout` seconds; True once not paused."""
+        return self._resumed.wait(timeout)
+
+    def reset(self):
+        """Accept new commands again after stop(); a pause stays in effect."""
+        with self._lock:
+            self._stopped = False
+
+    def stop(self):
+        """Kill every running FFmpeg child and refuse new ones."""
+        with self._lock:
+            self._stopped = True
+            processes = list(self._processes)
+            if self._paused_since is not None: # Wake the commands waiting for a resume so they are refused
+                self._paused_total += time.monotonic() - self._paused_since
+                self._paused_since = None
+                self._suspended.clear() # Killed below; SIGKILL also ends a stopped process
+                self._resumed.set()
+        for process in processes:
+            try:
+                process.kill()
+            except OSError:
+                pass # Already exited
+        if processes:
+            logger.info(f"FFmpegSupervisor: Killed {len(processes)} running FFmpeg processes.")
+
+    def _launch(self, cmd):
+        """Start and register a child under the resource limits once the supervisor is not paused.
+
+        The child is started outside the lock, so a slow fork or exec never holds up stop(), pause()
+        or other commands; a stop or pause that comes in meanwhile is applied when it is registered.
+        """
+        while True:
+            with self._lock:
+                if self._stopped:
+                    raise FFmpegCancelled(cmd[0])
+                if self._paused_since is None:
+                    break
+            self._resumed.wait() # stop() sets it as well
+        process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                                   preexec_fn=self.limits.preexec_fn())
+        self.limits.apply(process)
+        with self._lock:
+            stopped = self._stopped
+            if not stopped:
+                self._processes.add(process)
+                if self._paused_since is not None and self._suspend_running and _suspend_process(process):
+                    self._suspended.add(process)
+        if stopped:
+            process.kill()
+            process.communicate()
+            raise FFmpegCancelled(cmd[0])
+        return process
+
+    def _check_limits(self, cmd, returncode, stderr, cpu_time):
+        resource_name = self.limits.exceeded(returncode, stderr, cpu_time)
+        if resource_name is not None:
+            raise FFmpegLimitExceeded(resource_name, cmd)
+
+    def run(self, cmd, timeout) -> subprocess.CompletedProcess:
+        """Run a command to completion, capturing stdout and stderr as bytes.
+
+        Args:
+            cmd (list): Command and arguments.
+            timeout (float): Seconds before the child is killed.
+
+        Returns:
+            subprocess.CompletedProcess: The finished command.
+
+        Raises:
+            subprocess.TimeoutExpired: If the deadline passed (the child has been killed).
+            FFmpegCancelled: If a stop was requested before or while the command ran.
+            FFmpegLimitExceeded: If the child ran out of its memory or CPU time limit.
+        """
+        stdout_chunks = []
+        result = self.run_streaming(cmd, timeout, stdout_chunks.append) # append returns None: never ends early
+        return subprocess.CompletedProcess(cmd, result.returncode, b''.join(stdout_chunks), result.stderr)
+
+    def run_streaming(self, cmd, timeout, on_output) -> subprocess.CompletedProcess:
+        """Run a command, handing its stdout to `on_output` as it arrives; the callback can end it early.
+
+        Args:
+            cmd (list): Command and arguments.
+            timeout (float): Seconds before the child is killed.
+            on_output (callable): Called with each stdout chunk; returning True kills the child,
+                whose output is then complete enough for the caller.
+
+        Returns:
+            subprocess.CompletedProcess: The command with empty stdout (it went to `on_output`);
+            returncode is None when the callback ended it.
+
+        Raises:
+            subprocess.TimeoutExpired: If the deadline passed (the child has been killed).
+            FFmpegCancelled: If a stop was requested before or while the command ran.
+            FFmpegLimitExceeded: If the child ran out of its memory or CPU time limit.
+        """
+        process = self._launch(cmd)
+        stderr_chunks = []
+        # Drained on a thread so a chatty stderr can never block the child while stdout is read.
+        stderr_reader = threading.Thread(target=lambda: stderr_chunks.append(process.stderr.read()), daemon=True)
+        stderr_reader.start()
+        timed_out = threading.Event()
+        timer = _PausableTimer(timeout, self.clock, lambda: (timed_out.set(), process.kill()))
+        timer.start()
+        ended_early = False
+        try:
+            while True:
+                chunk = process.stdout.read1(65536)
+                if not chunk:
+                    break
+                if on_output(chunk):
+                    ended_early = True
+                    process.kill()
+                    break
+            cpu_time = _reap(process)
+            stderr_reader.join()
+        finally:
+            timer.cancel()
+            process.stdout.close()
+            with self._lock:
+                self._processes.discard(process)
+        if self._stopped:
+            raise FFmpegCancelled(cmd[0])
+        if timed_out.is_set() and not ended_early:
+            raise subprocess.TimeoutExpired(cmd, timeout)
+        stderr = b''.join(stderr_chunks)
+        if not ended_early:
+            self._check_limits(cmd, process.returncode, stderr, cpu_time)
+        return subprocess.CompletedProcess(cmd, None if ended_early else process.returncode, b'', stderr)
+
+
+def run_command(cmd, timeout, supervisor=None) -> subprocess.CompletedProcess:
+    """Run a command through `supervisor` when given, otherwise as a plain blocking subprocess."""
+    if supervisor is not None:
+        return supervisor.run(cmd, timeout)
+    return subprocess.run(cmd, capture_output=True, text=False, timeout=timeout)
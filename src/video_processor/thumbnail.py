@@ -1,23 +1,58 @@
 import subprocess
+import io
 import json
 from pathlib import Path
-import time
-import numpy as np
 from PIL import Image
 
 from loguru import logger
 
 from src.distribution_enum import Distribution
+from src.thumbnail_format_enum import ThumbnailFormat, DecodePreset
+from src.failure_kind_enum import FailureKind
+from .encoding import ffmpeg_output_args, file_extension, needs_pillow_encode, encode_with_pillow
 from .cache import get_cache_path, is_cache_valid, clear_cache
+from .derive import MASTER_QSCALE, derive_thumbnail, master_filename, master_key, master_output_args, master_width
+from .frame_quality import CANDIDATE_FRAMES, CANDIDATE_STEP, CandidatePicker, candidate_select, is_acceptable
+from .frame_store import (MAX_FRAMES_FACTOR, FrameStore, frame_filename, processor_frame_key,
+                          reuse_tolerance)
+from .keyframes import keyframe_before, keyframe_index, snap_to_keyframes
+from .sidecars import import_sidecar
+from .scrub import SCRUB_FRAME_WIDTH, extract_scrub_strip, needs_scrub_strip
+from .supervisor import FFmpegCancelled, FFmpegLimitExceeded, run_command
+from .failures import classify_stderr, classify_exception, failure_detail, is_fatal
+from .scenes import analyse_scenes
+from .probe import probe_video
+from .timestamp_plan import PLAN_METHOD, chapter_timestamps, normalized_plan, plan_timestamps
+
+# Deadlines of a single FFmpeg attempt (see command_timeout).
+MIN_COMMAND_TIMEOUT = 5.0
+MAX_COMMAND_TIMEOUT = 300.0
+TIMEOUT_SAFETY_FACTOR = 8.0 # Multiple of the expected time of one extraction
+SECONDS_PER_GB_READ = 2.0 # Extra allowance for large (possibly remote) files
+OUTPUT_SEEK_SPEED = 8.0 # Conservative decode speed, x realtime at 1080p, when seeking after '-i'
+# Automatic per-video budget: multiple of the video's estimated FFmpeg time, never below the minimum.
+VIDEO_BUDGET_FACTOR = 20.0
+MIN_VIDEO_BUDGET = 60.0
+COVER_TIMEOUT = 30.0
+DRAFT_MAX_LOWRES = 3 # Decode at most at 1/8 of the source width
 
 def generate_placeholder_thumbnail(processor):
     height = int(processor.thumbnail_width * 9 / 16)
     return Image.new('RGB', (processor.thumbnail_width, height), color='gray')
 
-def get_video_duration(video_path):
+def validate_image_bytes(data: bytes):
+    """Verify that an encoded image held in memory can be decoded by Pillow.
+
+    Raises:
+        Exception: Whatever Pillow raises for truncated or corrupt data.
+    """
+    with Image.open(io.BytesIO(data)) as img:
+        img.verify()
+
+def get_video_duration(video_path, supervisor=None):
     cmd = ['ffmpeg', '-i', str(video_path), '-hide_banner']
     try:
-        result = subprocess.run(cmd, capture_output=True, text=False, timeout=30)
+        result = run_command(cmd, 30, supervisor)
         output = result.stderr.decode('utf-8', errors='ignore')
         duration = 0
         for line in output.split('\n'):
@@ -32,121 +67,379 @@ def get_video_duration(video_path):
     except subprocess.TimeoutExpired:
         logger.warning(f"ffmpeg timeout while getting duration for {video_path}")
         return 0
+    except FFmpegCancelled:
+        return 0
+    except FFmpegLimitExceeded as e:
+        logger.warning(f"FFmpeg exceeded its {e.resource} limit while getting duration for {video_path}")
+        return 0
     except Exception as e:
         logger.error(f"Error getting video duration for {video_path}: {e}")
         return 0
 
 
-def generate_distributed_timestamps(processor, duration):
+def current_plan(processor) -> tuple:
+    """The processor's normalized timestamp plan (see timestamp_plan.normalized_plan)."""
     if not isinstance(processor.distribution, Distribution):
         logger.warning(f"Invalid distribution type: {type(processor.distribution)}. Defaulting to UNIFORM.")
         current_distribution = Distribution.UNIFORM
     else:
         current_distribution = processor.distribution
+    return normalized_plan(current_distribution, processor.thumbnails_per_video,
+                           float(processor.peak_pos), float(processor.concentration))
+
+
+def plan_method(processor) -> str:
+    if processor.distribution in (Distribution.SCENES, Distribution.CHAPTERS):
+        return processor.distribution.value # Their timestamps come from the video, the plan only fills gaps
+    return PLAN_METHOD
+
+
+def cached_plan_matches(processor, cache: dict) -> bool:
+    """True if a cache entry was planned with the same timestamp positions as the current settings.
+
+    Settings that give the same plan (e.g. any peak position with the uniform distribution) keep
+    the entry valid. Entries written before plans were recorded are compared by their raw settings.
+    """
+    plan = cache.get('timestamp_plan')
+    if plan is None:
+        return (cache.get('peak_pos') == processor.peak_pos and
+                cache.get('concentration') == processor.concentration and
+                cache.get('distribution') == processor.distribution.value)
+    positions = current_plan(processor)
+    cached_positions = plan.get('positions') or []
+    return (plan.get('method') == plan_method(processor) and len(cached_positions) == len(positions) and
+            all(abs(a - b) < 1e-9 for a, b in zip(cached_positions, positions)))
 
-    num_thumbnails = processor.thumbnails_per_video
-    if num_thumbnails <= 0:
-        logger.warning(f"Thumbnails per video is {num_thumbnails}, must be > 0. Returning empty timestamps.")
+
+def generate_distributed_timestamps(processor, duration):
+    """Timestamps in seconds for one video: the processor's deterministic plan scaled to its duration."""
+    if processor.thumbnails_per_video <= 0:
+        logger.warning(f"Thumbnails per video is {processor.thumbnails_per_video}, must be > 0. Returning empty timestamps.")
         return []
+    return sorted(set(float(ts) for ts in plan_timestamps(current_plan(processor), [duration])[0]))
 
-    match current_distribution:
-        case Distribution.UNIFORM:
-            if num_thumbnails == 0: return []
-            if num_thumbnails == 1: normalized_timestamps = np.array([0.5])
-            else: normalized_timestamps = np.linspace(0, 1, num_thumbnails + 2)[1:-1]
-        case Distribution.TRIANGULAR:
-            if num_thumbnails == 0: return []
-            peak_pos_f = float(processor.peak_pos)
-            concentration_f = float(processor.concentration)
-
-            left_bound = max(0, peak_pos_f - concentration_f)
-            right_bound = min(1, peak_pos_f + concentration_f)
-            mode = np.clip(peak_pos_f, left_bound, right_bound)
-
-            if abs(right_bound - left_bound) < 1e-6 or concentration_f < 1e-3:
-                spread_epsilon = 0.05
-                left_fallback = max(0, peak_pos_f - spread_epsilon)
-                right_fallback = min(1, peak_pos_f + spread_epsilon)
-                if left_fallback >= right_fallback:
-                    normalized_timestamps = np.full(num_thumbnails, peak_pos_f)
-                else:
-                    normalized_timestamps = np.random.triangular(left_fallback, peak_pos_f, right_fallback, num_thumbnails)
 
-            else:
-                normalized_timestamps = np.random.triangular(left_bound, mode, right_bound, num_thumbnails)
+def thread_args(processor) -> list:
+    """FFmpeg options applying the processor's per-process thread budget (empty to keep FFmpeg's defaults).
 
-        case Distribution.NORMAL:
-            if num_thumbnails == 0: return []
-            sigma = max(float(processor.concentration), 1e-6)
+    Placed before '-i', '-threads' sizes the decoder; '-filter_threads' is global and sizes the scale filter.
+    """
+    threads = getattr(processor, 'ffmpeg_threads', None)
+    if not threads:
+        return []
+    return ['-threads', str(threads), '-filter_threads', str(threads)]
 
-            initial_sample_size = num_thumbnails * 10 if num_thumbnails > 1 else 20
-            samples = np.random.normal(float(processor.peak_pos), sigma, initial_sample_size)
-            samples_clipped = np.clip(samples, 0, 1)
 
-            if num_thumbnails == 1:
-                normalized_timestamps = np.array([np.median(samples_clipped)])
-            else:
-                percentiles_to_sample = np.linspace(0, 100, num_thumbnails)
-                normalized_timestamps = np.percentile(samples_clipped, percentiles_to_sample)
-        case _:
-            logger.error(f"Unknown distribution: {current_distribution}. Defaulting to UNIFORM.")
-            if num_thumbnails == 0: return []
-            if num_thumbnails == 1: normalized_timestamps = np.array([0.5])
-            else: normalized_timestamps = np.linspace(0, 1, num_thumbnails + 2)[1:-1]
-
-    normalized_timestamps = np.unique(np.clip(normalized_timestamps, 0.01, 0.99))
-
-    if len(normalized_timestamps) < num_thumbnails and num_thumbnails > 0:
-        logger.trace(f"Distribution generated {len(normalized_timestamps)} unique timestamps, need {num_thumbnails}. Augmenting.")
-        if len(normalized_timestamps) > 0 :
-            uniform_fill = np.linspace(0.01, 0.99, num_thumbnails)
-            combined = np.concatenate((normalized_timestamps, uniform_fill))
-            normalized_timestamps = np.unique(combined)
-            if len(normalized_timestamps) > num_thumbnails:
-                indices = np.round(np.linspace(0, len(normalized_timestamps) - 1, num_thumbnails)).astype(int)
-                normalized_timestamps = normalized_timestamps[indices]
-        else:
-            normalized_timestamps = np.linspace(0.01, 0.99, num_thumbnails)
-
-
-    timestamps_in_seconds = [ts * duration for ts in normalized_timestamps]
-
-    if len(timestamps_in_seconds) > num_thumbnails:
-        indices = np.round(np.linspace(0, len(timestamps_in_seconds) - 1, num_thumbnails)).astype(int)
-        timestamps_in_seconds = [timestamps_in_seconds[i] for i in indices]
-    elif len(timestamps_in_seconds) < num_thumbnails and num_thumbnails > 0:
-        if timestamps_in_seconds:
-            timestamps_in_seconds.extend([timestamps_in_seconds[-1]] * (num_thumbnails - len(timestamps_in_seconds)))
-        else:
-            timestamps_in_seconds = [(duration * 0.5)] * num_thumbnails
-
-    return sorted(list(set(timestamps_in_seconds)))
+def decode_args(processor, info=None, output_width: int = 0) -> list:
+    """Decoder shortcuts of the 'draft' decode preset, placed before '-i' (empty for 'standard').
 
+    These are generic decoder options: codecs that do not implement one ignore it (lowres is only
+    supported by a few decoders such as MJPEG), so they are safe for every file. lowres halves the
+    decoded size per step while staying at least `output_width` wide.
+    """
+    if processor.decode_preset != DecodePreset.DRAFT:
+        return []
+    args = ['-skip_loop_filter', 'all', '-skip_idct', 'noref', '-flags2', '+fast']
+    lowres = 0
+    if info is not None and info.width > 0 and output_width > 0:
+        while lowres < DRAFT_MAX_LOWRES and (info.width >> (lowres + 1)) >= output_width:
+            lowres += 1
+    if lowres:
+        args += ['-lowres', str(lowres)]
+    return args
 
-def generate_thumbnails(processor, video_path: Path, progress_callback=None, command_callback=None, stop_flag_check=None):
-    logger.debug(f"Starting thumbnail generation for {video_path} using cache_dir: {processor.cache_dir}")
+
+def scale_flags(processor) -> str:
+    """Scaler option suffix for the decode preset ('' keeps FFmpeg's default bicubic)."""
+    return ':flags=fast_bilinear' if processor.decode_preset == DecodePreset.DRAFT else ''
+
+
+def build_cmd_attempts(processor, video_path: Path, timestamp: float, keyframe: float = None) -> list:
+    """Build the ladder of FFmpeg commands tried, in order, to extract one thumbnail.
+
+    Every command streams the encoded image to stdout: a master frame (see derive.py) when master
+    frames are enabled, otherwise the thumbnail itself in the processor's thumbnail format. With
+    frame scoring, all but the last attempt stream up to CANDIDATE_FRAMES JPEG candidates instead
+    (see frame_quality.py), and the caller keeps the first one that is neither blank nor blurry;
+    the last attempt still encodes a single frame in the thumbnail (or master) format.
+
+    With a known keyframe, the seeking attempts seek to its time and decode forward only the
+    remaining distance. The seek itself still goes through FFmpeg's demuxer; the index only stores
+    times, so it saves decoding, not a poor container index.
+
+    Args:
+        processor: The VideoProcessor instance.
+        video_path (Path): Path to the video file.
+        timestamp (float): Target position in seconds.
+        keyframe (float, optional): Last keyframe at or before `timestamp` (see keyframes.py).
+
+    Returns:
+        list: FFmpeg argument lists, most optimized first.
+    """
+    # Base scale filter: preserve aspect ratio by specifying width and -1 for height.
+    scale_vf = f'scale={processor.thumbnail_width}:-1{scale_flags(processor)}'
+    output_width = processor.thumbnail_width
+    master = master_width(processor)
+    if master:
+        # Masters are capped, never upscaled: small sources are kept at their own resolution.
+        scale_vf = f"scale='min(iw,{master})':-2{scale_flags(processor)}"
+        output_width = master
+    # Common output format for good compatibility.
+    format_vf = 'format=yuv420p'
+    # Combine scale and format, can be extended with other filters.
+    vf_complex = f'{scale_vf},{format_vf}'
+
+    if master:
+        output_args = master_output_args()
+    else:
+        output_args = ffmpeg_output_args(processor.thumbnail_format, processor.encode_preset, processor.thumbnail_quality)
+    # The last resort takes a single frame without scoring, so it keeps the format's own encoder.
+    last_resort_output_args = output_args
+    frame_args = ['-vframes', '1']
+    if processor.frame_scoring:
+        # Candidates are scored as JPEG; non-JPEG thumbnails are re-encoded from the chosen one.
+        # Passthrough timing, or the muxer would pad the gaps between candidates with copies of the first.
+        frame_args = ['-vsync', '0', '-frames:v', str(CANDIDATE_FRAMES)]
+        if not master:
+            jpeg_quality = (processor.thumbnail_quality if processor.thumbnail_format == ThumbnailFormat.JPEG
+                            else MASTER_QSCALE)
+            output_args = ['-c:v', 'mjpeg', '-qscale:v', str(jpeg_quality), '-f', 'image2pipe', 'pipe:1']
+    is_jpeg = bool(master) or processor.frame_scoring or processor.thumbnail_format == ThumbnailFormat.JPEG
+    # The decode preset's shortcuts go with the thread budget before '-i'; the last resort runs without them.
+    threads = thread_args(processor) + decode_args(processor, processor.video_info.get(video_path), output_width)
+    input_seek, input_offset = ['-ss', str(timestamp), '-i', str(video_path)], 0.0
+    backoff_seek, backoff_offset = ['-ss', str(max(0, timestamp - 0.5)), '-i', str(video_path), '-ss', '0.5'], 0.5
+    if keyframe is not None:
+        input_seek, input_offset = ['-ss', str(keyframe), '-i', str(video_path)], round(timestamp - keyframe, 3)
+        if input_offset > 0:
+            input_seek += ['-ss', f'{input_offset:.3f}']
+        backoff_seek, backoff_offset = input_seek, input_offset
+
+    def video_filter(output_seek: float = 0.0) -> str:
+        # An output seek trims after the filters, so candidates are only counted from its position.
+        if not processor.frame_scoring:
+            return vf_complex
+        return f'{candidate_select(start=output_seek)},{vf_complex}'
+
+    return [
+        # Attempt 1: Standard HW accel (if available), precise seek before -i (or keyframe + forward).
+        ['ffmpeg', '-hide_banner', '-loglevel', 'error', *threads, '-hwaccel', 'cuda',
+         *input_seek,
+         '-vf', video_filter(input_offset),
+         *frame_args, *output_args],
+
+        # Attempt 2: Standard SW decoding, precise seek before -i.
+        ['ffmpeg', '-hide_banner', '-loglevel', 'error', *threads,
+         *input_seek,
+         '-vf', video_filter(input_offset),
+         *frame_args, *output_args],
+
+        # Attempt 3: SW decoding, seek after -i (slower, but can be more robust for some files).
+        ['ffmpeg', '-hide_banner', '-loglevel', 'error', *threads,
+         '-i', str(video_path), '-ss', str(timestamp),
+         '-vf', video_filter(timestamp),
+         *frame_args, *output_args],
+
+        # Attempt 4: SW, copyts for timestamp accuracy, no audio.
+        ['ffmpeg', '-hide_banner', '-loglevel', 'error', *threads,
+         '-copyts', '-ss', str(timestamp), '-i', str(video_path),
+         '-vf', video_filter(),
+         *frame_args, '-an', *output_args],
+
+        # Attempt 5: SW, seek slightly *before* the target timestamp, then seek forward
+        # 0.5s from that point (relative seek when -ss is after -i), or from the indexed keyframe.
+        ['ffmpeg', '-hide_banner', '-loglevel', 'error', *threads,
+         *backoff_seek,
+         '-vf', video_filter(backoff_offset),
+         *frame_args, *output_args],
+
+        # Attempt 6: -ss before -i, specify output pix_fmt explicitly for mjpeg.
+        ['ffmpeg', '-hide_banner', '-loglevel', 'error', *threads,
+         '-ss', str(timestamp), '-i', str(video_path),
+         '-vf', video_filter(), *(['-pix_fmt', 'yuvj420p'] if is_jpeg else []), # Common for JPEG
+         *frame_args, *output_args],
+
+        # Attempt 7: No HW accel, seek after -i, use a slightly different timestamp again
+        ['ffmpeg', '-hide_banner', '-loglevel', 'error', *threads,
+         '-i', str(video_path), '-ss', str(timestamp + 0.05), # Tiny positive offset
+         '-vf', video_filter(timestamp + 0.05),
+         *frame_args, *output_args],
+
+        # Attempt 8: A very basic command as a last resort.
+        ['ffmpeg', '-hide_banner', '-loglevel', 'warning', *thread_args(processor), # More verbose log for this one
+         '-i', str(video_path), '-ss', str(timestamp),
+         '-vframes', '1', '-s', f'{output_width}x-1', # Simpler scale
+         *last_resort_output_args],
+    ]
+
+
+class VideoJob:
+    """Per-video state shared by the individually scheduled thumbnail extractions of one video."""
+
+    def __init__(self, video_path: Path, video_cache_dir: Path, duration: float, timestamps: list, info=None):
+        self.video_path = video_path
+        self.video_cache_dir = video_cache_dir
+        self.duration = duration
+        self.timestamps = timestamps
+        self.info = info # VideoInfo from the scan, if available
+        self.results = [None] * len(timestamps) # Thumbnail filename per timestamp index
+        self.extract_seconds = [0.0] * len(timestamps) # FFmpeg wall time per timestamp index
+        self.attempt_seconds = [] # Durations of successful FFmpeg attempts, for adaptive deadlines
+        self.time_budget = 0.0 # Total FFmpeg seconds allowed for this video, 0 = unlimited
+        self.prefetched = {} # Timestamp index -> thumbnail bytes already produced by the scene analysis
+        self.prefetch_command = ""
+        self.pending = list(range(len(timestamps))) # Timestamp indices still to extract, in order
+        self.reused = set() # Indices served from the frame store without running FFmpeg
+        self.placeholders = set() # Indices where every attempt failed
+        self.failure = None # (FailureKind, detail) of a fatal error; the remaining timestamps are skipped
+        self.masters = {} # Index -> master frame filename written alongside the thumbnail
+        self.scrub_pending = False # Scrub sprite still to extract (see scrub.py)
+        self.sidecar = None # Path of the existing artwork used instead of extracted frames (see sidecar_job)
+        self.cover = None # Thumbnail made from embedded cover art, shown first (see attach_cover)
+        self.keyframes = [] # Keyframe times of the video when indexed (see keyframes.py)
+        self.scores = {} # Index -> frame quality score (see frame_quality.py), when scoring is enabled
+        self.completed = 0
+
+    def is_complete(self) -> bool:
+        return self.completed >= len(self.timestamps) and not self.scrub_pending
+
+    def fail(self, kind, detail: str = ""):
+        """Record a fatal error of the video (see failures.FATAL_FAILURES); the first one is kept."""
+        if self.failure is None:
+            self.failure = (kind, detail)
+
+    def remaining_budget(self, running_seconds: float = 0.0) -> float:
+        """FFmpeg seconds left in the video's time budget (infinite without a budget)."""
+        if self.time_budget <= 0:
+            return float('inf')
+        return self.time_budget - sum(self.extract_seconds) - running_seconds
+
+
+def command_timeout(processor, job: VideoJob, cmd: list, timestamp: float) -> float:
+    """Deadline for one FFmpeg attempt, scaled to the file instead of a fixed value.
+
+    The expected time of an extraction is the slowest successful attempt seen for this video, or
+    the cost model's estimate before the first success. Large files get extra time for reading,
+    and commands seeking after '-i' (which decode everything from the input position up to the
+    target) get time proportional to that distance and the resolution.
+
+    Returns:
+        float: Seconds before the attempt is killed.
+    """
+    info = job.info
+    if job.attempt_seconds:
+        expected = max(job.attempt_seconds)
+    else:
+        expected = processor.cost_model.estimate(info, 1)
+    timeout = expected * TIMEOUT_SAFETY_FACTOR
+    if info is not None:
+        timeout += SECONDS_PER_GB_READ * info.size_bytes / (1024 ** 3)
+    input_position = cmd.index('-i')
+    if '-ss' in cmd[input_position:]:
+        decode_distance = float(cmd[cmd.index('-ss', input_position) + 1])
+        pixel_ratio = info.pixels / (1920 * 1080) if info is not None and info.pixels > 0 else 1.0
+        timeout += decode_distance / OUTPUT_SEEK_SPEED * max(1.0, pixel_ratio)
+    return min(MAX_COMMAND_TIMEOUT, max(MIN_COMMAND_TIMEOUT, timeout))
+
+
+def video_time_budget(processor, info, num_thumbnails: int) -> float:
+    """Total FFmpeg seconds allowed for one video, from the processor setting or the cost model."""
+    if processor.video_time_budget > 0:
+        return processor.video_time_budget
+    return max(MIN_VIDEO_BUDGET, VIDEO_BUDGET_FACTOR * processor.cost_model.estimate(info, num_thumbnails))
+
+
+def save_placeholders(processor, video_path: Path, video_cache_dir: Path, prefix: str):
+    """Write placeholder thumbnails for a video that could not be processed and report them to the UI.
+
+    Placeholders already written at the current width are reused, so a quarantined video skipped on
+    every run does not rewrite them each time.
+    """
+    if not processor.update_callback:
+        return
+    num_thumbs_fallback = processor.thumbnails_per_video if processor.thumbnails_per_video > 0 else 1
+    placeholder_filenames = []
+    for i in range(num_thumbs_fallback):
+        ph_name = f"{prefix}_{i}_w{processor.thumbnail_width}.jpg"
+        ph_path = video_cache_dir / ph_name
+        try:
+            if not ph_path.exists():
+                generate_placeholder_thumbnail(processor).save(ph_path)
+            placeholder_filenames.append(ph_name)
+        except Exception as e_ph:
+            logger.error(f"Failed to save placeholder {ph_path}: {e_ph}")
+    processor.update_callback(video_path, placeholder_filenames, [0.0]*len(placeholder_filenames), 0.0)
+
+
+def prepare_video(processor, video_path: Path, stop_flag_check=None):
+    """Resolve a video against the cache and plan its thumbnail timestamps.
+
+    Cached videos and videos that cannot be processed are reported to the UI directly.
+
+    Args:
+        processor: The VideoProcessor instance.
+        video_path (Path): Path to the video file.
+        stop_flag_check (callable, optional): Returns True when processing should stop.
+
+    Returns:
+        VideoJob | None: A job with the timestamps still to extract, or None if nothing is left to do.
+    """
+    logger.debug(f"Preparing thumbnail generation for {video_path} using cache_dir: {processor.cache_dir}")
     if stop_flag_check and stop_flag_check():
         logger.info(f"Thumbnail generation for {video_path} cancelled before start.")
-        return [], [], 0
+        return None
 
     cache_json_file_path = get_cache_path(processor, video_path)
     video_specific_cache_dir = processor.cache_dir / video_path.name
     video_specific_cache_dir.mkdir(parents=True, exist_ok=True)
 
+    if processor.quarantine.is_quarantined(video_path):
+        logger.debug(f"Skipping {video_path}, quarantined after failing on an earlier run.")
+        save_placeholders(processor, video_path, video_specific_cache_dir, "placeholder_error")
+        return None
+
+    # Checked once per batch: order_by_expected_cost already did it outside lazy mode.
+    cache_valid = processor.cache_verdicts.pop(video_path, None)
+    if cache_valid is None:
+        cache_valid = is_cache_valid(processor, video_path)
+
+    journal = getattr(processor, 'journal', None)
+    if journal is not None and journal.is_finished(video_path) and cache_valid:
+        # Finished earlier in this (resumed) batch; the cache may have changed since, so it is validated first.
+        try:
+            with open(cache_json_file_path, 'r') as f:
+                cache = json.load(f)
+            logger.debug(f"Using cache of {video_path} finished before the batch was interrupted.")
+            if processor.update_callback:
+                processor.update_callback(video_path, cache['thumbnails'], cache['timestamps'], cache['duration'])
+            return None
+        except Exception as e:
+            logger.debug(f"Journaled cache of {video_path} unusable ({e}), checking it as usual.")
+
+    previous_cache = None
     if not cache_json_file_path.exists():
         logger.debug(f"No cache JSON found at {cache_json_file_path} for {video_path}. Generating new thumbnails.")
-    elif not is_cache_valid(processor, video_path):
-        logger.debug(f"Cache invalid for {video_path} at {cache_json_file_path}. Clearing cache.")
-        clear_cache(processor, video_path)
+    elif not cache_valid:
+        # Settings changed: keep the extracted frames, the new plan reuses those close enough to its timestamps.
+        logger.debug(f"Cache invalid for {video_path} at {cache_json_file_path}. Reusing stored frames where possible.")
+        try:
+            with open(cache_json_file_path, 'r') as f:
+                previous_cache = json.load(f)
+        except Exception:
+            previous_cache = None
     else:
         try:
             with open(cache_json_file_path, 'r') as f:
                 cache = json.load(f)
             if all(k in cache for k in ['thumbnails', 'timestamps', 'duration']):
                 logger.debug(f"Using valid cache from {cache_json_file_path} for {video_path}")
+                if needs_scrub_strip(processor, video_specific_cache_dir):
+                    return cached_scrub_job(processor, video_path, video_specific_cache_dir, cache)
+                if journal is not None:
+                    journal.record_video(video_path)
                 if processor.update_callback:
                     processor.update_callback(video_path, cache['thumbnails'], cache['timestamps'], cache['duration'])
-                return cache['thumbnails'], cache['timestamps'], cache['duration']
+                return None
             else:
                 logger.warning(f"Cache at {cache_json_file_path} for {video_path} missing essential keys. Regenerating.")
                 clear_cache(processor, video_path)
@@ -157,232 +450,585 @@ def generate_thumbnails(processor, video_path: Path, progress_callback=None, com
             logger.warning(f"Error loading cache from {cache_json_file_path} for {video_path}: {e}. Regenerating.")
             clear_cache(processor, video_path)
 
-    thumbnails = []
-    generated_timestamps = []
-    video_duration = 0
+    # The scan already parsed the duration; only probe again for videos it did not see.
+    video_info = processor.video_info.get(video_path)
+    if video_info is None and (processor.distribution == Distribution.CHAPTERS or processor.cover_art):
+        video_info = probe_video(video_path, supervisor=processor.supervisor) # Chapters and cover art come from the probe
+    if video_info is not None and video_info.duration > 0:
+        video_duration = video_info.duration
+    else:
+        video_duration = get_video_duration(video_path, processor.supervisor)
+    if video_duration <= 0:
+        if stop_flag_check and stop_flag_check():
+            return None
+        logger.warning(f"Could not determine valid duration for {video_path} ({video_duration}s). Skipping.")
+        processor.quarantine.record_failure(video_path, FailureKind.INVALID_DATA, "Could not determine the duration")
+        save_placeholders(processor, video_path, video_specific_cache_dir, "placeholder_error")
+        return None
+
+    if processor.sidecar_thumbnails and video_path not in processor.full_extraction:
+        job = sidecar_job(processor, video_path, video_specific_cache_dir, video_duration, video_info)
+        if job is not None:
+            return job
+
+    if processor.distribution == Distribution.SCENES:
+        return prepare_scene_job(processor, video_path, video_specific_cache_dir, video_duration, video_info, stop_flag_check)
 
+    if processor.distribution == Distribution.CHAPTERS:
+        target_timestamps = chapter_timestamps(video_info.chapters if video_info is not None else [],
+                                               video_duration, processor.thumbnails_per_video)
+    else:
+        # Planned for the whole batch at once when the scan knew the duration.
+        target_timestamps = processor.timestamp_plans.get(video_path) or generate_distributed_timestamps(processor, video_duration)
+    if not target_timestamps:
+        logger.warning(f"No target timestamps generated for {video_path}. Skipping.")
+        if processor.update_callback:
+            processor.update_callback(video_path, [], [], video_duration)
+        return None
+
+    actual_num_thumbnails = min(len(target_timestamps), processor.thumbnails_per_video)
+    job = VideoJob(video_path, video_specific_cache_dir, video_duration, target_timestamps[:actual_num_thumbnails],
+                   info=video_info)
+    reuse_stored_frames(processor, job, previous_cache)
+    resume_from_journal(processor, job)
+    if processor.keyframe_index and job.pending:
+        job.keyframes = keyframe_index(processor, video_path, video_specific_cache_dir, video_info)
+        snapped = snap_to_keyframes(job.timestamps, job.pending, job.keyframes, reuse_tolerance(video_duration))
+        if snapped:
+            logger.debug(f"Moved {snapped} of {len(job.pending)} timestamps of {video_path.name} onto keyframes.")
+    job.time_budget = video_time_budget(processor, video_info, len(job.pending))
+    job.scrub_pending = needs_scrub_strip(processor, video_specific_cache_dir)
+    attach_cover(processor, job)
+    return job
+
+
+def cover_filename(processor) -> str:
+    return f"cover_{processor_frame_key(processor)}.{file_extension(processor.thumbnail_format)}"
+
+
+def attach_cover(processor, job: VideoJob):
+    """Use the video's embedded cover art, if any, as an extra first thumbnail (see probe.VideoInfo.cover_stream).
+
+    Only the attached picture is decoded, so this costs about as much as opening a still image.
+    """
+    info = job.info
+    if not processor.cover_art or info is None or not info.cover_stream:
+        return
+    filename = cover_filename(processor)
+    cover_path = job.video_cache_dir / filename
+    if cover_path.exists():
+        job.cover = filename
+        return
+    cmd = ['ffmpeg', '-hide_banner', '-loglevel', 'error', '-i', str(job.video_path), '-map', info.cover_stream,
+           '-frames:v', '1', '-vf', f'scale={processor.thumbnail_width}:-2,format=yuv420p',
+           *ffmpeg_output_args(processor.thumbnail_format, processor.encode_preset, processor.thumbnail_quality)]
+    logger.trace(f"Cover art for {job.video_path.name}: {' '.join(cmd)}")
     try:
-        video_duration = get_video_duration(video_path)
-        if video_duration <= 0:
-            logger.warning(f"Could not determine valid duration for {video_path} ({video_duration}s). Skipping.")
-            if processor.update_callback:
-                placeholder_filenames = []
-                for i in range(processor.thumbnails_per_video):
-                    ph_name = f"placeholder_error_{i}.jpg"
-                    ph_path = video_specific_cache_dir / ph_name
-                    try:
-                        generate_placeholder_thumbnail(processor).save(ph_path)
-                        placeholder_filenames.append(ph_name)
-                    except Exception as e_ph:
-                        logger.error(f"Failed to save placeholder {ph_path}: {e_ph}")
-                processor.update_callback(video_path, placeholder_filenames, [0.0]*len(placeholder_filenames), 0.0)
-            return [], [], 0
+        result = processor.supervisor.run(cmd, COVER_TIMEOUT)
+        if result.returncode != 0 or not result.stdout:
+            error_output = result.stderr.decode('utf-8', errors='ignore') if result.stderr else "No stderr"
+            logger.warning(f"Cover art extraction failed for {job.video_path.name}. Code: {result.returncode}. "
+                           f"Error: {error_output[:300]}")
+            return
+        image_bytes = result.stdout
+        if needs_pillow_encode(processor.thumbnail_format):
+            image_bytes = encode_with_pillow(image_bytes, processor.thumbnail_format,
+                                             processor.encode_preset, processor.thumbnail_quality)
+        validate_image_bytes(image_bytes)
+        cover_path.write_bytes(image_bytes)
+    except subprocess.TimeoutExpired:
+        logger.warning(f"Cover art extraction timed out for {job.video_path.name}.")
+        return
+    except FFmpegCancelled:
+        return
+    except FFmpegLimitExceeded as e:
+        logger.warning(f"Cover art extraction exceeded its {e.resource} limit for {job.video_path.name}.")
+        return
+    except Exception as e:
+        logger.warning(f"Could not use the cover art of {job.video_path.name}: {e}")
+        return
+    job.cover = filename
+    logger.debug(f"Using embedded cover art as the first thumbnail of {job.video_path.name}")
 
-        target_timestamps = generate_distributed_timestamps(processor, video_duration)
-        if not target_timestamps:
-            logger.warning(f"No target timestamps generated for {video_path}. Skipping.")
-            if processor.update_callback:
-                processor.update_callback(video_path, [], [], video_duration)
-            return [], [], video_duration
 
-        actual_num_thumbnails = min(len(target_timestamps), processor.thumbnails_per_video)
+def sidecar_job(processor, video_path: Path, video_cache_dir: Path, duration: float, video_info):
+    """Complete job whose only thumbnail is the video's existing artwork (see sidecars.find_sidecar_image).
 
-        for i, timestamp in enumerate(target_timestamps[:actual_num_thumbnails]):
-            if stop_flag_check and stop_flag_check():
-                logger.info(f"Thumbnail generation for {video_path} cancelled during loop at timestamp {timestamp}.")
-                break
+    No FFmpeg runs; the preview stays until the user asks for the video's frames
+    (VideoProcessor.request_full_extraction).
 
-            thumb_filename = f"thumb_{i:03d}.jpg"
-            thumb_path = video_specific_cache_dir / thumb_filename
-
-            ffmpeg_cmd_successful = False
-
-            # Base scale filter: preserve aspect ratio by specifying width and -1 for height.
-            scale_vf = f'scale={processor.thumbnail_width}:-1'
-            # Common output format for good compatibility.
-            format_vf = 'format=yuv420p'
-            # Combine scale and format, can be extended with other filters.
-            vf_complex = f'{scale_vf},{format_vf}'
-
-
-            cmd_attempts = [
-                # Attempt 1: Standard HW accel (if available), precise seek before -i.
-                ['ffmpeg', '-hide_banner', '-loglevel', 'error', '-hwaccel', 'cuda',
-                 '-ss', str(timestamp), '-i', str(video_path),
-                 '-vf', vf_complex,
-                 '-vframes', '1', '-qscale:v', str(processor.thumbnail_quality),
-                 '-c:v', 'mjpeg', '-y', str(thumb_path)],
-
-                # Attempt 2: Standard SW decoding, precise seek before -i.
-                ['ffmpeg', '-hide_banner', '-loglevel', 'error',
-                 '-ss', str(timestamp), '-i', str(video_path),
-                 '-vf', vf_complex,
-                 '-vframes', '1', '-qscale:v', str(processor.thumbnail_quality),
-                 '-c:v', 'mjpeg', '-y', str(thumb_path)],
-
-                # Attempt 3: SW decoding, seek after -i (slower, but can be more robust for some files).
-                ['ffmpeg', '-hide_banner', '-loglevel', 'error',
-                 '-i', str(video_path), '-ss', str(timestamp),
-                 '-vf', vf_complex,
-                 '-vframes', '1', '-qscale:v', str(processor.thumbnail_quality),
-                 '-c:v', 'mjpeg', '-y', str(thumb_path)],
-
-                # Attempt 4: SW, copyts for timestamp accuracy, output as image2.
-                # `-an` (no audio), `-f image2` (force image output).
-                ['ffmpeg', '-hide_banner', '-loglevel', 'error',
-                 '-copyts', '-ss', str(timestamp), '-i', str(video_path),
-                 '-vf', vf_complex,
-                 '-vframes', '1', '-an', '-f', 'image2', '-qscale:v', str(processor.thumbnail_quality),
-                 '-y', str(thumb_path)],
-
-                # Attempt 5: SW, precise seek, but try seeking to a slightly earlier keyframe using -seek_timestamp
-                # This requires ffprobe or similar to find the nearest keyframe, which is complex here.
-                # A simpler approximation: seek slightly *before* the target timestamp.
-                # The -skip_frame option with -copyinkf might be better but also complex.
-                # Let's try a small negative offset with -ss.
-                ['ffmpeg', '-hide_banner', '-loglevel', 'error',
-                 '-ss', str(max(0, timestamp - 0.5)), '-i', str(video_path), # Seek 0.5s earlier
-                 '-ss', '0.5', # Then seek forward 0.5s from that point (relative seek if -ss is after -i)
-                 # This effectively means -i ... -ss timestamp
-                 '-vf', vf_complex,
-                 '-vframes', '1', '-qscale:v', str(processor.thumbnail_quality),
-                 '-c:v', 'mjpeg', '-y', str(thumb_path)],
-
-                # Attempt 6: Force keyframe seeking only using -skip_frame nokey.
-                # This is typically for -ss before -i. If a keyframe is not at `timestamp`, it will take the one *before* it.
-                # Then we need to seek *within* that segment. This is getting too complex without ffprobe.
-                # Simpler: Use `-ss` before `-i` and hope it lands on a keyframe near `timestamp`.
-                # If it's not accurate, the previous attempts might handle it better.
-                # Add a variation with `-force_key_frames` for output (though less relevant for single image).
-                # What might be more useful is to explicitly ask for a keyframe *near* the timestamp.
-                # One way is to use a select filter: vf select='eq(pict_type\,I)'
-                # This selects only I-frames. Combine with -ss for a window.
-
-                # Attempt 6: -ss before -i, specify output pix_fmt explicitly for mjpeg
-                ['ffmpeg', '-hide_banner', '-loglevel', 'error',
-                 '-ss', str(timestamp), '-i', str(video_path),
-                 '-vf', vf_complex, '-pix_fmt', 'yuvj420p', # Common for JPEG
-                 '-vframes', '1', '-qscale:v', str(processor.thumbnail_quality),
-                 '-c:v', 'mjpeg', '-y', str(thumb_path)],
-
-                # Attempt 7: No HW accel, seek after -i, use a slightly different timestamp again
-                ['ffmpeg', '-hide_banner', '-loglevel', 'error',
-                 '-i', str(video_path), '-ss', str(timestamp + 0.05), # Tiny positive offset
-                 '-vf', vf_complex,
-                 '-vframes', '1', '-qscale:v', str(processor.thumbnail_quality),
-                 '-c:v', 'mjpeg', '-y', str(thumb_path)],
-
-                # Attempt 8: Similar to 7, but try to output a PNG instead of MJPEG, sometimes helps with decoders/encoders.
-                # PNG is lossless but larger; for a single frame, it's an alternative.
-                # We'd need to change thumb_filename extension or convert later if sticking to JPG.
-                # For now, let's stick to JPG output for consistency in cache.
-                # This attempt will be a repeat of a previous one with a slight variation if needed.
-                # Let's try a very basic command as a last resort.
-                ['ffmpeg', '-hide_banner', '-loglevel', 'warning', # More verbose log for this one
-                 '-i', str(video_path), '-ss', str(timestamp),
-                 '-vframes', '1', '-s', f'{processor.thumbnail_width}x-1', # Simpler scale
-                 '-f', 'image2', '-q:v', str(processor.thumbnail_quality), # alias for qscale:v
-                 '-y', str(thumb_path)],
-            ]
-
-
-            for cmd_idx, cmd in enumerate(cmd_attempts):
-                if stop_flag_check and stop_flag_check(): break
-
-                logger.trace(f"Attempt {cmd_idx+1} for {video_path.name} @{timestamp:.2f}s: {' '.join(cmd)}")
-                if command_callback:
-                    command_callback(' '.join(cmd), str(thumb_path), str(video_path))
+    Returns:
+        VideoJob | None: The finished job, or None if the video has no usable artwork.
+    """
+    imported = import_sidecar(processor, video_path, video_cache_dir, processor_frame_key(processor))
+    if imported is None:
+        return None
+    filename, source = imported
+    job = VideoJob(video_path, video_cache_dir, duration, [0.0], info=video_info)
+    job.results = [filename]
+    job.reused = {0}
+    job.pending = []
+    job.completed = 1
+    job.sidecar = str(source)
+    logger.debug(f"Using {source.name} as the preview of {video_path.name}, no frames extracted.")
+    return job
 
-                try:
-                    result = subprocess.run(cmd, capture_output=True, text=False, timeout=45)
-                    if result.returncode == 0 and thumb_path.exists() and thumb_path.stat().st_size > 100:
-                        try:
-                            img = Image.open(thumb_path)
-                            img.verify()
-                            img.close()
-
-                            thumbnails.append(thumb_filename)
-                            generated_timestamps.append(timestamp)
-                            ffmpeg_cmd_successful = True
-                            logger.debug(f"Successfully generated thumbnail {thumb_path.name} (Attempt {cmd_idx+1})")
-                            break
-                        except Exception as e_pil:
-                            logger.warning(f"Pillow verification failed for {thumb_path.name} (Attempt {cmd_idx+1}): {e_pil}. Retrying FFmpeg.")
-                            if thumb_path.exists(): thumb_path.unlink(missing_ok=True)
-                    else:
-                        error_output = result.stderr.decode('utf-8', errors='ignore') if result.stderr else "No stderr"
-                        logger.warning(f"FFmpeg attempt {cmd_idx+1} failed for {video_path.name} at {timestamp:.2f}s. Code: {result.returncode}. Error: {error_output[:300]}")
-                        if thumb_path.exists() and thumb_path.stat().st_size <= 100 :
-                            thumb_path.unlink(missing_ok=True)
-                except subprocess.TimeoutExpired:
-                    logger.warning(f"FFmpeg attempt {cmd_idx+1} timed out for {video_path.name} at {timestamp:.2f}s.")
-                except Exception as e_ffmpeg:
-                    logger.error(f"Exception during FFmpeg attempt {cmd_idx+1} for {video_path.name} at {timestamp:.2f}s: {e_ffmpeg}", exc_info=False) # exc_info=False for less noise
-
-            if not ffmpeg_cmd_successful:
-                logger.warning(f"All FFmpeg attempts failed for {video_path.name} at {timestamp:.2f}s. Generating placeholder.")
-                placeholder_img = generate_placeholder_thumbnail(processor)
-                try:
-                    placeholder_img.save(thumb_path)
-                    thumbnails.append(thumb_filename)
-                    generated_timestamps.append(timestamp)
-                except Exception as e_placeholder:
-                    logger.error(f"Failed to save placeholder thumbnail for {video_path.name} at {timestamp:.2f}s: {e_placeholder}")
 
-            if progress_callback:
-                progress_val = ((i + 1) / actual_num_thumbnails) * 100
-                progress_callback(progress_val)
+def cached_scrub_job(processor, video_path: Path, video_cache_dir: Path, cache: dict) -> VideoJob:
+    """Job for a cached video whose thumbnails are all reused and only the scrub sprite is missing."""
+    job = VideoJob(video_path, video_cache_dir, cache['duration'], list(cache['timestamps']),
+                   info=processor.video_info.get(video_path))
+    job.results = list(cache['thumbnails'])
+    job.reused = set(range(len(job.timestamps)))
+    job.pending = []
+    job.completed = len(job.timestamps)
+    job.scrub_pending = True
+    return job
+
+
+def reuse_stored_frames(processor, job: VideoJob, previous_cache=None):
+    """Fill a job's results with stored frames within tolerance of its timestamps.
+
+    A reused frame replaces its target timestamp with the frame's own, so the timestamps shown
+    match the images. Only the remaining indices are left in job.pending.
+    """
+    store = FrameStore(job.video_cache_dir).load(previous_cache)
+    matched = store.match(job.timestamps, processor_frame_key(processor), reuse_tolerance(job.duration))
+    for index, frame in matched.items():
+        job.timestamps[index] = frame['timestamp']
+        job.results[index] = frame['file']
+        if frame.get('score'):
+            job.scores[index] = frame['score']
+        job.reused.add(index)
+    job.pending = [i for i in range(len(job.timestamps)) if i not in job.reused]
+    derived = derive_from_masters(processor, job, store)
+    job.pending = [i for i in job.pending if i not in derived]
+    job.completed = len(job.reused) + len(derived)
+    if job.completed:
+        logger.debug(f"Reusing {len(job.reused)} stored frames and deriving {len(derived)} from master frames "
+                     f"for {job.video_path.name}, extracting {len(job.pending)}.")
+
+
+def resume_from_journal(processor, job: VideoJob):
+    """Take over the thumbnails an interrupted run of this batch already extracted for the video.
 
+    The plan is deterministic for equal settings, so journaled entries line up with the job's indices.
+    """
+    journal = getattr(processor, 'journal', None)
+    if journal is None:
+        return
+    resumed = 0
+    for index, (timestamp, filename) in journal.finished_thumbnails(job.video_path).items():
+        if index in job.pending and (job.video_cache_dir / filename).exists():
+            job.timestamps[index] = timestamp
+            job.results[index] = filename
+            resumed += 1
+    if resumed:
+        job.pending = [i for i in job.pending if job.results[i] is None]
+        job.completed += resumed
+        logger.debug(f"Resuming {job.video_path.name}: {resumed} thumbnails journaled, extracting {len(job.pending)}.")
+
+
+def derive_from_masters(processor, job: VideoJob, store: FrameStore) -> set:
+    """Produce pending thumbnails by resizing/re-encoding stored master frames instead of decoding the video.
+
+    Returns:
+        set: The indices that now have a thumbnail.
+    """
+    if not job.pending:
+        return set()
+    pending_timestamps = [job.timestamps[i] for i in job.pending]
+    matched = store.match(pending_timestamps, master_key(processor), reuse_tolerance(job.duration),
+                          min_width=processor.thumbnail_width)
+    if not matched:
+        return set()
+    key = processor_frame_key(processor)
+    extension = file_extension(processor.thumbnail_format)
+    indices, tasks = [], []
+    for position, frame in matched.items():
+        index = job.pending[position]
+        thumb_filename = frame_filename(frame['timestamp'], key, extension)
+        indices.append(index)
+        tasks.append((str(job.video_cache_dir / frame['file']), str(job.video_cache_dir / thumb_filename),
+                      processor.thumbnail_width, processor.thumbnail_format, processor.encode_preset,
+                      processor.thumbnail_quality))
+        job.timestamps[index] = frame['timestamp']
+        if frame.get('score'):
+            job.scores[index] = frame['score']
+    derived = set()
+    for index, result in zip(indices, processor.derive_pool.map(tasks)):
+        if result is not None:
+            job.results[index] = Path(result).name
+            derived.add(index)
+    return derived
+
+
+def prepare_scene_job(processor, video_path: Path, video_cache_dir: Path, duration: float, video_info,
+                      stop_flag_check=None):
+    """Build a job for the 'scenes' distribution from one analysis pass (see scenes.analyse_scenes).
+
+    Frames picked by the analysis are kept as ready-made thumbnails; if the video has too few
+    usable keyframes, the remaining timestamps are spread evenly and extracted with FFmpeg as usual.
+
+    Returns:
+        VideoJob | None: The job, or None if processing was stopped.
+    """
+    start_time = processor.supervisor.clock()
+    input_args = thread_args(processor) + decode_args(processor, video_info, processor.thumbnail_width)
+    scene_thumbnails = analyse_scenes(processor, video_path, duration, input_args, stop_flag_check)
+    analysis_seconds = processor.supervisor.clock() - start_time
+    if stop_flag_check and stop_flag_check():
+        return None
+
+    scene_timestamps = [timestamp for timestamp, _ in scene_thumbnails]
+    missing = processor.thumbnails_per_video - len(scene_timestamps)
+    fill_timestamps = []
+    if missing > 0:
+        if scene_thumbnails:
+            logger.debug(f"Scene analysis found {len(scene_timestamps)} distinct frames for {video_path.name}, "
+                         f"extracting {missing} more evenly spread.")
+        candidates = generate_distributed_timestamps(processor, duration)
+        # Prefer the fill timestamps farthest from any scene frame.
+        candidates.sort(key=lambda ts: min((abs(ts - s) for s in scene_timestamps), default=0), reverse=True)
+        fill_timestamps = candidates[:missing]
+
+    timestamps = sorted(scene_timestamps + fill_timestamps)
+    if not timestamps:
+        logger.warning(f"No target timestamps generated for {video_path}. Skipping.")
+        if processor.update_callback:
+            processor.update_callback(video_path, [], [], duration)
+        return None
+
+    job = VideoJob(video_path, video_cache_dir, duration, timestamps, info=video_info)
+    job.time_budget = video_time_budget(processor, video_info, len(timestamps))
+    scene_bytes = dict(scene_thumbnails)
+    job.prefetched = {i: scene_bytes[ts] for i, ts in enumerate(timestamps) if ts in scene_bytes}
+    job.prefetch_command = f"scene analysis ({len(job.prefetched)} frames, {analysis_seconds:.1f}s)"
+    # Charge the analysis pass to the thumbnails it produced, for the cost model.
+    for i in job.prefetched:
+        job.extract_seconds[i] = analysis_seconds / len(job.prefetched)
+    job.scrub_pending = needs_scrub_strip(processor, video_cache_dir)
+    attach_cover(processor, job)
+    return job
+
+
+def extract_thumbnail(processor, job: VideoJob, index: int, command_callback=None, stop_flag_check=None):
+    """Extract the thumbnail at one timestamp index of a job, walking the FFmpeg attempt ladder.
+
+    A placeholder is saved when every attempt fails. The result is recorded in job.results.
+
+    Returns:
+        str | None: The thumbnail filename, or None if extraction was stopped.
+    """
+    video_path = job.video_path
+    timestamp = job.timestamps[index]
+    if stop_flag_check and stop_flag_check():
+        logger.info(f"Thumbnail generation for {video_path} cancelled at timestamp {timestamp}.")
+        return None
+
+    thumb_filename = frame_filename(timestamp, processor_frame_key(processor), file_extension(processor.thumbnail_format))
+    thumb_path = job.video_cache_dir / thumb_filename
+
+    image_bytes = job.prefetched.pop(index, None)
+    if image_bytes is not None:
+        try:
+            thumb_path.write_bytes(image_bytes)
+            job.results[index] = thumb_filename
+            if command_callback:
+                command_callback(job.prefetch_command, str(thumb_path), str(video_path))
+            return thumb_filename
+        except Exception as e:
+            logger.warning(f"Failed to write scene thumbnail {thumb_path}: {e}. Extracting with FFmpeg instead.")
+
+    cmd_attempts = build_cmd_attempts(processor, video_path, timestamp, keyframe_before(job.keyframes, timestamp))
+    start_time = processor.supervisor.clock()
+    try:
+        return _run_attempts(processor, job, index, cmd_attempts, thumb_path, command_callback, stop_flag_check)
+    finally:
+        job.extract_seconds[index] += processor.supervisor.clock() - start_time
+
+
+def extract_scrub(processor, job: VideoJob, stop_flag_check=None) -> bool:
+    """Extract the scrub sprite of a job's video; the job no longer waits for it afterwards, even on failure."""
+    try:
+        if stop_flag_check and stop_flag_check():
+            return False
+        estimated = processor.cost_model.estimate(job.info, len(job.timestamps))
+        input_args = thread_args(processor) + decode_args(processor, job.info, SCRUB_FRAME_WIDTH)
+        return extract_scrub_strip(processor, job.video_path, job.video_cache_dir, job.duration,
+                                   input_args, estimated)
+    finally:
+        if not (stop_flag_check and stop_flag_check()):
+            job.scrub_pending = False
+
+
+def _run_attempts(processor, job: VideoJob, index: int, cmd_attempts: list, thumb_path: Path,
+                  command_callback=None, stop_flag_check=None):
+    video_path = job.video_path
+    timestamp = job.timestamps[index]
+    thumb_filename = thumb_path.name
+    start_time = processor.supervisor.clock()
+    for cmd_idx, cmd in enumerate(cmd_attempts):
         if stop_flag_check and stop_flag_check():
-            logger.info(f"Thumbnail generation for {video_path.name} was stopped. Processed {len(thumbnails)} thumbnails.")
+            return None
+        if job.failure is not None:
+            break # Fatal for the whole video, no other attempt can succeed
+
+        remaining_budget = job.remaining_budget(processor.supervisor.clock() - start_time)
+        if remaining_budget <= 0:
+            logger.warning(f"Time budget of {job.time_budget:.0f}s exhausted for {video_path.name}, "
+                           f"skipping remaining attempts at {timestamp:.2f}s.")
+            break
+        timeout = min(command_timeout(processor, job, cmd, timestamp), max(MIN_COMMAND_TIMEOUT, remaining_budget))
 
-        if len(generated_timestamps) < len(thumbnails):
-            if generated_timestamps:
-                last_ts = generated_timestamps[-1]
+        logger.trace(f"Attempt {cmd_idx+1} for {video_path.name} @{timestamp:.2f}s: {' '.join(cmd)}")
+        if command_callback:
+            command_callback(' '.join(cmd), str(thumb_path), str(video_path))
+
+        try:
+            # The encoded frame is streamed over stdout and validated in memory,
+            # so the cache only sees a single write of a known-good image.
+            attempt_start = processor.supervisor.clock()
+            picker = None
+            if '-frames:v' in cmd:
+                # Candidate frames are scored as they arrive; FFmpeg is killed at the first acceptable one.
+                picker = CandidatePicker()
+                result = processor.supervisor.run_streaming(cmd, timeout, picker)
+                output = picker.best[1] if picker.best is not None else b''
+                succeeded = result.returncode in (0, None)
             else:
-                last_ts = 0.0 if not target_timestamps else target_timestamps[len(generated_timestamps)]
-
-            generated_timestamps.extend([last_ts] * (len(thumbnails) - len(generated_timestamps)))
-
-
-        if thumbnails:
-            cache_data = {
-                'thumbnails': thumbnails,
-                'timestamps': generated_timestamps,
-                'duration': video_duration,
-                'thumbnails_per_video': processor.thumbnails_per_video,
-                'thumbnail_width': processor.thumbnail_width,
-                'thumbnail_quality': processor.thumbnail_quality,
-                'peak_pos': processor.peak_pos,
-                'concentration': processor.concentration,
-                'distribution': processor.distribution.value if isinstance(processor.distribution, Distribution) else str(processor.distribution)
+                result = processor.supervisor.run(cmd, timeout)
+                output = result.stdout
+                succeeded = result.returncode == 0
+            if succeeded and output and len(output) > 100:
+                job.attempt_seconds.append(processor.supervisor.clock() - attempt_start)
+                try:
+                    image_bytes = output
+                    master_bytes = None
+                    if master_width(processor):
+                        master_bytes = image_bytes
+                        image_bytes = derive_thumbnail(master_bytes, processor.thumbnail_width, processor.thumbnail_format,
+                                                       processor.encode_preset, processor.thumbnail_quality)
+                    elif picker is not None and processor.thumbnail_format != ThumbnailFormat.JPEG:
+                        # The candidate is a JPEG at master quality (see build_cmd_attempts).
+                        image_bytes = derive_thumbnail(image_bytes, processor.thumbnail_width, processor.thumbnail_format,
+                                                       processor.encode_preset, processor.thumbnail_quality)
+                    elif needs_pillow_encode(processor.thumbnail_format):
+                        image_bytes = encode_with_pillow(image_bytes, processor.thumbnail_format,
+                                                         processor.encode_preset, processor.thumbnail_quality)
+                    validate_image_bytes(image_bytes)
+                except Exception as e_pil:
+                    logger.warning(f"Pillow verification failed for {thumb_path.name} (Attempt {cmd_idx+1}): {e_pil}. Retrying FFmpeg.")
+                    continue
+                if picker is not None and record_candidate(job, index, picker):
+                    # A later candidate was chosen: name the files after where it was taken, so the
+                    # cache JSON, frame store and journal agree with them.
+                    timestamp = job.timestamps[index]
+                    thumb_filename = frame_filename(timestamp, processor_frame_key(processor),
+                                                    file_extension(processor.thumbnail_format))
+                    thumb_path = job.video_cache_dir / thumb_filename
+                thumb_path.write_bytes(image_bytes)
+                if master_bytes is not None:
+                    master_name = master_filename(timestamp, master_width(processor), master_key(processor))
+                    try:
+                        (job.video_cache_dir / master_name).write_bytes(master_bytes)
+                        job.masters[index] = master_name
+                    except OSError as e_master:
+                        logger.warning(f"Failed to write master frame {master_name}: {e_master}")
+
+                job.results[index] = thumb_filename
+                logger.debug(f"Successfully generated thumbnail {thumb_path.name} (Attempt {cmd_idx+1})")
+                return thumb_filename
+            else:
+                error_output = result.stderr.decode('utf-8', errors='ignore') if result.stderr else "No stderr"
+                kind = classify_stderr(error_output, video_path)
+                logger.warning(f"FFmpeg attempt {cmd_idx+1} failed for {video_path.name} at {timestamp:.2f}s ({kind.value}). Code: {result.returncode}. Error: {error_output[:300]}")
+                if is_fatal(kind):
+                    job.fail(kind, failure_detail(error_output, kind))
+        except FFmpegCancelled:
+            logger.debug(f"FFmpeg attempt {cmd_idx+1} for {video_path.name} at {timestamp:.2f}s cancelled by stop request.")
+            return None
+        except FFmpegLimitExceeded as e_limit:
+            logger.warning(f"FFmpeg attempt {cmd_idx+1} exceeded its {e_limit.resource} limit for {video_path.name} "
+                           f"at {timestamp:.2f}s.")
+            job.fail(classify_exception(e_limit), str(e_limit))
+        except subprocess.TimeoutExpired:
+            logger.warning(f"FFmpeg attempt {cmd_idx+1} timed out after {timeout:.0f}s for {video_path.name} at {timestamp:.2f}s.")
+        except Exception as e_ffmpeg:
+            logger.error(f"Exception during FFmpeg attempt {cmd_idx+1} for {video_path.name} at {timestamp:.2f}s: {e_ffmpeg}", exc_info=False) # exc_info=False for less noise
+            if is_fatal(classify_exception(e_ffmpeg)):
+                job.fail(classify_exception(e_ffmpeg), str(e_ffmpeg))
+
+    if job.failure is not None:
+        logger.debug(f"Skipping {video_path.name} at {timestamp:.2f}s after a fatal error ({job.failure[0].value}). "
+                     f"Generating placeholder.")
+    else:
+        logger.warning(f"No FFmpeg attempt succeeded for {video_path.name} at {timestamp:.2f}s. Generating placeholder.")
+    placeholder_img = generate_placeholder_thumbnail(processor)
+    try:
+        placeholder_img.save(thumb_path)
+        job.results[index] = thumb_filename
+        job.placeholders.add(index)
+    except Exception as e_placeholder:
+        logger.error(f"Failed to save placeholder thumbnail for {video_path.name} at {timestamp:.2f}s: {e_placeholder}")
+    return job.results[index]
+
+
+def record_candidate(job: VideoJob, index: int, picker: CandidatePicker) -> bool:
+    """Store the chosen candidate's score and move the index's timestamp to where it was taken.
+
+    Returns:
+        bool: True if the timestamp moved, i.e. a later candidate than the first was chosen.
+    """
+    candidate_index, _, score = picker.best
+    job.scores[index] = score
+    if candidate_index:
+        job.timestamps[index] = round(job.timestamps[index] + candidate_index * CANDIDATE_STEP, 3)
+        logger.debug(f"Frame quality: used candidate {candidate_index + 1} of {job.video_path.name} at "
+                     f"{job.timestamps[index]:.2f}s after {candidate_index} rejected ({score}).")
+    if not is_acceptable(score):
+        logger.debug(f"Frame quality: no candidate of {job.video_path.name} near {job.timestamps[index]:.2f}s "
+                     f"passed, keeping the best of {picker.frames_seen} ({score}).")
+    return bool(candidate_index)
+
+
+def representative_index(processor, job: VideoJob):
+    """The pending timestamp index that best stands for the whole video: nearest the peak of a
+    peak-concentration distribution, otherwise nearest the middle. None if nothing is pending."""
+    if not job.pending:
+        return None
+    center = processor.peak_pos if processor.distribution in (Distribution.TRIANGULAR, Distribution.NORMAL) else 0.5
+    return min(job.pending, key=lambda i: abs(job.timestamps[i] - center * job.duration))
+
+
+def collect_results(job: VideoJob) -> tuple:
+    """The thumbnails extracted so far in display order, cover first.
+
+    Returns:
+        tuple: (thumbnails, timestamps, scores)
+    """
+    thumbnails = [job.cover] if job.cover else []
+    generated_timestamps = [0.0] if job.cover else []
+    scores = [None] if job.cover else []
+    for index, (thumb_filename, timestamp) in enumerate(zip(job.results, job.timestamps)):
+        if thumb_filename is not None:
+            thumbnails.append(thumb_filename)
+            generated_timestamps.append(timestamp)
+            scores.append(job.scores.get(index))
+    return thumbnails, generated_timestamps, scores
+
+
+def report_partial(processor, job: VideoJob):
+    """Show an unfinished video with the thumbnails it has so far; finalize_video replaces the entry later."""
+    thumbnails, generated_timestamps, _ = collect_results(job)
+    if not thumbnails:
+        return
+    processor.partial_videos.add(job.video_path)
+    if processor.update_callback:
+        processor.update_callback(job.video_path, thumbnails, generated_timestamps, job.duration)
+
+
+def finalize_video(processor, job: VideoJob):
+    """Regroup a job's extracted thumbnails, write the cache JSON and report the video to the UI.
+
+    The cache JSON is only written once every timestamp has been extracted, so a stopped
+    video is regenerated on the next run instead of being served from a partial entry. A video
+    stopped by a fatal error is not cached either and is tried again on the next run, and neither
+    is a video where every timestamp ended as a placeholder: it is quarantined instead (see
+    ThumbnailScheduler._finish_job), and a valid cache would outlive a retry.
+
+    Returns:
+        tuple: (thumbnails, timestamps, duration)
+    """
+    thumbnails, generated_timestamps, scores = collect_results(job)
+
+    all_placeholders = bool(job.timestamps) and len(job.placeholders) == len(job.timestamps)
+    if thumbnails and job.is_complete() and job.failure is None and not all_placeholders:
+        cache_json_file_path = get_cache_path(processor, job.video_path)
+        cache_data = {
+            'thumbnails': thumbnails,
+            'timestamps': generated_timestamps,
+            'duration': job.duration,
+            'thumbnails_per_video': processor.thumbnails_per_video,
+            'thumbnail_width': processor.thumbnail_width,
+            'thumbnail_quality': processor.thumbnail_quality,
+            'peak_pos': processor.peak_pos,
+            'concentration': processor.concentration,
+            'distribution': processor.distribution.value if isinstance(processor.distribution, Distribution) else str(processor.distribution),
+            'thumbnail_format': processor.thumbnail_format.value,
+            'encode_preset': processor.encode_preset.value,
+            'decode_preset': processor.decode_preset.value,
+            'frame_scoring': processor.frame_scoring,
+            'cover_art': processor.cover_art,
+            'sidecar': job.sidecar,
+            'scores': scores, # Frame quality per thumbnail, None where it was not measured
+            # The timestamps are a pure function of these settings; is_cache_valid compares the plan itself.
+            'timestamp_plan': {
+                'method': plan_method(processor),
+                'positions': [float(position) for position in current_plan(processor)],
             }
-            try:
-                with open(cache_json_file_path, 'w') as f:
-                    json.dump(cache_data, f, indent=4)
-                logger.debug(f"Saved cache JSON to {cache_json_file_path} for {video_path.name}")
-            except Exception as e:
-                logger.error(f"Failed to write cache JSON to {cache_json_file_path} for {video_path.name}: {e}")
+        }
+        try:
+            with open(cache_json_file_path, 'w') as f:
+                json.dump(cache_data, f, indent=4)
+            logger.debug(f"Saved cache JSON to {cache_json_file_path} for {job.video_path.name}")
+        except Exception as e:
+            logger.error(f"Failed to write cache JSON to {cache_json_file_path} for {job.video_path.name}: {e}")
+        update_frame_store(processor, job, thumbnails)
+        if not job.sidecar:
+            processor.full_extraction.discard(job.video_path) # Its frames are cached now
+    elif job.failure is not None:
+        logger.info(f"Thumbnail generation for {job.video_path.name} failed ({job.failure[0].value}), not cached.")
+    elif all_placeholders:
+        logger.info(f"No thumbnail of {job.video_path.name} could be extracted, not cached.")
+    elif not job.is_complete():
+        logger.info(f"Thumbnail generation for {job.video_path.name} was stopped. Processed {len(thumbnails)} thumbnails.")
 
-        if processor.update_callback:
-            processor.update_callback(video_path, thumbnails, generated_timestamps, video_duration)
+    processor.partial_videos.discard(job.video_path)
+    if processor.update_callback:
+        processor.update_callback(job.video_path, thumbnails, generated_timestamps, job.duration)
 
-        return thumbnails, generated_timestamps, video_duration
+    return thumbnails, generated_timestamps, job.duration
 
-    except Exception as e:
-        logger.error(f"General error processing thumbnails for {video_path.name}: {e}", exc_info=True)
-        if processor.update_callback:
-            num_thumbs_fallback = processor.thumbnails_per_video if hasattr(processor, 'thumbnails_per_video') and processor.thumbnails_per_video > 0 else 1
 
-            placeholder_filenames = []
-            for i_ph in range(num_thumbs_fallback):
-                ph_name_err = f"error_placeholder_{i_ph}.jpg"
-                ph_path_err = video_specific_cache_dir / ph_name_err
-                try:
-                    generate_placeholder_thumbnail(processor).save(ph_path_err)
-                    placeholder_filenames.append(ph_name_err)
-                except Exception as e_ph_save:
-                    logger.error(f"Failed to save error placeholder {ph_path_err}: {e_ph_save}")
+def update_frame_store(processor, job: VideoJob, thumbnails: list):
+    """Record a completed job's new frames in the video's frame store and drop the oldest unused ones."""
+    store = FrameStore(job.video_cache_dir).load()
+    key = processor_frame_key(processor)
+    for index, thumb_filename in enumerate(job.results):
+        if thumb_filename is not None and index not in job.reused and index not in job.placeholders:
+            store.add(job.timestamps[index], thumb_filename, key, score=job.scores.get(index))
+    for index, master_name in job.masters.items():
+        store.add(job.timestamps[index], master_name, master_key(processor), width=master_width(processor),
+                  score=job.scores.get(index))
+    # Masters and thumbnails are kept in equal numbers.
+    frames_per_timestamp = 2 if master_width(processor) else 1
+    store.prune(set(thumbnails) | set(job.masters.values()),
+                MAX_FRAMES_FACTOR * frames_per_timestamp * max(processor.thumbnails_per_video, len(thumbnails)))
+    store.save()
+
 
-            processor.update_callback(video_path, placeholder_filenames, [0.0]*len(placeholder_filenames), 0.0)
-        return [], [], 0
\ No newline at end of file
+def generate_thumbnails(processor, video_path: Path, progress_callback=None, command_callback=None, stop_flag_check=None):
+    """Generate all thumbnails of a single video serially (see scheduler.ThumbnailScheduler for batches)."""
+    video_specific_cache_dir = processor.cache_dir / video_path.name
+    try:
+        job = prepare_video(processor, video_path, stop_flag_check)
+        if job is None:
+            return [], [], 0
+
+        for i in job.pending:
+            if extract_thumbnail(processor, job, i, command_callback, stop_flag_check) is None and \
+                    stop_flag_check and stop_flag_check():
+                break
+            job.completed += 1
+            if progress_callback:
+                progress_callback((job.completed / len(job.timestamps)) * 100)
+        if job.scrub_pending:
+            extract_scrub(processor, job, stop_flag_check)
+
+        return finalize_video(processor, job)
+
+    except Exception as e:
+        logger.error(f"General error processing thumbnails for {video_path.name}: {e}", exc_info=True)
+        save_placeholders(processor, video_path, video_specific_cache_dir, "error_placeholder")
+        return [], [], 0
@@ -0,0 +1,135 @@
+from functools import lru_cache
+from statistics import NormalDist
+
+import numpy as np
+from loguru import logger
+
+from src.distribution_enum import Distribution
+
+# Recorded with every cache entry and bumped whenever the placement below changes, so entries planned
+# by an older version no longer match (see thumbnail.cached_plan_matches).
+PLAN_METHOD = "quantile-v1"
+CHAPTER_START_OFFSET = 1.0 # Seconds after a chapter start, past the cut or title card
+
+
+def _midpoint_quantiles(num_thumbnails: int) -> np.ndarray:
+    """Probabilities (i + 0.5) / n: the centres of n equal-probability slices of a distribution."""
+    return (np.arange(num_thumbnails) + 0.5) / num_thumbnails
+
+
+def _triangular_inverse_cdf(u: np.ndarray, left: float, mode: float, right: float) -> np.ndarray:
+    width = right - left
+    split = (mode - left) / width
+    rising = left + np.sqrt(u * width * (mode - left))
+    falling = right - np.sqrt((1 - u) * width * (right - mode))
+    return np.where(u < split, rising, falling)
+
+
+def _truncated_normal_inverse_cdf(u: np.ndarray, mean: float, sigma: float) -> np.ndarray:
+    """Inverse CDF of a normal distribution truncated to [0, 1]."""
+    dist = NormalDist(mean, sigma)
+    low, high = dist.cdf(0.0), dist.cdf(1.0)
+    if high - low < 1e-12: # All mass outside [0, 1]; collapse onto the nearest edge
+        return np.full(len(u), 0.0 if mean < 0 else 1.0)
+    probabilities = low + u * (high - low)
+    probabilities = np.clip(probabilities, 1e-12, 1 - 1e-12)
+    return np.array([dist.inv_cdf(p) for p in probabilities])
+
+
+@lru_cache(maxsize=64)
+def normalized_plan(distribution: Distribution, num_thumbnails: int, peak_pos: float, concentration: float) -> tuple:
+    """Deterministic thumbnail positions in [0.01, 0.99] for one set of distribution settings.
+
+    Positions are the midpoint quantiles of the distribution (inverse-CDF placement), so the same
+    settings always give the same plan, and the plan does not depend on the video: it is computed
+    once per batch and scaled by each video's duration.
+
+    Args:
+        distribution (Distribution): Distribution model.
+        num_thumbnails (int): Number of positions wanted.
+        peak_pos (float): Peak position (0-1) for TRIANGULAR and NORMAL.
+        concentration (float): Half-width (TRIANGULAR) or standard deviation (NORMAL).
+
+    Returns:
+        tuple: Sorted unique positions, `num_thumbnails` of them when num_thumbnails > 0.
+    """
+    if num_thumbnails <= 0:
+        return ()
+    u = _midpoint_quantiles(num_thumbnails)
+    peak_pos_f = float(peak_pos)
+    concentration_f = float(concentration)
+
+    match distribution:
+        case Distribution.TRIANGULAR:
+            left_bound = max(0, peak_pos_f - concentration_f)
+            right_bound = min(1, peak_pos_f + concentration_f)
+            if abs(right_bound - left_bound) < 1e-6 or concentration_f < 1e-3:
+                spread_epsilon = 0.05
+                left_bound = max(0, peak_pos_f - spread_epsilon)
+                right_bound = min(1, peak_pos_f + spread_epsilon)
+            if left_bound >= right_bound:
+                normalized = np.full(num_thumbnails, peak_pos_f)
+            else:
+                mode = float(np.clip(peak_pos_f, left_bound, right_bound))
+                normalized = _triangular_inverse_cdf(u, left_bound, mode, right_bound)
+        case Distribution.NORMAL:
+            normalized = _truncated_normal_inverse_cdf(u, peak_pos_f, max(concentration_f, 1e-6))
+        case Distribution.UNIFORM | Distribution.SCENES | Distribution.CHAPTERS:
+            # SCENES and CHAPTERS pick their own timestamps; this even spread only fills gaps
+            # (see prepare_scene_job and chapter_timestamps).
+            normalized = np.linspace(0, 1, num_thumbnails + 2)[1:-1]
+        case _:
+            logger.error(f"Unknown distribution: {distribution}. Defaulting to UNIFORM.")
+            normalized = np.linspace(0, 1, num_thumbnails + 2)[1:-1]
+
+    normalized = np.unique(np.round(np.clip(normalized, 0.01, 0.99), 6))
+
+    if len(normalized) < num_thumbnails:
+        # A very narrow distribution collapsed several positions onto one; top up evenly.
+        logger.trace(f"Distribution generated {len(normalized)} unique timestamps, need {num_thumbnails}. Augmenting.")
+        combined = np.unique(np.concatenate((normalized, np.linspace(0.01, 0.99, num_thumbnails))))
+        indices = np.round(np.linspace(0, len(combined) - 1, num_thumbnails)).astype(int)
+        normalized = combined[indices]
+
+    return tuple(float(x) for x in normalized)
+
+
+def plan_timestamps(plan: tuple, durations) -> np.ndarray:
+    """Scale one normalized plan to many videos at once.
+
+    Args:
+        plan (tuple): Positions from normalized_plan().
+        durations (sequence of float): Video durations in seconds.
+
+    Returns:
+        np.ndarray: One row of timestamps in seconds per video.
+    """
+    return np.outer(np.asarray(durations, dtype=float), np.asarray(plan, dtype=float))
+
+
+def chapter_timestamps(chapters: list, duration: float, num_thumbnails: int) -> list:
+    """Timestamps just after each chapter start, spread evenly over the chapters when there are more than needed.
+
+    Args:
+        chapters (list): (start, end) in seconds per chapter, from probe.VideoInfo.
+        duration (float): Video duration in seconds.
+        num_thumbnails (int): Number of timestamps wanted.
+
+    Returns:
+        list: Sorted timestamps; with fewer chapters than thumbnails, the rest are evenly spread
+        positions farthest from the chapter timestamps.
+    """
+    if num_thumbnails <= 0 or duration <= 0:
+        return []
+    starts = sorted({round(min(start + CHAPTER_START_OFFSET, (start + min(end, duration)) / 2), 3)
+                     for start, end in chapters if 0 <= start < duration})
+    if len(starts) > num_thumbnails:
+        indices = np.unique(np.round(np.linspace(0, len(starts) - 1, num_thumbnails)).astype(int))
+        starts = [starts[i] for i in indices]
+    timestamps = list(starts)
+    candidates = [float(x) * duration for x in np.linspace(0, 1, num_thumbnails + 2)[1:-1]]
+    while len(timestamps) < num_thumbnails and candidates:
+        farthest = max(candidates, key=lambda ts: min((abs(ts - t) for t in timestamps), default=0))
+        candidates.remove(farthest)
+        timestamps.append(farthest)
+    return sorted(timestamps)